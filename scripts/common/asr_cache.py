@@ -0,0 +1,64 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+# 파일 전체를 읽지 않고 지문을 만들기 위해 샘플링하는 블록 수와 크기
+FINGERPRINT_SAMPLES = 16
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+ASR_BACKEND = "openai-whisper"
+
+
+def video_fingerprint(video_path: str, num_samples: int = FINGERPRINT_SAMPLES, block_size: int = FINGERPRINT_BLOCK_SIZE) -> str:
+    """
+    비디오 파일의 빠른 내용 지문을 만듭니다.
+    파일 크기와 처음/끝을 포함해 고르게 떨어진 num_samples개 블록의 해시를 사용하므로,
+    수 GB 파일도 약 1MB만 읽습니다.
+    """
+    size = os.path.getsize(video_path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(size).encode())
+    with open(video_path, 'rb') as f:
+        if size <= num_samples * block_size:
+            digest.update(f.read())
+        else:
+            step = (size - block_size) / (num_samples - 1)
+            for i in range(num_samples):
+                f.seek(int(i * step))
+                digest.update(f.read(block_size))
+    return f"{size:x}-{digest.hexdigest()}"
+
+
+def asr_cache_key(fingerprint: str, model_size: str, language: str, word_timestamps: bool = False, backend: str = ASR_BACKEND) -> str:
+    """지문과 변환 설정으로 캐시 키를 만듭니다. 설정이 하나라도 다르면 다른 키가 됩니다."""
+    settings = f"{backend}|{model_size}|{language}|words={int(word_timestamps)}"
+    return f"{fingerprint}-{hashlib.sha1(settings.encode()).hexdigest()[:12]}"
+
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.json.gz")
+
+
+def load_cached_segments(cache_dir: str, key: str) -> Optional[List[dict]]:
+    """캐시된 세그먼트 목록을 읽습니다. 없거나 손상되었으면 None을 반환합니다."""
+    path = _cache_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)["segments"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"ASR 캐시를 읽을 수 없어 무시합니다 ({path}): {e}")
+        return None
+
+
+def save_cached_segments(cache_dir: str, key: str, segments: List[dict], metadata: dict):
+    """세그먼트 목록(단어 타이밍 포함)을 캐시에 저장합니다. 임시 파일에 쓴 뒤 교체하므로 중단되어도 손상되지 않습니다."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, key)
+    temp_path = path + ".tmp"
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+        json.dump({"metadata": metadata, "segments": segments}, f, ensure_ascii=False)
+    os.replace(temp_path, path)
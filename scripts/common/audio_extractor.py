@@ -1,14 +1,17 @@
 import os
 import subprocess
 import tempfile
+from typing import Optional
 
-def extract_audio(video_path: str, output_dir: str) -> str:
+def extract_audio(video_path: str, output_dir: str, start_sec: Optional[float] = None, duration_sec: Optional[float] = None) -> str:
     """
     ffmpeg을 사용하여 비디오 파일에서 오디오를 추출합니다.
     16kHz, 16-bit, single-channel WAV 파일로 변환합니다.
     Args:
         video_path (str): 입력 비디오 파일의 경로.
         output_dir (str): 임시 오디오 파일을 저장할 디렉터리.
+        start_sec (Optional[float]): 주면 이 위치로 입력 탐색(-ss)하여 앞부분을 디코딩하지 않습니다.
+        duration_sec (Optional[float]): 주면 이 길이(-t)만 추출합니다.
     Returns:
         str: 생성된 임시 WAV 파일의 경로.
     Raises:
@@ -27,8 +30,13 @@ def extract_audio(video_path: str, output_dir: str) -> str:
 
     print(f"임시 오디오 파일 생성 중: {temp_wav_path}")
 
+    # -ss/-t를 -i 앞에 두어 입력 단계에서 탐색하므로, 구간 밖은 디코딩하지 않습니다.
+    seek_args = ["-ss", f"{start_sec:.3f}"] if start_sec else []
+    if duration_sec is not None:
+        seek_args += ["-t", f"{duration_sec:.3f}"]
     command = [
         "ffmpeg",
+        *seek_args,
         "-i", video_path,
         "-ar", "16000",      # 샘플링 레이트를 16kHz로 설정
         "-ac", "1",           # 오디오 채널을 1개(모노)로 설정
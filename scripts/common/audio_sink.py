@@ -0,0 +1,192 @@
+import os
+import subprocess
+import wave
+from typing import Optional
+
+import numpy as np
+
+from common.loudness import DEFAULT_CEILING_DBFS, apply_gain
+from common.peaks import PeakBuilder, peaks_path_for
+from common.wav_io import from_float, memmap_wav, read_wav_info, to_float
+
+# 출력 포맷별 ffmpeg 인코더 인자 (wav는 ffmpeg 없이 직접 기록)
+ENCODER_ARGS = {
+    "wav": None,
+    "flac": ["-c:a", "flac", "-compression_level", "5"],
+    "opus": ["-c:a", "libopus", "-b:a", "96k"],
+    "aac": ["-c:a", "aac", "-b:a", "192k"],
+}
+
+OUTPUT_EXTENSIONS = {
+    "wav": ".wav",
+    "flac": ".flac",
+    "opus": ".opus",
+    "aac": ".m4a",
+}
+
+_PCM_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+# peak 계산을 위해 PCM 바이트를 해석하는 타입 (24-bit는 peak를 만들지 않습니다)
+# 출력은 항상 정수 PCM입니다. float WAV 입력은 쓰기 전에 16-bit로 바꾸므로 4바이트는 32-bit 정수입니다.
+_PCM_DTYPES = {1: np.dtype('u1'), 2: np.dtype('<i2'), 4: np.dtype('<i4')}
+
+# WAV를 파이프로 넘길 때 한 번에 읽는 프레임 수
+_BLOCK_FRAMES = 65536
+
+
+class AudioSink:
+    """
+    병합 결과를 순서대로 흘려 쓰는 출력입니다.
+    첫 번째 chunk가 들어오는 순간 WAV 파일 또는 ffmpeg 인코더 프로세스를 열고,
+    이후 chunk가 준비될 때마다 PCM을 바로 전달하므로 마지막 chunk 직후 압축 파일이 완성됩니다.
+    build_peaks가 True면 흘려 쓰는 PCM으로 파형 표시용 peak 파일(<출력 경로>.peaks)을 함께 만듭니다.
+    """
+
+    def __init__(self, output_path: str, output_format: str = "wav", build_peaks: bool = False):
+        if output_format not in ENCODER_ARGS:
+            raise ValueError(f"지원하지 않는 출력 포맷입니다: {output_format} (지원: {', '.join(ENCODER_ARGS)})")
+        self.output_path = output_path
+        self.output_format = output_format
+        self.sample_rate = None
+        self.channels = None
+        self.sampwidth = None
+        self.frames_written = 0
+        self._wav = None
+        self._process = None
+        self._build_peaks = build_peaks
+        self._peaks = None
+
+    def _open(self, sample_rate: int, channels: int, sampwidth: int):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sampwidth = sampwidth
+        if self._build_peaks and sampwidth in _PCM_DTYPES:
+            self._peaks = PeakBuilder(sample_rate)
+        output_dir = os.path.dirname(self.output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        if self.output_format == "wav":
+            self._wav = wave.open(self.output_path, 'wb')
+            self._wav.setnchannels(channels)
+            self._wav.setsampwidth(sampwidth)
+            self._wav.setframerate(sample_rate)
+            return
+
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", _PCM_FORMATS[sampwidth],
+            "-ar", str(sample_rate),
+            "-ac", str(channels),
+            "-i", "pipe:0",
+            *ENCODER_ARGS[self.output_format],
+            self.output_path
+        ]
+        print(f"인코더 시작 ({self.output_format}): {self.output_path}")
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def write_frames(self, frames: bytes):
+        """원시 PCM 프레임을 출력에 씁니다. 먼저 write_wav 등으로 포맷이 정해져 있어야 합니다."""
+        if not frames:
+            return
+        if self._wav is not None:
+            self._wav.writeframesraw(frames)
+        else:
+            try:
+                self._process.stdin.write(frames)
+            except BrokenPipeError:
+                stderr = self._process.stderr.read().decode('utf-8', errors='replace')
+                raise RuntimeError(f"ffmpeg 인코더가 비정상 종료되었습니다: {stderr}")
+        self.frames_written += len(frames) // (self.channels * self.sampwidth)
+        if self._peaks is not None:
+            self._peaks.add(np.frombuffer(frames, dtype=_PCM_DTYPES[self.sampwidth]).reshape(-1, self.channels))
+
+    def write_wav(self, wav_path: str, gain: float = 1.0, ceiling_dbfs: float = DEFAULT_CEILING_DBFS,
+                  start_frame: int = 0, end_frame: Optional[int] = None):
+        """
+        WAV 파일 하나를 블록 단위로 읽어 출력에 이어 붙입니다.
+        start_frame/end_frame을 주면 그 프레임 범위만 이어 붙입니다.
+        gain이 1.0이 아니거나 float WAV면 memmap으로 읽으면서 게인과 피크 리미터를 적용합니다. (float는 16-bit PCM으로 출력)
+        """
+        if gain != 1.0 or read_wav_info(wav_path).is_float:
+            self._write_wav_with_gain(wav_path, gain, ceiling_dbfs, start_frame, end_frame)
+            return
+        with wave.open(wav_path, 'rb') as src:
+            params = (src.getframerate(), src.getnchannels(), src.getsampwidth())
+            if self.sample_rate is None:
+                self._open(*params)
+            elif params != (self.sample_rate, self.channels, self.sampwidth):
+                raise ValueError(f"오디오 포맷이 다른 파일은 병합할 수 없습니다: {wav_path} {params}")
+            end_frame = src.getnframes() if end_frame is None else min(end_frame, src.getnframes())
+            if start_frame:
+                src.setpos(start_frame)
+            remaining = end_frame - start_frame
+            while remaining > 0:
+                frames = src.readframes(min(_BLOCK_FRAMES, remaining))
+                if not frames:
+                    break
+                self.write_frames(frames)
+                remaining -= len(frames) // (self.channels * self.sampwidth)
+
+    def _write_wav_with_gain(self, wav_path: str, gain: float, ceiling_dbfs: float, start_frame: int = 0, end_frame: Optional[int] = None):
+        samples, info = memmap_wav(wav_path)
+        params = (info.sample_rate, info.channels, info.sampwidth)
+        if info.is_float:
+            # float WAV는 16-bit PCM으로 출력합니다.
+            params = (info.sample_rate, info.channels, 2)
+        if self.sample_rate is None:
+            self._open(*params)
+        elif params != (self.sample_rate, self.channels, self.sampwidth):
+            raise ValueError(f"오디오 포맷이 다른 파일은 병합할 수 없습니다: {wav_path} {params}")
+        out_dtype = samples.dtype if not info.is_float else '<i2'
+        end_frame = info.nframes if end_frame is None else min(end_frame, info.nframes)
+        for start in range(start_frame, end_frame, _BLOCK_FRAMES):
+            block = to_float(samples[start:min(start + _BLOCK_FRAMES, end_frame)])
+            self.write_frames(from_float(apply_gain(block, gain, ceiling_dbfs), out_dtype).tobytes())
+
+    def write_silence(self, duration_ms: int):
+        """묵음을 추가합니다. 포맷이 아직 정해지지 않았다면 아무것도 하지 않습니다."""
+        if self.sample_rate is None or duration_ms <= 0:
+            return
+        num_frames = int(self.sample_rate * duration_ms / 1000)
+        # u8 PCM은 128이 무음입니다.
+        fill = b"\x80" if self.sampwidth == 1 else b"\x00"
+        self.write_frames(fill * (num_frames * self.channels * self.sampwidth))
+
+    def close(self) -> Optional[str]:
+        """
+        출력을 마무리합니다.
+        Returns:
+            Optional[str]: 기록된 파일 경로. 아무 프레임도 쓰지 않았다면 None.
+        """
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+        elif self._process is not None:
+            self._process.stdin.close()
+            stderr = self._process.stderr.read().decode('utf-8', errors='replace')
+            return_code = self._process.wait()
+            self._process = None
+            if return_code != 0:
+                raise RuntimeError(f"ffmpeg 인코딩 실패 (코드 {return_code}): {stderr}")
+        if self._peaks is not None and self.frames_written:
+            self._peaks.save(peaks_path_for(self.output_path))
+            self._peaks = None
+        return self.output_path if self.frames_written else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def concat_wavs(wav_paths: list, output_path: str, silence_ms: int = 0) -> Optional[str]:
+    """
+    WAV 파일들을 순서대로 이어 붙여 하나의 WAV로 저장합니다. 파일 사이에는 silence_ms만큼 묵음을 넣습니다.
+    """
+    with AudioSink(output_path, "wav") as sink:
+        for path in wav_paths:
+            if sink.frames_written:
+                sink.write_silence(silence_ms)
+            sink.write_wav(path)
+    return output_path if os.path.exists(output_path) else None
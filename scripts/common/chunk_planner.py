@@ -0,0 +1,201 @@
+import json
+import os
+from array import array
+from typing import List, NamedTuple, Tuple
+
+from common.srt_cues import Cue, CueList
+
+# TTS 엔진에 한 번에 넘길 때 자막 사이에 넣는 구분자
+CHUNK_SEPARATOR = "\nー"
+
+# 문장 끝으로 간주하는 문자
+SENTENCE_ENDINGS = ("。", "！", "？", "!", "?", "…", "♪", "．", ".")
+
+# 일본어 대사의 평균 발화 속도 (초당 글자 수)
+DEFAULT_CHARS_PER_SECOND = 7.0
+
+
+class Chunk(NamedTuple):
+    """TTS 호출 한 번에 해당하는 자막 묶음. first_cue/last_cue는 0부터 시작하는 포함 범위입니다."""
+    index: int
+    first_cue: int
+    last_cue: int
+    text: str
+
+
+def estimate_speech_ms(text: str, chars_per_second: float = DEFAULT_CHARS_PER_SECOND) -> int:
+    """글자 수로 발화 길이(ms)를 추정합니다. 공백과 구분 기호는 세지 않습니다."""
+    spoken = sum(1 for ch in text if not ch.isspace() and ch not in "ー、,")
+    return int(spoken * 1000 / chars_per_second)
+
+
+def flatten_cue_text(text: str) -> str:
+    """여러 줄 자막을 TTS에 넘길 한 줄 텍스트로 만듭니다. 빈 문자열이면 합성하지 않는 자막입니다."""
+    return " ".join(text.split("\n")).strip()
+
+
+def is_sentence_end(text: str) -> bool:
+    return text.rstrip().endswith(SENTENCE_ENDINGS)
+
+
+def plan_chunks(cues: CueList, max_chars: int = 120, max_duration_sec: float = 20.0, max_cues: int = 0,
+                pause_break_ms: int = 1000, chars_per_second: float = DEFAULT_CHARS_PER_SECOND) -> Tuple[List[Chunk], array]:
+    """
+    연속된 자막을 글자 수와 예상 발화 길이 예산 안에서 하나의 TTS 호출로 묶습니다.
+    예산을 넘더라도 문장 경계(문장 부호 또는 pause_break_ms 이상의 쉼)에서만 끊고,
+    경계가 없으면 예산의 두 배에 도달했을 때 강제로 끊습니다.
+    max_cues가 0보다 크면 한 묶음의 자막 수를 그 값으로 제한합니다.
+    Returns:
+        (chunks, cue_to_chunk): cue_to_chunk[i]는 i번째 자막이 속한 chunk의 index (텍스트가 없으면 -1).
+    """
+    max_duration_ms = int(max_duration_sec * 1000)
+    texts = [flatten_cue_text(text) for text in cues.texts]
+    cue_to_chunk = array('i', [-1] * len(cues))
+    chunks: List[Chunk] = []
+
+    current: List[int] = []
+    current_chars = 0
+    current_ms = 0
+
+    def flush():
+        nonlocal current, current_chars, current_ms
+        chunk_texts = [texts[c] for c in current if texts[c]]
+        if chunk_texts:
+            index = len(chunks) + 1
+            chunks.append(Chunk(index, current[0], current[-1], CHUNK_SEPARATOR.join(chunk_texts)))
+            for c in current:
+                if texts[c]:
+                    cue_to_chunk[c] = index
+        current = []
+        current_chars = 0
+        current_ms = 0
+
+    for i in range(len(cues)):
+        text = texts[i]
+        chars = len(text)
+        speech_ms = estimate_speech_ms(text, chars_per_second)
+
+        if current:
+            last = current[-1]
+            at_boundary = is_sentence_end(texts[last]) or cues.starts[i] - cues.ends[last] >= pause_break_ms
+            over_budget = current_chars + chars > max_chars or current_ms + speech_ms > max_duration_ms
+            over_hard_limit = current_chars >= 2 * max_chars or current_ms >= 2 * max_duration_ms
+            if (max_cues > 0 and len(current) >= max_cues) or (over_budget and (at_boundary or over_hard_limit)):
+                flush()
+
+        current.append(i)
+        current_chars += chars
+        current_ms += speech_ms
+
+    if current:
+        flush()
+
+    return chunks, cue_to_chunk
+
+
+def chunk_cue_texts(chunk: Chunk, cues: CueList) -> List[Tuple[int, str]]:
+    """
+    자막별 배치 합성에 넘길 chunk의 자막 목록입니다. 텍스트가 있는 자막만 (1부터 시작하는 자막 번호, 텍스트)로 담으므로
+    chunk.text를 CHUNK_SEPARATOR로 나눈 것과 같은 순서, 같은 개수입니다.
+    """
+    batch = []
+    for c in range(chunk.first_cue, chunk.last_cue + 1):
+        text = flatten_cue_text(cues.texts[c])
+        if text:
+            batch.append((c + 1, text))
+    return batch
+
+
+def chunk_entry(chunk: Chunk, output_file: str, cues: CueList) -> dict:
+    """manifest에 기록하는 chunk 하나의 정보입니다. 자막 구간(start_ms/end_ms)은 구간 재처리에서 chunk를 찾는 데 씁니다."""
+    return {"index": chunk.index, "first_cue": chunk.first_cue, "last_cue": chunk.last_cue,
+            "start_ms": cues.starts[chunk.first_cue], "end_ms": cues.ends[chunk.last_cue],
+            "text": chunk.text, "file": output_file}
+
+
+def save_chunk_plan(plan_path: str, srt_path: str, chunks: List[Chunk], cue_to_chunk: array, output_files: List[str], cues: CueList, **plan_fields):
+    """
+    chunk 구성과 자막-chunk 매핑을 JSON으로 저장하여 나중에 자막 단위로 오디오를 나눌 수 있게 합니다.
+    이 파일은 실행 manifest로도 쓰이며, 병합 후에는 chunk별 오프셋과 샘플 수가 덧붙습니다.
+    plan_fields는 병합 파일 이름 등 최상위 정보로 함께 저장합니다.
+    """
+    write_chunk_plan(plan_path, {
+        "srt_path": srt_path,
+        **plan_fields,
+        "chunks": [chunk_entry(chunk, output_file, cues) for chunk, output_file in zip(chunks, output_files)],
+        "cue_to_chunk": list(cue_to_chunk),
+    })
+
+
+def write_chunk_plan(plan_path: str, plan: dict):
+    """manifest 전체를 저장합니다."""
+    with open(plan_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, ensure_ascii=False, indent=2)
+
+
+def cue_snapshot_path(plan_path: str) -> str:
+    """manifest를 마지막으로 병합했을 때의 자막 사본 경로입니다. 자막이 편집되면 이것과 비교해 바뀐 자막을 찾습니다."""
+    return os.path.splitext(plan_path)[0] + ".srt"
+
+
+def load_chunk_plan(plan_path: str) -> dict:
+    """저장된 chunk 구성(실행 manifest)을 읽습니다."""
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def update_chunk_plan(plan_path: str, fields_by_index: dict, plan_fields: dict = None):
+    """저장된 chunk 구성에 chunk index별 정보(길이, 템포 비율 등)와 최상위 정보를 덧붙입니다."""
+    plan = load_chunk_plan(plan_path)
+    plan.update(plan_fields or {})
+    for entry in plan["chunks"]:
+        entry.update(fields_by_index.get(entry["index"], {}))
+    write_chunk_plan(plan_path, plan)
+
+
+def parse_cue_selection(spec: str, num_cues: int) -> List[int]:
+    """
+    "1-10,15" 같은 1부터 시작하는 자막 번호 선택을 0부터 시작하는 자막 위치 목록으로 바꿉니다.
+    범위를 벗어난 번호는 잘라냅니다.
+    Raises:
+        ValueError: 형식이 잘못되었을 경우.
+    """
+    selected = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            first, last = int(first), int(last)
+        else:
+            first = last = int(part)
+        selected.update(range(max(first, 1) - 1, min(last, num_cues)))
+    return sorted(selected)
+
+
+def chunks_for_cues(cue_indices: List[int], cue_to_chunk: array) -> List[int]:
+    """선택한 자막들이 속한 chunk index 목록을 순서대로 반환합니다."""
+    return sorted({cue_to_chunk[i] for i in cue_indices if cue_to_chunk[i] > 0})
+
+
+def dubbed_cue_timings(plan: dict, cues: CueList) -> List[Cue]:
+    """
+    manifest의 chunk별 병합 오프셋과 샘플 수로 더빙 트랙 기준 자막 타이밍을 계산합니다. 오디오는 읽지 않습니다.
+    chunk 안의 자막은 cue_weights(자막별 합성 길이)가 있으면 그 비율로, 없으면 글자 수 비율로 나눕니다.
+    """
+    sample_rate = plan["sample_rate"]
+    cue_to_chunk = plan["cue_to_chunk"]
+    timings = []
+    for entry in plan["chunks"]:
+        if "offset_frames" not in entry:
+            continue
+        members = [c for c in range(entry["first_cue"], entry["last_cue"] + 1) if cue_to_chunk[c] == entry["index"]]
+        weights = entry.get("cue_weights") or [max(1, len(cues.texts[c].strip())) for c in members]
+        total = float(sum(weights))
+        position = 0
+        for c, weight in zip(members, weights):
+            start = entry["offset_frames"] + entry["frames"] * position / total
+            position += weight
+            end = entry["offset_frames"] + entry["frames"] * position / total
+            timings.append(Cue(len(timings) + 1, int(round(start * 1000 / sample_rate)), int(round(end * 1000 / sample_rate)), cues.texts[c]))
+    return timings
@@ -0,0 +1,78 @@
+import re
+
+from common.srt_cues import Cue
+
+# 문맥 없이도 그대로 두면 되는 짧은 감탄사/맞장구 (문장 부호를 뺀 형태)
+FILLER_WORDS = ("え", "ええ", "えー", "えっ", "あ", "あー", "あっ", "あの", "あのー", "えと", "えっと", "ええと", "えーと",
+                "はい", "うん", "うーん", "ううん", "ん", "んー", "お", "おお", "おー", "ほう", "へえ", "へー", "ふーん", "はあ", "まあ", "ね", "ねえ", "そう")
+# 이 글자 수 이하의 같은 자막이 이어지면 글자를 이어 한 자막으로 합칩니다. (例: え / え / え -> えええ)
+SHORT_CUE_CHARS = 4
+# 이보다 간격이 벌어진 같은 자막은 합치지 않습니다.
+MAX_MERGE_GAP_MS = 1000
+
+_PUNCTUATION = "。、！？…,.!? 　"
+_FILLER_RE = re.compile("(?:" + "|".join(sorted(map(re.escape, FILLER_WORDS), key=len, reverse=True)) + ")+")
+# 반복을 줄이는 글자: 가나와 장음/말줄임/기호만. 숫자, 한자, 영문은 반복이 의미를 가지므로(10000円, 1111番) 건드리지 않습니다.
+_RUN_CHARS = "\u3040-\u30ff\uff66-\uff9f…‥〜～・♪☆★♡♥"
+# 같은 글자가 4번 이상 이어지면 3번으로, 2~10글자 말이 3번 이상 이어지면 2번으로 줄입니다.
+_CHAR_RUN_RE = re.compile(f"([{_RUN_CHARS}])\\1{{3,}}")
+_PHRASE_RUN_RE = re.compile(f"([{_RUN_CHARS}]{{2,10}}?)\\1{{2,}}")
+_RUN_TEXT_RE = re.compile(f"[{_RUN_CHARS}]+")
+_REPEATED_PUNCT_RE = re.compile(r"([。、！？])\1+")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([。、！？])")
+
+
+def normalize_text(text: str) -> str:
+    """
+    공백과 문장 부호를 정리하고 의미 없는 반복을 줄입니다.
+    줄바꿈은 공백으로 합치고, 반각 ?/!는 전각으로 바꾸고, 같은 문장 부호가 이어지면 하나만 남기며, 문장 부호 앞의 공백을 지웁니다.
+    """
+    text = " ".join(text.split())
+    text = text.replace("?", "？").replace("!", "！")
+    text = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+    text = _REPEATED_PUNCT_RE.sub(r"\1", text)
+    text = _CHAR_RUN_RE.sub(r"\1\1\1", text)
+    return _PHRASE_RUN_RE.sub(r"\1\1", text)
+
+
+def strip_punctuation(text: str) -> str:
+    return "".join(ch for ch in text if ch not in _PUNCTUATION)
+
+
+def is_trivial_text(text: str) -> bool:
+    """
+    문장 부호를 빼면 비었거나, 감탄사/맞장구만 있거나, 가나/기호 한 글자만 반복되는 자막인지 확인합니다.
+    한자나 숫자 한 글자(嘘, 11)는 잘못 들은 말일 수 있으므로 문맥을 보고 교정하도록 모델에 보냅니다.
+    """
+    core = strip_punctuation(text)
+    return not core or (len(set(core)) == 1 and _RUN_TEXT_RE.fullmatch(core) is not None) or _FILLER_RE.fullmatch(core) is not None
+
+
+def prefilter_cues(subtitles: list):
+    """
+    모델 없이 정할 수 있는 부분을 먼저 처리합니다. 모든 자막의 문장 부호와 반복을 정리하고,
+    간격이 MAX_MERGE_GAP_MS 이하로 이어지는 같은 자막(문장 부호 무시)을 합칩니다. 가나로만 된 짧은 자막은 글자를 이어 붙이고
+    (え / え。 -> ええ。), 그 밖의 자막은 한 번만 남깁니다(변환 반복 오류). 숫자는 이어 붙이면 다른 수가 되므로 잇지 않습니다.
+    Returns:
+        (cues, needs_model): 정리된 자막 목록과, 자막마다 문맥을 보고 교정해야 하는지 여부.
+            감탄사/맞장구/가나 한 글자 반복 자막은 False입니다.
+    """
+    cues = []
+    last_core = None
+    for sub in subtitles:
+        text = normalize_text(sub.text)
+        core = strip_punctuation(text)
+        if cues and core and core == last_core and sub.start - cues[-1].end <= MAX_MERGE_GAP_MS:
+            previous = cues[-1]
+            merged_text = normalize_text(strip_punctuation(previous.text) + text) if len(core) <= SHORT_CUE_CHARS and _RUN_TEXT_RE.fullmatch(core) else previous.text
+            cues[-1] = Cue(previous.index, previous.start, max(previous.end, sub.end), merged_text)
+            continue
+        cues.append(Cue(len(cues) + 1, sub.start, sub.end, text))
+        last_core = core
+    return cues, [not is_trivial_text(cue.text) for cue in cues]
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 어림합니다. 영문은 4글자, 그 밖의 글자는 1글자를 1토큰으로 봅니다."""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + len(text) - ascii_chars
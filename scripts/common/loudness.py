@@ -0,0 +1,86 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from common.wav_io import memmap_wav, to_float
+
+# BS.1770과 같은 400ms 블록 / -70dBFS 절대 게이트
+BLOCK_MS = 400
+ABSOLUTE_GATE_DBFS = -70.0
+
+DEFAULT_TARGET_DBFS = -20.0
+DEFAULT_MAX_GAIN_DB = 12.0
+DEFAULT_CEILING_DBFS = -1.0
+
+
+def measure_loudness(wav_paths: List[str], block_ms: int = BLOCK_MS, gate_dbfs: float = ABSOLUTE_GATE_DBFS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    여러 chunk WAV의 게이트 적용 RMS 음량(dBFS)과 피크(선형)를 계산합니다.
+    각 파일은 memmap으로 열어 블록별 제곱 평균만 구하고, 게이트와 파일별 평균은
+    모든 chunk의 블록을 모은 배열에 대해 한 번에 벡터 연산으로 처리합니다.
+    Returns:
+        (loudness_db, peaks): 파일 순서대로의 배열. 무음 파일의 음량은 -inf입니다.
+    """
+    block_energy = []
+    block_owner = []
+    peaks = np.zeros(len(wav_paths), dtype=np.float32)
+
+    for i, path in enumerate(wav_paths):
+        samples, info = memmap_wav(path)
+        if info.nframes == 0:
+            continue
+        mono = to_float(samples).mean(axis=1)
+        peaks[i] = np.abs(mono).max()
+        block = max(1, info.sample_rate * block_ms // 1000)
+        if len(mono) >= block:
+            # 마지막 불완전 블록은 버립니다.
+            num_blocks = len(mono) // block
+            energies = np.square(mono[:num_blocks * block]).reshape(num_blocks, block).mean(axis=1)
+        else:
+            energies = np.array([np.square(mono).mean()])
+        block_energy.append(energies)
+        block_owner.append(np.full(len(energies), i, dtype=np.int64))
+
+    if not block_energy:
+        return np.full(len(wav_paths), -np.inf), peaks
+
+    energy = np.concatenate(block_energy)
+    owner = np.concatenate(block_owner)
+    gate = 10.0 ** (gate_dbfs / 10.0)
+    gated = energy >= gate
+    sums = np.bincount(owner[gated], weights=energy[gated], minlength=len(wav_paths))
+    counts = np.bincount(owner[gated], minlength=len(wav_paths))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loudness_db = np.where(counts > 0, 10.0 * np.log10(sums / np.maximum(counts, 1)), -np.inf)
+    return loudness_db, peaks
+
+
+def compute_gains(loudness_db: np.ndarray, peaks: np.ndarray, target_dbfs: float = DEFAULT_TARGET_DBFS,
+                  max_gain_db: float = DEFAULT_MAX_GAIN_DB, ceiling_dbfs: float = DEFAULT_CEILING_DBFS) -> np.ndarray:
+    """
+    chunk별 선형 게인을 계산합니다. 증폭은 max_gain_db로 제한하고,
+    게인 적용 후 피크가 ceiling을 크게 넘지 않도록(리미터가 처리할 수 있는 6dB 이내) 줄입니다.
+    무음 chunk의 게인은 1.0입니다.
+    """
+    gain_db = np.clip(target_dbfs - loudness_db, -max_gain_db, max_gain_db)
+    gain_db = np.where(np.isfinite(loudness_db), gain_db, 0.0)
+    with np.errstate(divide='ignore'):
+        peak_db = 20.0 * np.log10(np.maximum(peaks, 1e-9))
+    gain_db = np.minimum(gain_db, ceiling_dbfs + 6.0 - peak_db)
+    return (10.0 ** (gain_db / 20.0)).astype(np.float32)
+
+
+def apply_gain(samples: np.ndarray, gain: float, ceiling_dbfs: float = DEFAULT_CEILING_DBFS) -> np.ndarray:
+    """
+    float 샘플에 게인을 적용하고 소프트 리미터로 피크를 ceiling 아래로 누릅니다.
+    ceiling의 90% 이하 구간은 그대로 두고, 그 위는 tanh 곡선으로 압축합니다.
+    """
+    out = samples * np.float32(gain)
+    ceiling = np.float32(10.0 ** (ceiling_dbfs / 20.0))
+    knee = np.float32(0.9) * ceiling
+    magnitude = np.abs(out)
+    over = magnitude > knee
+    if over.any():
+        headroom = ceiling - knee
+        out[over] = np.sign(out[over]) * (knee + headroom * np.tanh((magnitude[over] - knee) / headroom))
+    return out
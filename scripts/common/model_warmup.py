@@ -0,0 +1,135 @@
+import os
+import tempfile
+import threading
+from typing import List, Optional
+
+from common.reference_audio import prepare_reference_audio
+from common.tts_engine import TTSEngine, publish_reference_audio
+from common.tts_runner import ChunkSynthesisError
+
+# TTS 서버를 예열할 때 합성하는 짧은 문장 (언어별)
+WARMUP_TEXTS = {"ja": "こんにちは。", "ko": "안녕하세요.", "en": "Hello there.", "zh": "你好。"}
+# 예열 합성 한 번의 최대 시간 (초). 서버가 모델을 처음 올리는 시간까지 포함합니다.
+WARMUP_TIMEOUT_SEC = 300.0
+
+
+class ModelWarmup:
+    """
+    UI가 뜰 때 현재 옵션에 맞는 모델과 참조 오디오를 작업 스레드에서 미리 준비합니다.
+    Whisper 모델 로드, 참조 오디오 전처리(디스크 캐시에 남음), TTS 서버 예열 합성을 차례로 수행하고,
+    진행 상태를 status에 남깁니다. UI는 이를 주기적으로 읽어 표시합니다.
+    옵션이 바뀌어 request()가 다시 불리면 이전 예열은 현재 단계가 끝나는 대로 멈추고 새 옵션으로 다시 시작합니다.
+    """
+
+    def __init__(self, reference_cache_dir: str, server_reference_dir: str):
+        self.reference_cache_dir = reference_cache_dir
+        self.server_reference_dir = server_reference_dir
+        self.status = "예열 대기 중"
+        self.ready = False
+        self._lock = threading.Condition()
+        # 무거운 단계는 한 번에 하나만 실행합니다. 모델을 두 개 동시에 올리지 않도록 합니다.
+        self._work_lock = threading.Lock()
+        self._generation = 0
+        self._settings = None
+        self._whisper_size = None
+        self._whisper_model = None
+        # 가장 최근 요청이 올리려는 Whisper 크기. 로드에 실패하면 None으로 돌립니다.
+        self._wanted_size = None
+
+    def request(self, model_size: Optional[str], language: str, reference_audios: List[str], tts_server_url: Optional[str]):
+        """
+        옵션에 맞춰 예열을 시작합니다. 같은 옵션이면 아무것도 하지 않습니다.
+        model_size가 None이면 Whisper 모델은 올리지 않습니다 (합성 전용 UI).
+        """
+        settings = (model_size, language, tuple(reference_audios), tts_server_url or None)
+        with self._lock:
+            if settings == self._settings:
+                return
+            self._settings = settings
+            self._generation += 1
+            generation = self._generation
+            self.ready = False
+            self.status = "예열 준비 중..."
+            self._wanted_size = model_size
+            self._lock.notify_all()
+        threading.Thread(target=self._run, args=(generation,) + settings, daemon=True).start()
+
+    def whisper_model(self, model_size: str):
+        """
+        예열된 Whisper 모델을 반환합니다. 같은 크기를 올리는 중이거나 올릴 차례면 끝날 때까지 기다리고,
+        다른 크기를 예열 중이거나 로드에 실패했으면 None (호출한 쪽에서 직접 로드).
+        """
+        with self._lock:
+            while self._wanted_size == model_size and self._whisper_size != model_size:
+                self._lock.wait()
+            return self._whisper_model if self._whisper_size == model_size else None
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _set_status(self, generation: int, status: str, ready: bool = False):
+        with self._lock:
+            if generation == self._generation:
+                self.status = status
+                self.ready = ready
+
+    def _run(self, generation: int, model_size: Optional[str], language: str, reference_audios: tuple, tts_server_url: Optional[str]):
+        with self._work_lock:
+            try:
+                if model_size and self._is_current(generation):
+                    self._load_whisper(generation, model_size)
+
+                prepared_references = []
+                for reference_audio in reference_audios:
+                    if not self._is_current(generation):
+                        return
+                    self._set_status(generation, f"참조 오디오 전처리 중: {os.path.basename(reference_audio)}")
+                    prepared = prepare_reference_audio(reference_audio, self.reference_cache_dir)
+                    if tts_server_url:
+                        prepared = publish_reference_audio(prepared, self.server_reference_dir)
+                    prepared_references.append(prepared)
+
+                if tts_server_url and self._is_current(generation):
+                    self._set_status(generation, f"TTS 서버 예열 중 ({language})...")
+                    self._warm_tts_server(tts_server_url, language, prepared_references[0] if prepared_references else None)
+
+                parts = [f"Whisper {model_size}"] if model_size else []
+                parts.append(f"참조 오디오 {len(reference_audios)}개" if reference_audios else "기본 목소리")
+                parts.append(f"TTS 서버 ({language})" if tts_server_url else "command.py (호출마다 모델 로드)")
+                self._set_status(generation, "준비 완료: " + ", ".join(parts), ready=True)
+            except Exception as e:
+                self._set_status(generation, f"예열 실패: {e}")
+
+    def _load_whisper(self, generation: int, model_size: str):
+        if self._whisper_size == model_size:
+            return
+        self._set_status(generation, f"Whisper {model_size} 모델 로드 중...")
+        with self._lock:
+            # 이전 크기의 모델은 새 모델을 올리기 전에 놓아 메모리를 비웁니다.
+            self._whisper_model, self._whisper_size = None, None
+        model = None
+        try:
+            import whisper
+            from common.gpu_utils import get_device
+            model = whisper.load_model(model_size, device=get_device())
+        finally:
+            with self._lock:
+                if model is not None:
+                    self._whisper_model, self._whisper_size = model, model_size
+                elif self._wanted_size == model_size:
+                    self._wanted_size = None
+                self._lock.notify_all()
+
+    def _warm_tts_server(self, tts_server_url: str, language: str, reference_audio: Optional[str]):
+        """서버에 짧은 문장을 한 번 합성시켜 모델과 목소리 조건을 올려 둡니다."""
+        engine = TTSEngine(server_url=tts_server_url, timeout_sec=WARMUP_TIMEOUT_SEC, retries=0)
+        fd, output_path = tempfile.mkstemp(suffix=".wav", prefix="tts_warmup_")
+        os.close(fd)
+        try:
+            engine.synthesize(WARMUP_TEXTS.get(language, WARMUP_TEXTS["en"]), output_path, reference_audio, language, 0.8, 1.0, 0.6, 0)
+        except ChunkSynthesisError as e:
+            raise RuntimeError(f"TTS 서버가 응답하지 않습니다 ({tts_server_url}): {e.reasons[-1]}")
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
@@ -0,0 +1,202 @@
+import os
+import struct
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from common.wav_io import memmap_wav, to_float
+
+# 가장 세밀한 단계에서 peak 하나가 대표하는 샘플 수와, 단계마다 묶는 배수
+BASE_SAMPLES_PER_PEAK = 256
+LEVEL_FACTOR = 4
+NUM_LEVELS = 6
+
+_MAGIC = b"RVPK"
+_VERSION = 1
+# magic, version, sample_rate, base_samples_per_peak, level_factor, num_levels
+_HEADER = struct.Struct("<4sHIIHH")
+
+# 피크를 계산할 때 한 번에 읽는 샘플 수
+_BLOCK_FRAMES = BASE_SAMPLES_PER_PEAK * 1024
+
+
+def peaks_path_for(audio_path: str) -> str:
+    """오디오 파일 옆에 두는 peak 파일 경로입니다."""
+    return audio_path + ".peaks"
+
+
+class PeakBuilder:
+    """
+    흘러 들어오는 PCM에서 여러 해상도의 min/max peak를 만듭니다.
+    가장 세밀한 단계만 블록마다 계산하고, 나머지 단계는 끝날 때 그 결과를 묶어 만들므로 추가 비용이 거의 없습니다.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._mins = []
+        self._maxs = []
+
+    def add(self, samples: np.ndarray):
+        """(frames, channels) 또는 (frames,) 샘플을 추가합니다. 여러 채널은 평균하여 하나로 봅니다."""
+        values = to_float(samples)
+        if values.ndim == 2:
+            values = values.mean(axis=1) if values.shape[1] > 1 else values[:, 0]
+        values = np.concatenate([self._remainder, values])
+        usable = (len(values) // BASE_SAMPLES_PER_PEAK) * BASE_SAMPLES_PER_PEAK
+        if usable:
+            blocks = values[:usable].reshape(-1, BASE_SAMPLES_PER_PEAK)
+            self._mins.append(blocks.min(axis=1))
+            self._maxs.append(blocks.max(axis=1))
+        self._remainder = values[usable:]
+
+    def add_silence(self, num_frames: int):
+        """묵음 프레임을 추가합니다."""
+        self.add(np.zeros(num_frames, dtype=np.float32))
+
+    def finish(self) -> List[np.ndarray]:
+        """모든 단계의 peak를 (n, 2) int16 배열 목록으로 반환합니다. 0단계가 가장 세밀합니다."""
+        mins = self._mins + ([self._remainder.min(keepdims=True)] if self._remainder.size else [])
+        maxs = self._maxs + ([self._remainder.max(keepdims=True)] if self._remainder.size else [])
+        self._remainder = np.zeros(0, dtype=np.float32)
+        level = np.stack([np.concatenate(mins or [np.zeros(0, np.float32)]),
+                          np.concatenate(maxs or [np.zeros(0, np.float32)])], axis=1)
+        level = np.clip(np.rint(level * 32767), -32768, 32767).astype('<i2')
+        levels = [level]
+        for _ in range(1, NUM_LEVELS):
+            prev = levels[-1]
+            n = (len(prev) + LEVEL_FACTOR - 1) // LEVEL_FACTOR
+            if n == 0:
+                levels.append(prev[:0])
+                continue
+            padded = np.concatenate([prev, np.repeat(prev[-1:], n * LEVEL_FACTOR - len(prev), axis=0)])
+            grouped = padded.reshape(n, LEVEL_FACTOR, 2)
+            levels.append(np.stack([grouped[:, :, 0].min(axis=1), grouped[:, :, 1].max(axis=1)], axis=1))
+        return levels
+
+    def save(self, peaks_path: str):
+        """peak 파일을 임시 파일에 쓴 뒤 교체합니다."""
+        levels = self.finish()
+        temp_path = peaks_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.sample_rate, BASE_SAMPLES_PER_PEAK, LEVEL_FACTOR, len(levels)))
+            f.write(struct.pack(f"<{len(levels)}Q", *[len(level) for level in levels]))
+            for level in levels:
+                f.write(level.tobytes())
+        os.replace(temp_path, peaks_path)
+
+
+class PeakFile:
+    """
+    저장된 peak 파일입니다. 각 단계는 memmap으로 열리므로 화면에 필요한 부분만 읽습니다.
+    """
+
+    def __init__(self, peaks_path: str):
+        with open(peaks_path, 'rb') as f:
+            magic, version, self.sample_rate, self.base_samples, self.level_factor, num_levels = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"peak 파일 형식이 아닙니다: {peaks_path}")
+            counts = struct.unpack(f"<{num_levels}Q", f.read(8 * num_levels))
+        offset = _HEADER.size + 8 * num_levels
+        self.levels = []
+        for count in counts:
+            if count:
+                self.levels.append(np.memmap(peaks_path, dtype='<i2', mode='r', offset=offset, shape=(count, 2)))
+            else:
+                self.levels.append(np.zeros((0, 2), dtype='<i2'))
+            offset += count * 4
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.levels[0]) * self.base_samples / self.sample_rate if self.levels else 0.0
+
+    def samples_per_peak(self, level: int) -> int:
+        return self.base_samples * self.level_factor ** level
+
+    def select(self, start_sec: float, end_sec: float, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        [start_sec, end_sec) 구간을 width개 열로 나눈 min/max(-1.0 ~ 1.0)를 반환합니다.
+        열 하나에 peak가 한 개 이상 들어가는 가장 거친 단계를 골라 읽습니다.
+        """
+        width = max(1, width)
+        span_samples = max(1.0, (end_sec - start_sec) * self.sample_rate)
+        level = 0
+        while level + 1 < len(self.levels) and span_samples / self.samples_per_peak(level + 1) >= width:
+            level += 1
+        peaks = self.levels[level]
+        per_peak = self.samples_per_peak(level)
+        first = max(0, int(start_sec * self.sample_rate / per_peak))
+        last = min(len(peaks), int(np.ceil(end_sec * self.sample_rate / per_peak)))
+        if last <= first:
+            return np.zeros(width, np.float32), np.zeros(width, np.float32)
+        window = np.asarray(peaks[first:last], dtype=np.float32) / 32767.0
+        if len(window) < width:
+            # 확대해서 peak보다 열이 많으면 peak 하나를 여러 열에 걸쳐 그립니다.
+            index = np.arange(width) * len(window) // width
+            return window[index, 0], window[index, 1]
+        edges = np.linspace(0, len(window), width + 1).astype(np.int64)[:-1]
+        return np.minimum.reduceat(window[:, 0], edges), np.maximum.reduceat(window[:, 1], edges)
+
+
+def build_peaks_for_wav(wav_path: str, peaks_path: Optional[str] = None) -> str:
+    """WAV 파일을 memmap 블록 단위로 읽어 peak 파일을 만듭니다."""
+    samples, info = memmap_wav(wav_path)
+    builder = PeakBuilder(info.sample_rate)
+    for start in range(0, info.nframes, _BLOCK_FRAMES):
+        builder.add(samples[start:start + _BLOCK_FRAMES])
+    peaks_path = peaks_path or peaks_path_for(wav_path)
+    builder.save(peaks_path)
+    return peaks_path
+
+
+def load_peaks(audio_path: str) -> PeakFile:
+    """
+    오디오 파일의 peak 파일을 엽니다. 없거나 오디오보다 오래되었으면 WAV에서 다시 만듭니다.
+    Raises:
+        FileNotFoundError: WAV가 아닌 파일에 peak 파일이 없는 경우.
+    """
+    peaks_path = peaks_path_for(audio_path)
+    if not os.path.exists(peaks_path) or os.path.getmtime(peaks_path) < os.path.getmtime(audio_path):
+        if not audio_path.lower().endswith(".wav"):
+            raise FileNotFoundError(f"peak 파일이 없습니다: {peaks_path}")
+        build_peaks_for_wav(audio_path, peaks_path)
+    return PeakFile(peaks_path)
+
+
+def update_peaks_range(audio_path: str, start_frame: int, end_frame: int):
+    """
+    WAV의 [start_frame, end_frame) 구간만 바뀌었을 때 peak 파일에서 그 구간에 해당하는 값만 다시 계산합니다.
+    peak 파일이 없거나 길이가 맞지 않으면 다음에 열 때 새로 만들어지도록 둡니다.
+    """
+    peaks_path = peaks_path_for(audio_path)
+    if not os.path.exists(peaks_path):
+        return
+    samples, info = memmap_wav(audio_path)
+    peak_file = PeakFile(peaks_path)
+    if peak_file.sample_rate != info.sample_rate or len(peak_file.levels[0]) != -(-info.nframes // peak_file.base_samples):
+        os.remove(peaks_path)
+        return
+
+    first = start_frame // peak_file.base_samples
+    last = min(len(peak_file.levels[0]), -(-end_frame // peak_file.base_samples))
+    builder = PeakBuilder(info.sample_rate)
+    builder.add(samples[first * peak_file.base_samples:last * peak_file.base_samples])
+    del samples
+    writable = [np.memmap(peaks_path, dtype='<i2', mode='r+', offset=level.offset, shape=level.shape) if isinstance(level, np.memmap) else level
+                for level in peak_file.levels]
+    writable[0][first:last] = builder.finish()[0]
+    for level in range(1, len(writable)):
+        prev = writable[level - 1]
+        first //= peak_file.level_factor
+        last = min(len(writable[level]), -(-last // peak_file.level_factor))
+        if last <= first:
+            break
+        block = np.asarray(prev[first * peak_file.level_factor:last * peak_file.level_factor])
+        edges = np.arange(0, len(block), peak_file.level_factor)
+        writable[level][first:last] = np.stack([np.minimum.reduceat(block[:, 0], edges), np.maximum.reduceat(block[:, 1], edges)], axis=1)
+    for level in writable:
+        if isinstance(level, np.memmap):
+            level.flush()
+    del writable
+    # 오디오보다 오래된 peak 파일은 다시 만들어지므로 수정 시각을 갱신합니다.
+    os.utime(peaks_path)
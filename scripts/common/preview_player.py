@@ -0,0 +1,49 @@
+import queue
+import subprocess
+import threading
+
+
+class PreviewPlayer:
+    """
+    미리 듣기용 오디오를 들어온 순서대로 백그라운드에서 재생합니다.
+    ffmpeg에 포함된 ffplay를 사용하며, 재생은 합성 진행을 막지 않습니다.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._process = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def play(self, wav_path: str):
+        """재생 대기열에 파일을 추가합니다."""
+        self._queue.put(wav_path)
+
+    def _run(self):
+        while True:
+            wav_path = self._queue.get()
+            if wav_path is None or self._stopped:
+                return
+            try:
+                self._process = subprocess.Popen(
+                    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", wav_path],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                self._process.wait()
+            except FileNotFoundError:
+                print("오류: ffplay가 설치되어 있지 않아 미리 듣기를 재생할 수 없습니다.")
+                return
+            finally:
+                self._process = None
+
+    def finish(self):
+        """대기열의 파일을 모두 재생한 뒤 종료하도록 합니다."""
+        self._queue.put(None)
+
+    def stop(self):
+        """재생을 즉시 멈춥니다."""
+        self._stopped = True
+        self._queue.put(None)
+        if self._process is not None:
+            self._process.terminate()
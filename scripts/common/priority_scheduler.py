@@ -0,0 +1,59 @@
+import itertools
+import queue
+import threading
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+# 높은 우선순위(미리 듣기)와 일반 작업
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+
+
+class PriorityScheduler:
+    """
+    우선순위 큐에서 작업을 꺼내 실행하는 작은 스레드 풀입니다.
+    숫자가 작은 우선순위가 먼저 실행되고, 같은 우선순위는 제출 순서대로 실행됩니다.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self._jobs = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._sequence = itertools.count()
+        self._submitted = 0
+        self._threads = []
+        self._cancelled = threading.Event()
+
+    def submit(self, priority: int, key: Any, fn: Callable, *args, **kwargs):
+        """작업을 제출합니다. 완료되면 as_completed에서 key와 함께 돌려받습니다."""
+        self._jobs.put((priority, next(self._sequence), key, fn, args, kwargs))
+        self._submitted += 1
+
+    def _worker(self):
+        while True:
+            try:
+                _, _, key, fn, args, kwargs = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if self._cancelled.is_set():
+                self._results.put((key, None, RuntimeError("작업이 취소되었습니다.")))
+                continue
+            try:
+                self._results.put((key, fn(*args, **kwargs), None))
+            except Exception as e:
+                self._results.put((key, None, e))
+
+    def as_completed(self) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        작업 스레드를 시작하고, 끝나는 순서대로 (key, 결과, 예외)를 돌려줍니다.
+        """
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        for _ in range(self._submitted):
+            yield self._results.get()
+        self._submitted = 0
+
+    def cancel(self):
+        """아직 시작하지 않은 작업을 취소합니다. 실행 중인 작업은 끝까지 진행됩니다."""
+        self._cancelled.set()
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import subprocess
+from typing import Optional
+
+# config.yaml의 audio_output.sample_rate / max_reference_duration_sec 값과 맞춥니다.
+DEFAULT_SAMPLE_RATE = 24000
+DEFAULT_MAX_DURATION_SEC = 30
+DEFAULT_TARGET_LUFS = -20.0
+
+# 같은 세션 안에서 같은 파일을 다시 해시하지 않도록 (경로, 크기, 수정 시각) 기준으로 기억합니다.
+_prepared_paths = {}
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256 해시를 블록 단위로 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prepare_reference_audio(source_path: Optional[str], cache_dir: str, sample_rate: int = DEFAULT_SAMPLE_RATE,
+                            max_duration_sec: float = DEFAULT_MAX_DURATION_SEC, target_lufs: float = DEFAULT_TARGET_LUFS) -> Optional[str]:
+    """
+    참조 오디오를 TTS 엔진에 맞게 한 번만 전처리하고 캐시된 WAV 경로를 반환합니다.
+    앞쪽 무음 제거, max_duration_sec 길이 제한, 모노 변환, sample_rate 리샘플링, 음량 정규화를 수행합니다.
+    캐시 키는 원본 파일 내용의 해시와 전처리 설정이므로, 파일 이름이 바뀌어도 다시 처리하지 않습니다.
+    Args:
+        source_path (Optional[str]): 원본 참조 오디오 경로. 없으면 그대로 반환합니다.
+        cache_dir (str): 전처리 결과를 저장할 디렉터리.
+    Returns:
+        Optional[str]: 전처리된 WAV 경로.
+    Raises:
+        subprocess.CalledProcessError: ffmpeg 실행에 실패할 경우.
+    """
+    if not source_path or not os.path.exists(source_path):
+        return source_path
+
+    stat = os.stat(source_path)
+    settings = (sample_rate, max_duration_sec, target_lufs)
+    memo_key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns, settings)
+    cached_path = _prepared_paths.get(memo_key)
+    if cached_path and os.path.exists(cached_path):
+        return cached_path
+
+    settings_tag = f"{sample_rate}hz_{max_duration_sec:g}s_{target_lufs:g}lufs"
+    cached_path = os.path.join(cache_dir, f"{file_sha256(source_path)[:20]}_{settings_tag}.wav")
+
+    if not os.path.exists(cached_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = cached_path + ".tmp.wav"
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-i", source_path,
+            "-af", f"silenceremove=start_periods=1:start_threshold=-50dB,loudnorm=I={target_lufs:g}:TP=-1.5:LRA=11",
+            "-t", str(max_duration_sec),
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-c:a", "pcm_s16le",
+            temp_path
+        ]
+        print(f"참조 오디오 전처리 중: {os.path.basename(source_path)}")
+        try:
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except subprocess.CalledProcessError as e:
+            print("ffmpeg 참조 오디오 전처리 중 오류 발생:")
+            print(e.stderr.decode('utf-8', errors='replace'))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, cached_path)
+        print(f"참조 오디오 캐시 저장: {cached_path}")
+    else:
+        print(f"캐시된 참조 오디오 사용: {cached_path}")
+
+    _prepared_paths[memo_key] = cached_path
+    return cached_path
@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+from typing import Any, Callable, Iterable, Iterator
+
+import torch
+
+# fork된 작업 프로세스가 상속받는 모델. 부모가 설정한 뒤 풀을 만듭니다.
+_shared_model = None
+
+
+def share_model_weights(model):
+    """
+    모델 파라미터와 버퍼를 공유 메모리로 옮깁니다.
+    이후 fork된 프로세스들은 가중치를 복사하지 않고 같은 메모리 페이지를 읽습니다.
+    """
+    model.eval()
+    model.share_memory()
+    return model
+
+
+def get_shared_model():
+    """현재 프로세스가 상속받은 공유 모델을 반환합니다."""
+    if _shared_model is None:
+        raise RuntimeError("공유 모델이 설정되지 않았습니다. run_forked_pool 안에서만 사용할 수 있습니다.")
+    return _shared_model
+
+
+def _init_worker(threads_per_worker: int):
+    # 작업 프로세스마다 CPU 코어 전체를 쓰면 서로 경쟁하므로 스레드 수를 나눠 줍니다.
+    torch.set_num_threads(threads_per_worker)
+
+
+def _call_with_model(payload):
+    fn, args = payload
+    return fn(get_shared_model(), *args)
+
+
+def run_forked_pool(model, fn: Callable[..., Any], jobs: Iterable[tuple], workers: int) -> Iterator[Any]:
+    """
+    공유 메모리에 올린 모델 하나로 jobs를 workers개의 fork된 프로세스에서 나누어 실행합니다.
+    fn은 모듈 최상위 함수여야 하며 fn(model, *job) 형태로 호출됩니다. 결과는 jobs 순서대로 돌려줍니다.
+    CPU 추론 전용입니다. CUDA 컨텍스트는 fork 이후에 쓸 수 없습니다.
+    """
+    global _shared_model
+    if "fork" not in multiprocessing.get_all_start_methods():
+        raise RuntimeError("이 플랫폼은 fork를 지원하지 않아 공유 모델 풀을 사용할 수 없습니다.")
+
+    _shared_model = share_model_weights(model)
+    threads_per_worker = max(1, (os.cpu_count() or 1) // max(1, workers))
+    context = multiprocessing.get_context("fork")
+    try:
+        with context.Pool(workers, initializer=_init_worker, initargs=(threads_per_worker,)) as pool:
+            for result in pool.imap(_call_with_model, [(fn, tuple(job)) for job in jobs]):
+                yield result
+    finally:
+        _shared_model = None
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from common.wav_io import copy_wav_frames, memmap_wav, to_float
+
+# 에너지 엔벨로프를 계산하는 프레임 길이
+FRAME_MS = 10
+# 이 값보다 조용한 프레임을 묵음으로 봅니다. (dBFS)
+DEFAULT_THRESHOLD_DBFS = -45.0
+# 말소리가 잘리지 않도록 앞뒤에 남겨 두는 여유
+DEFAULT_PAD_MS = 40
+
+# 자막 사이 쉼을 그대로 쓰되, 너무 붙거나 너무 벌어지지 않게 제한합니다.
+DEFAULT_MIN_GAP_MS = 80
+DEFAULT_MAX_GAP_MS = 1500
+
+
+def frame_energy_dbfs(samples: np.ndarray, sample_rate: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """
+    (frames, channels) 샘플의 프레임별 RMS 에너지를 dBFS로 계산합니다. 마지막 부분 프레임도 포함합니다.
+    """
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    mono = to_float(samples).mean(axis=1) if samples.ndim == 2 else to_float(samples)
+    num_frames = (len(mono) + frame_len - 1) // frame_len
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    padded = np.zeros(num_frames * frame_len, dtype=np.float32)
+    padded[:len(mono)] = mono
+    rms = np.sqrt(np.mean(np.square(padded.reshape(num_frames, frame_len)), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def find_speech_bounds(energy_db: np.ndarray, threshold_dbfs: float = DEFAULT_THRESHOLD_DBFS) -> Optional[Tuple[int, int]]:
+    """
+    에너지 엔벨로프에서 threshold를 넘는 첫 프레임과 마지막 프레임 다음 위치를 반환합니다. 전부 묵음이면 None.
+    """
+    voiced = np.flatnonzero(energy_db > threshold_dbfs)
+    if voiced.size == 0:
+        return None
+    return int(voiced[0]), int(voiced[-1]) + 1
+
+
+def trim_wav_silence(wav_path: str, threshold_dbfs: float = DEFAULT_THRESHOLD_DBFS, pad_ms: int = DEFAULT_PAD_MS,
+                     frame_ms: int = FRAME_MS) -> Tuple[int, int]:
+    """
+    WAV 파일 앞뒤의 묵음을 잘라 제자리에 다시 씁니다. 전부 묵음인 파일은 건드리지 않습니다.
+    Returns:
+        Tuple[int, int]: 잘라 낸 앞/뒤 길이 (ms).
+    """
+    samples, info = memmap_wav(wav_path)
+    bounds = find_speech_bounds(frame_energy_dbfs(samples, info.sample_rate, frame_ms), threshold_dbfs)
+    del samples
+    if bounds is None:
+        return 0, 0
+
+    frame_len = max(1, info.sample_rate * frame_ms // 1000)
+    pad = info.sample_rate * pad_ms // 1000
+    start = max(0, bounds[0] * frame_len - pad)
+    end = min(info.nframes, bounds[1] * frame_len + pad)
+    if start == 0 and end == info.nframes:
+        return 0, 0
+
+    temp_path = wav_path + ".trim.wav"
+    copy_wav_frames(wav_path, temp_path, start, end)
+    os.replace(temp_path, wav_path)
+    return start * 1000 // info.sample_rate, (info.nframes - end) * 1000 // info.sample_rate
+
+
+def _trim_job(job):
+    return trim_wav_silence(*job)
+
+
+def trim_silence_files(wav_paths: List[str], workers: int = 0, threshold_dbfs: float = DEFAULT_THRESHOLD_DBFS,
+                       pad_ms: int = DEFAULT_PAD_MS) -> List[Tuple[int, int]]:
+    """
+    여러 WAV 파일의 앞뒤 묵음을 작업 프로세스들에서 병렬로 잘라 냅니다.
+    workers가 0이면 CPU 코어 수만큼 사용합니다.
+    Returns:
+        List[Tuple[int, int]]: 파일별로 잘라 낸 앞/뒤 길이 (ms).
+    """
+    if not wav_paths:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(wav_paths))
+    jobs = [(path, threshold_dbfs, pad_ms) for path in wav_paths]
+    if workers == 1:
+        return [_trim_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_trim_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def pause_gaps_ms(cue_starts, cue_ends, first_cues: List[int], last_cues: List[int],
+                  min_gap_ms: int = DEFAULT_MIN_GAP_MS, max_gap_ms: int = DEFAULT_MAX_GAP_MS) -> np.ndarray:
+    """
+    이어지는 chunk 사이의 원본 자막 쉼(앞 chunk 마지막 자막 끝 ~ 다음 chunk 첫 자막 시작)을 간격으로 씁니다.
+    Returns:
+        np.ndarray: chunk마다 앞에 넣을 묵음 길이 (ms). 첫 chunk는 0입니다.
+    """
+    starts = np.asarray(cue_starts, dtype=np.int64)[np.asarray(first_cues, dtype=np.int64)]
+    ends = np.asarray(cue_ends, dtype=np.int64)[np.asarray(last_cues, dtype=np.int64)]
+    gaps = np.zeros(len(first_cues), dtype=np.int64)
+    if len(first_cues) > 1:
+        gaps[1:] = np.clip(starts[1:] - ends[:-1], min_gap_ms, max_gap_ms)
+    return gaps
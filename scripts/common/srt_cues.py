@@ -0,0 +1,121 @@
+import re
+from array import array
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+# "00:01:02,345 --> 00:01:04,000" (일부 도구가 쓰는 '.' 구분자도 허용)
+_TIMING_RE = re.compile(
+    r"^\s*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})"
+)
+
+
+class Cue(NamedTuple):
+    """자막 한 개. 시간은 정수 밀리초 단위입니다."""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+class CueList:
+    """
+    자막 목록을 압축된 형태로 보관합니다.
+    시작/종료 시간은 정수 밀리초 배열(array('q'))에, 텍스트는 리스트에 저장하여
+    자막 수가 많아도 객체 오버헤드가 거의 없습니다.
+    """
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self, cues: Iterable[Cue] = ()):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.texts = []
+        for cue in cues:
+            self.append(cue.start, cue.end, cue.text)
+
+    def append(self, start_ms: int, end_ms: int, text: str):
+        self.starts.append(int(start_ms))
+        self.ends.append(int(end_ms))
+        self.texts.append(text)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, i: int) -> Cue:
+        if i < 0:
+            i += len(self.texts)
+        return Cue(i + 1, self.starts[i], self.ends[i], self.texts[i])
+
+    def __iter__(self) -> Iterator[Cue]:
+        for i in range(len(self.texts)):
+            yield Cue(i + 1, self.starts[i], self.ends[i], self.texts[i])
+
+
+def format_srt_time(ms: int) -> str:
+    """밀리초를 SRT 타임스탬프(HH:MM:SS,mmm)로 변환합니다."""
+    ms = max(0, int(ms))
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, millis = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def _to_ms(h: str, m: str, s: str, frac: str) -> int:
+    # '5' -> 500ms, '05' -> 50ms 처럼 소수부 자릿수를 보정합니다.
+    return ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + int(frac.ljust(3, '0'))
+
+
+def iter_cues(f: TextIO) -> Iterator[Cue]:
+    """
+    열린 SRT 파일에서 자막을 한 개씩 생성합니다.
+    파일 전체를 메모리에 올리지 않으므로 수 시간 분량의 자막도 적은 메모리로 처리할 수 있습니다.
+    번호 줄은 무시하고 파일에 나타난 순서대로 1부터 다시 번호를 매깁니다.
+    """
+    count = 0
+    timing = None
+    text_lines = []
+    prev_line = None
+
+    for raw_line in f:
+        line = raw_line.rstrip("\r\n").lstrip("﻿")
+        match = _TIMING_RE.match(line)
+        if match:
+            # 타이밍 줄 바로 앞의 번호 줄이 이전 자막 본문에 섞여 들어가지 않도록 제거합니다.
+            if text_lines and prev_line is not None and prev_line.strip().isdigit():
+                text_lines.pop()
+            if timing is not None:
+                count += 1
+                yield Cue(count, timing[0], timing[1], "\n".join(text_lines).strip())
+            g = match.groups()
+            timing = (_to_ms(*g[0:4]), _to_ms(*g[4:8]))
+            text_lines = []
+        elif timing is not None and line.strip():
+            text_lines.append(line.strip())
+        prev_line = line
+
+    if timing is not None:
+        count += 1
+        yield Cue(count, timing[0], timing[1], "\n".join(text_lines).strip())
+
+
+def read_cues(srt_path: str) -> CueList:
+    """SRT 파일 전체를 CueList로 읽어 옵니다."""
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        return CueList(iter_cues(f))
+
+
+def write_cues(f: TextIO, cues: Iterable[Cue]) -> int:
+    """
+    자막을 SRT 형식으로 순서대로 기록합니다. 입력은 제너레이터여도 됩니다.
+    Returns:
+        int: 기록된 자막 수.
+    """
+    count = 0
+    for cue in cues:
+        count += 1
+        f.write(f"{count}\n{format_srt_time(cue.start)} --> {format_srt_time(cue.end)}\n{cue.text}\n\n")
+    return count
+
+
+def save_cues(srt_path: str, cues: Iterable[Cue]) -> int:
+    """자막을 SRT 파일로 저장합니다."""
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        return write_cues(f, cues)
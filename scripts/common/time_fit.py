@@ -0,0 +1,96 @@
+import os
+import subprocess
+from typing import List, Tuple
+
+import numpy as np
+
+from common.wav_io import read_wav_info
+
+# 한 번의 ffmpeg 실행에서 처리할 최대 파일 수 (명령줄 길이와 열린 파일 수 제한)
+DEFAULT_BATCH_SIZE = 32
+
+# 이 비율 이하의 초과는 늘어짐이 귀에 띄지 않으므로 조정하지 않습니다.
+STRETCH_TOLERANCE = 1.02
+
+_PCM_CODECS = {(False, 1): "pcm_u8", (False, 2): "pcm_s16le", (False, 4): "pcm_s32le", (True, 4): "pcm_f32le", (True, 8): "pcm_f64le"}
+
+
+def compute_stretch_ratios(durations_ms: np.ndarray, slots_ms: np.ndarray) -> np.ndarray:
+    """
+    합성된 길이와 자막 구간 길이로 필요한 템포 비율을 계산합니다.
+    비율이 1보다 크면 그만큼 빠르게 재생해야 구간에 들어갑니다. 구간 길이가 0 이하이면 1.0입니다.
+    """
+    durations_ms = np.asarray(durations_ms, dtype=np.float64)
+    slots_ms = np.asarray(slots_ms, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(slots_ms > 0, durations_ms / slots_ms, 1.0)
+    return np.maximum(ratios, 1.0)
+
+
+def _atempo_chain(ratio: float) -> str:
+    """atempo 한 단계는 0.5~2.0 범위만 보장되므로 큰 비율은 여러 단계로 나눕니다."""
+    stages = []
+    while ratio > 2.0:
+        stages.append("atempo=2.0")
+        ratio /= 2.0
+    stages.append(f"atempo={ratio:.6f}")
+    return ",".join(stages)
+
+
+def stretch_files(jobs: List[Tuple[str, float]], batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    (WAV 경로, 템포 비율) 목록을 피치를 유지한 채 제자리에서 변환합니다.
+    파일마다 ffmpeg을 실행하지 않고, batch_size개씩 하나의 filter graph로 묶어 한 번에 처리합니다.
+    Raises:
+        subprocess.CalledProcessError: ffmpeg 실행에 실패할 경우.
+    """
+    for batch_start in range(0, len(jobs), batch_size):
+        batch = jobs[batch_start:batch_start + batch_size]
+        command = ["ffmpeg", "-y", "-loglevel", "error"]
+        for path, _ in batch:
+            command += ["-i", path]
+
+        filters = [f"[{i}:a]{_atempo_chain(ratio)}[o{i}]" for i, (_, ratio) in enumerate(batch)]
+        command += ["-filter_complex", ";".join(filters)]
+
+        temp_paths = []
+        for i, (path, _) in enumerate(batch):
+            info = read_wav_info(path)
+            codec = _PCM_CODECS.get((info.is_float, info.sampwidth), "pcm_s16le")
+            temp_path = f"{os.path.splitext(path)[0]}.fit.wav"
+            temp_paths.append(temp_path)
+            command += ["-map", f"[o{i}]", "-c:a", codec, temp_path]
+
+        try:
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except subprocess.CalledProcessError as e:
+            print("ffmpeg 템포 조정 중 오류 발생:")
+            print(e.stderr.decode('utf-8', errors='replace'))
+            for temp_path in temp_paths:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+
+        for (path, _), temp_path in zip(batch, temp_paths):
+            os.replace(temp_path, path)
+
+
+def fit_chunks_to_slots(wav_paths: List[str], slots_ms: List[int], max_ratio: float = 1.5,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[np.ndarray, List[int]]:
+    """
+    자막 구간보다 긴 chunk들을 구간 길이에 맞도록 한 번에 빠르게 만듭니다.
+    길이는 WAV 헤더만 읽어 계산하며, 비율은 max_ratio로 제한합니다.
+    Returns:
+        (ratios, overflow): 파일별 필요 비율과, max_ratio를 넘어 구간에 다 들어가지 못한 파일의 위치 목록.
+    """
+    durations_ms = np.array([read_wav_info(path).duration_sec * 1000.0 for path in wav_paths])
+    ratios = compute_stretch_ratios(durations_ms, slots_ms)
+
+    offending = np.flatnonzero(ratios > STRETCH_TOLERANCE)
+    overflow = [int(i) for i in offending if ratios[i] > max_ratio]
+    jobs = [(wav_paths[i], float(min(ratios[i], max_ratio))) for i in offending]
+
+    if jobs:
+        print(f"--- 자막 구간을 넘는 chunk {len(jobs)}개의 템포를 조정합니다 ---")
+        stretch_files(jobs, batch_size)
+    return ratios, overflow
@@ -0,0 +1,86 @@
+from difflib import SequenceMatcher
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from common.srt_cues import Cue, CueList
+
+# 끝 시간을 주지 않았을 때 쓰는 "끝까지" 값 (ms)
+OPEN_END_MS = 2 ** 62
+
+
+def parse_timecode(value: str) -> float:
+    """
+    "00:42:00", "42:00", "2520", "2520.5", "00:42:00,500" 형식의 시간을 초로 바꿉니다.
+    Raises:
+        ValueError: 형식이 잘못되었을 경우.
+    """
+    parts = value.strip().replace(",", ".").split(":")
+    if not 1 <= len(parts) <= 3 or not all(parts):
+        raise ValueError(f"시간 형식이 잘못되었습니다: {value}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    if seconds < 0:
+        raise ValueError(f"시간은 0 이상이어야 합니다: {value}")
+    return seconds
+
+
+def to_ms_range(start_sec: Optional[float], end_sec: Optional[float]) -> Tuple[int, int]:
+    """초 단위 구간을 ms 구간으로 바꿉니다. 비어 있는 쪽은 처음/끝까지로 봅니다."""
+    start_ms = int(round((start_sec or 0.0) * 1000))
+    end_ms = int(round(end_sec * 1000)) if end_sec is not None else OPEN_END_MS
+    if end_ms <= start_ms:
+        raise ValueError(f"구간의 끝({end_sec}초)이 시작({start_sec}초)보다 앞입니다.")
+    return start_ms, end_ms
+
+
+def cues_overlapping(cues: CueList, start_ms: int, end_ms: int) -> Tuple[int, int]:
+    """
+    [start_ms, end_ms)와 겹치는 자막들의 위치 범위 [first, last)를 반환합니다. 겹치는 자막이 없으면
+    구간이 들어갈 자리를 first == last로 반환합니다.
+    """
+    starts = np.frombuffer(cues.starts, dtype=np.int64) if len(cues) else np.zeros(0, dtype=np.int64)
+    ends = np.frombuffer(cues.ends, dtype=np.int64) if len(cues) else np.zeros(0, dtype=np.int64)
+    overlapping = np.flatnonzero((ends > start_ms) & (starts < end_ms))
+    if overlapping.size == 0:
+        position = int(np.searchsorted(starts, start_ms))
+        return position, position
+    return int(overlapping[0]), int(overlapping[-1]) + 1
+
+
+def splice_cues(cues: CueList, new_cues: Iterable[Cue], start_ms: int, end_ms: int) -> Tuple[CueList, int, int]:
+    """
+    [start_ms, end_ms)와 겹치는 자막을 new_cues로 바꾼 새 목록을 만듭니다.
+    Returns:
+        (spliced, first, last): 새 목록과, 그 안에서 새로 들어간 자막의 위치 범위 [first, last).
+    """
+    first, last = cues_overlapping(cues, start_ms, end_ms)
+    spliced = CueList(cues[i] for i in range(first))
+    for cue in new_cues:
+        spliced.append(cue.start, cue.end, cue.text)
+    inserted_end = len(spliced)
+    for i in range(last, len(cues)):
+        spliced.append(cues.starts[i], cues.ends[i], cues.texts[i])
+    return spliced, first, inserted_end
+
+
+def cue_edits(old: CueList, new: CueList) -> List[Tuple[int, int, int, int]]:
+    """
+    두 자막 목록을 (시작, 끝, 텍스트) 단위로 비교하여 바뀐 부분을 찾습니다.
+    Returns:
+        List[Tuple[int, int, int, int]]: 바뀐 부분마다 (old_first, old_last, new_first, new_last). 범위는 [first, last)입니다.
+    """
+    old_keys = list(zip(old.starts, old.ends, old.texts))
+    new_keys = list(zip(new.starts, new.ends, new.texts))
+    matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    return [(i1, i2, j1, j2) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def edit_window(old: CueList, new: CueList, edit: Tuple[int, int, int, int]) -> Tuple[int, int]:
+    """바뀐 부분의 이전/새 자막이 차지하는 시간을 모두 덮는 ms 구간을 반환합니다."""
+    i1, i2, j1, j2 = edit
+    starts = list(old.starts[i1:i2]) + list(new.starts[j1:j2])
+    ends = list(old.ends[i1:i2]) + list(new.ends[j1:j2])
+    start_ms = min(starts)
+    return start_ms, max(max(ends), start_ms + 1)
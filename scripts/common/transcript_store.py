@@ -0,0 +1,164 @@
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from common.srt_cues import CueList, read_cues
+
+# 변환 결과 열 저장 파일 이름 (created.srt 옆에 둡니다)
+TRANSCRIPT_FILE = "created.npz"
+
+
+def _pack_texts(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열들을 UTF-8 바이트 하나로 잇고, 각 문자열의 [시작, 끝) 위치(n + 1개)를 함께 반환합니다."""
+    encoded = [text.encode('utf-8') for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def save_transcript(path: str, segments: List[dict]):
+    """
+    Whisper 세그먼트 목록을 세그먼트별/단어별 열 배열로 저장합니다. 텍스트는 UTF-8 바이트와 위치 배열로 나누어
+    담으므로 다시 읽을 때 텍스트를 파싱하지 않습니다. 압축하지 않으므로 필요한 열만 바로 읽힙니다.
+    임시 파일에 쓴 뒤 교체하므로 중단되어도 손상되지 않습니다.
+    """
+    words = [segment.get("words") or [] for segment in segments]
+    flat_words = [word for segment_words in words for word in segment_words]
+    word_offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    np.cumsum([len(segment_words) for segment_words in words], out=word_offsets[1:])
+    text_bytes, text_offsets = _pack_texts([segment["text"] for segment in segments])
+    word_bytes, word_text_offsets = _pack_texts([word["word"] for word in flat_words])
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        np.savez(
+            f,
+            start=np.array([segment["start"] for segment in segments], dtype=np.float64),
+            end=np.array([segment["end"] for segment in segments], dtype=np.float64),
+            avg_logprob=np.array([segment.get("avg_logprob", 0.0) for segment in segments], dtype=np.float32),
+            no_speech_prob=np.array([segment.get("no_speech_prob", 0.0) for segment in segments], dtype=np.float32),
+            compression_ratio=np.array([segment.get("compression_ratio", 0.0) for segment in segments], dtype=np.float32),
+            text_bytes=text_bytes,
+            text_offsets=text_offsets,
+            word_offsets=word_offsets,
+            word_start=np.array([word["start"] for word in flat_words], dtype=np.float64),
+            word_end=np.array([word["end"] for word in flat_words], dtype=np.float64),
+            word_probability=np.array([word.get("probability", 0.0) for word in flat_words], dtype=np.float32),
+            word_bytes=word_bytes,
+            word_text_offsets=word_text_offsets,
+        )
+    os.replace(temp_path, path)
+
+
+class Transcript:
+    """
+    저장된 변환 결과입니다. 열은 처음 접근할 때 하나씩만 읽고, 텍스트는 요청한 세그먼트만 디코딩합니다.
+    start/end는 초 단위이고, word_offsets[i]:word_offsets[i + 1]이 세그먼트 i의 단어 범위입니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = np.load(path)
+        self._columns = {}
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name.startswith("_") or name not in self._file.files:
+            raise AttributeError(name)
+        if name not in self._columns:
+            self._columns[name] = self._file[name]
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return len(self.text_offsets) - 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def text(self, i: int) -> str:
+        return self.text_bytes[self.text_offsets[i]:self.text_offsets[i + 1]].tobytes().decode('utf-8')
+
+    def words(self, i: int) -> List[dict]:
+        """세그먼트 i의 단어 타이밍입니다. 단어 타이밍 없이 변환했으면 빈 목록입니다."""
+        first, last = int(self.word_offsets[i]), int(self.word_offsets[i + 1])
+        return [
+            {"word": self.word_bytes[self.word_text_offsets[k]:self.word_text_offsets[k + 1]].tobytes().decode('utf-8'),
+             "start": float(self.word_start[k]), "end": float(self.word_end[k]), "probability": float(self.word_probability[k])}
+            for k in range(first, last)
+        ]
+
+    def to_segments(self) -> List[dict]:
+        """clean_segment와 같은 형태의 세그먼트 목록으로 되돌립니다."""
+        segments = []
+        for i in range(len(self)):
+            segment = {
+                "id": i,
+                "start": float(self.start[i]),
+                "end": float(self.end[i]),
+                "text": self.text(i),
+                "avg_logprob": float(self.avg_logprob[i]),
+                "no_speech_prob": float(self.no_speech_prob[i]),
+                "compression_ratio": float(self.compression_ratio[i]),
+            }
+            words = self.words(i)
+            if words:
+                segment["words"] = words
+            segments.append(segment)
+        return segments
+
+    def to_cues(self) -> CueList:
+        """SRT를 거치지 않고 밀리초 단위 자막 목록을 만듭니다."""
+        cues = CueList()
+        starts = np.rint(self.start * 1000).astype(np.int64).tolist()
+        ends = np.rint(self.end * 1000).astype(np.int64).tolist()
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            cues.append(start, end, self.text(i).strip())
+        return cues
+
+
+def load_transcript(path: str) -> Transcript:
+    """
+    저장된 변환 결과를 엽니다. 배열은 접근할 때 읽습니다.
+    Raises:
+        OSError: 파일이 없거나 읽을 수 없는 경우.
+    """
+    return Transcript(path)
+
+
+def read_transcript_cues(srt_path: str) -> CueList:
+    """
+    변환 SRT의 자막을 읽습니다. 같은 디렉터리의 열 저장 파일(created.npz)이 SRT 이후에 저장되었으면
+    (SRT가 그 뒤로 편집되지 않았으면) SRT를 파싱하지 않고 그것에서 자막을 만들고, 아니면 SRT를 읽습니다.
+    Raises:
+        FileNotFoundError: SRT 파일이 없는 경우.
+    """
+    transcript_path = os.path.join(os.path.dirname(srt_path), TRANSCRIPT_FILE)
+    if os.path.exists(transcript_path) and os.path.getmtime(transcript_path) >= os.path.getmtime(srt_path):
+        with load_transcript(transcript_path) as transcript:
+            return transcript.to_cues()
+    return read_cues(srt_path)
+
+
+def splice_segments(segments: List[dict], new_segments: List[dict], start_sec: float, end_sec: float) -> Tuple[List[dict], int, int]:
+    """
+    [start_sec, end_sec)와 겹치는 세그먼트를 new_segments로 바꿉니다. (splice_cues와 같은 규칙)
+    Returns:
+        (spliced, first, last): 새 목록과, 그 안에서 새로 들어간 세그먼트의 위치 범위 [first, last).
+    """
+    starts = np.array([segment["start"] for segment in segments], dtype=np.float64)
+    ends = np.array([segment["end"] for segment in segments], dtype=np.float64)
+    overlapping = np.flatnonzero((ends > start_sec) & (starts < end_sec))
+    if overlapping.size:
+        first, last = int(overlapping[0]), int(overlapping[-1]) + 1
+    else:
+        first = last = int(np.searchsorted(starts, start_sec))
+    spliced = segments[:first] + list(new_segments) + segments[last:]
+    for i, segment in enumerate(spliced):
+        segment["id"] = i
+    return spliced, first, first + len(new_segments)
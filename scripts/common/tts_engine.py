@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from common.tts_runner import run_tts_command, run_with_retries, ChunkSynthesisError, DEFAULT_TIMEOUT_SEC, DEFAULT_RETRIES
+
+# Chatterbox-TTS-Server 설치 위치
+CHATTERBOX_ROOT = "/home/jay-gim/dev/Chatterbox-TTS-Server"
+CHATTERBOX_PYTHON = os.path.join(CHATTERBOX_ROOT, "venv", "bin", "python")
+CHATTERBOX_COMMAND = os.path.join(CHATTERBOX_ROOT, "command.py")
+
+# config.yaml의 server.port와 맞춥니다.
+DEFAULT_SERVER_URL = "http://127.0.0.1:8000"
+# 배치 합성 시 서버에 동시에 보내는 요청 수
+DEFAULT_BATCH_PARALLEL = 4
+# 전처리한 참조 오디오를 서버 참조 오디오 디렉터리 안에 둘 하위 폴더 (파일 선택 창에서 숨겨지도록 점으로 시작)
+PREPARED_REFERENCE_SUBDIR = ".prepared"
+
+
+def build_tts_command(text: str, output_path: str, reference_audio: Optional[str], language: str,
+                      temperature: float, exaggeration: float, cfg_weight: float, seed: int) -> List[str]:
+    """
+    Chatterbox command.py 실행 명령을 만듭니다. 참조 오디오가 없으면 엔진의 기본 목소리를 사용합니다.
+    """
+    voice_args = ["--voice-mode", "clone", "--reference-audio", reference_audio] if reference_audio else []
+    return [
+        CHATTERBOX_PYTHON,
+        CHATTERBOX_COMMAND, text.strip(),
+        *voice_args,
+        "--output", output_path,
+        "--language", language,
+        "--speed-factor", "1.0",
+        "--temperature", str(temperature),
+        "--exaggeration", str(exaggeration),
+        "--cfg_weight", str(cfg_weight),
+        "--seed", str(seed)
+    ]
+
+
+def publish_reference_audio(reference_audio: Optional[str], server_reference_dir: str) -> Optional[str]:
+    """
+    참조 오디오를 서버의 참조 오디오 디렉터리(config.yaml의 tts_engine.reference_audio_path)에 두고,
+    서버에 넘길 그 디렉터리 기준 경로를 반환합니다. 이미 그 디렉터리에 있는 파일은 복사하지 않고,
+    다른 곳의 파일(전처리 캐시)은 사용자가 목소리를 고르는 목록에 섞이지 않도록 PREPARED_REFERENCE_SUBDIR에 복사합니다.
+    캐시 파일 이름은 내용의 해시이므로 같은 이름이 이미 있으면 복사하지 않습니다.
+    """
+    if not reference_audio:
+        return None
+    filename = os.path.basename(reference_audio)
+    if os.path.abspath(os.path.dirname(reference_audio)) == os.path.abspath(server_reference_dir):
+        return filename
+    target_dir = os.path.join(server_reference_dir, PREPARED_REFERENCE_SUBDIR)
+    target_path = os.path.join(target_dir, filename)
+    if not os.path.exists(target_path):
+        os.makedirs(target_dir, exist_ok=True)
+        shutil.copyfile(reference_audio, target_path)
+    # 서버는 이 값을 참조 오디오 디렉터리에 이어 붙여 찾으므로 구분자는 '/'로 씁니다.
+    return f"{PREPARED_REFERENCE_SUBDIR}/{filename}"
+
+
+class TTSEngine:
+    """
+    문장 하나를 WAV 파일로 합성하는 TTS 엔진입니다.
+    server_url이 없으면 호출마다 command.py를 실행하고(매번 모델 로드),
+    있으면 이미 모델이 올라와 있는 Chatterbox-TTS-Server의 /tts API를 호출합니다.
+    """
+
+    def __init__(self, server_url: Optional[str] = None, timeout_sec: float = DEFAULT_TIMEOUT_SEC, retries: int = DEFAULT_RETRIES):
+        self.server_url = server_url.rstrip("/") if server_url else None
+        self.timeout_sec = timeout_sec
+        self.retries = retries
+
+    def synthesize(self, text: str, output_path: str, reference_audio: Optional[str], language: str,
+                   temperature: float, exaggeration: float, cfg_weight: float, seed: int) -> int:
+        """
+        text를 합성하여 output_path에 저장하고, 성공까지 걸린 시도 횟수를 반환합니다.
+        서버 모드에서 reference_audio는 서버가 알고 있는 참조 오디오 파일 이름입니다.
+        Raises:
+            ChunkSynthesisError: 재시도 후에도 실패한 경우.
+        """
+        if not self.server_url:
+            command = build_tts_command(text, output_path, reference_audio, language, temperature, exaggeration, cfg_weight, seed)
+            return run_tts_command(command, output_path, text, timeout_sec=self.timeout_sec, retries=self.retries)
+
+        payload = {
+            "text": text.strip(),
+            "voice_mode": "clone" if reference_audio else "predefined",
+            "output_format": "wav",
+            "split_text": False,
+            "temperature": temperature,
+            "exaggeration": exaggeration,
+            "cfg_weight": cfg_weight,
+            "seed": seed,
+            "speed_factor": 1.0,
+            "language": language,
+        }
+        if reference_audio:
+            payload["reference_audio_filename"] = reference_audio
+
+        def attempt(timeout: float) -> Optional[str]:
+            request = urllib.request.Request(f"{self.server_url}/tts", data=json.dumps(payload).encode("utf-8"),
+                                             headers={"Content-Type": "application/json"}, method="POST")
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response, open(output_path, "wb") as f:
+                    shutil.copyfileobj(response, f)
+            except urllib.error.HTTPError as e:
+                return f"HTTP {e.code}: {e.read().decode('utf-8', errors='replace')[:200]}"
+            except (urllib.error.URLError, OSError) as e:
+                return f"서버 요청 실패: {e}"
+            return None
+
+        return run_with_retries(attempt, output_path, text, self.timeout_sec, self.retries)
+
+    def synthesize_batch(self, texts: List[str], output_paths: List[str], reference_audio: Optional[str], language: str,
+                         temperature: float, exaggeration: float, cfg_weight: float, seed: int,
+                         max_parallel: int = DEFAULT_BATCH_PARALLEL) -> List[int]:
+        """
+        짧은 문장 여러 개를 한 번에 합성하여 문장마다 WAV 하나씩 저장하고, 문장별 시도 횟수를 반환합니다.
+        서버 모드에서는 같은 서버 세션에 max_parallel개씩 동시에 요청을 보내 GPU가 쉬지 않게 하고,
+        명령 모드에서는 순서대로 합성합니다. 명령 모드는 문장마다 모델을 다시 로드하므로 파이프라인은 서버 모드에서만 씁니다.
+        Raises:
+            ChunkSynthesisError: 하나라도 실패한 경우. 나머지 문장은 끝까지 합성한 뒤 발생합니다.
+        """
+        def synthesize_one(job):
+            text, output_path = job
+            try:
+                return self.synthesize(text, output_path, reference_audio, language, temperature, exaggeration, cfg_weight, seed), None
+            except ChunkSynthesisError as e:
+                return 0, e
+
+        jobs = list(zip(texts, output_paths))
+        if self.server_url and max_parallel > 1:
+            with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+                results = list(executor.map(synthesize_one, jobs))
+        else:
+            results = [synthesize_one(job) for job in jobs]
+
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            reasons = [f"{os.path.basename(error.output_path)}: {error.reasons[-1]}" for error in errors]
+            raise ChunkSynthesisError(errors[0].output_path, reasons)
+        return [attempts for attempts, _ in results]
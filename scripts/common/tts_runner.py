@@ -0,0 +1,100 @@
+import os
+import subprocess
+import time
+from typing import Callable, List, Optional
+
+from common.chunk_planner import estimate_speech_ms
+from common.wav_io import read_wav_info
+
+DEFAULT_TIMEOUT_SEC = 300
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_SEC = 2.0
+
+# 예상 발화 길이 대비 허용 범위. 너무 짧으면 잘린 출력, 너무 길면 폭주한 생성으로 봅니다.
+MIN_DURATION_RATIO = 0.2
+MAX_DURATION_RATIO = 5.0
+MAX_DURATION_SLACK_SEC = 5.0
+
+
+class ChunkSynthesisError(RuntimeError):
+    """재시도 후에도 chunk 합성에 실패한 경우 발생합니다."""
+
+    def __init__(self, output_path: str, reasons: List[str]):
+        self.output_path = output_path
+        self.reasons = reasons
+        super().__init__(f"{os.path.basename(output_path)}: {reasons[-1] if reasons else '알 수 없는 오류'}")
+
+
+def validate_chunk_wav(output_path: str, text: str) -> Optional[str]:
+    """
+    합성 결과 WAV가 쓸 만한지 확인합니다. 문제가 없으면 None, 있으면 그 이유를 반환합니다.
+    존재 여부, 크기, 헤더, 그리고 텍스트 길이에 비해 그럴듯한 길이인지 검사합니다.
+    """
+    if not os.path.exists(output_path):
+        return "출력 파일이 생성되지 않았습니다."
+    if os.path.getsize(output_path) <= 44:
+        return "출력 파일이 비어 있습니다."
+    try:
+        info = read_wav_info(output_path)
+    except ValueError as e:
+        return f"WAV 헤더를 읽을 수 없습니다: {e}"
+    if info.nframes == 0:
+        return "오디오 데이터가 없습니다."
+
+    expected_sec = estimate_speech_ms(text) / 1000.0
+    if expected_sec > 0:
+        if info.duration_sec < expected_sec * MIN_DURATION_RATIO:
+            return f"길이가 너무 짧습니다 ({info.duration_sec:.2f}s, 예상 {expected_sec:.2f}s)"
+        if info.duration_sec > expected_sec * MAX_DURATION_RATIO + MAX_DURATION_SLACK_SEC:
+            return f"길이가 너무 깁니다 ({info.duration_sec:.2f}s, 예상 {expected_sec:.2f}s)"
+    return None
+
+
+def run_with_retries(attempt: Callable[[float], Optional[str]], output_path: str, text: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC,
+                     retries: int = DEFAULT_RETRIES, backoff_sec: float = DEFAULT_BACKOFF_SEC) -> int:
+    """
+    attempt(timeout_sec)로 합성을 시도하고 출력 WAV를 검증합니다.
+    attempt는 성공하면 None, 실패하면 이유를 반환합니다. 실패하면 지수 백오프로 최대 retries번 다시 시도합니다.
+    Returns:
+        int: 성공까지 걸린 시도 횟수.
+    Raises:
+        ChunkSynthesisError: 모든 시도가 실패한 경우.
+    """
+    reasons = []
+    for attempt_number in range(1, retries + 2):
+        # 이전 실행의 결과물이 검증을 통과하지 않도록 먼저 지웁니다.
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        try:
+            reason = attempt(timeout_sec)
+        except subprocess.TimeoutExpired:
+            reason = f"{timeout_sec:g}초 안에 끝나지 않아 중단했습니다."
+        if reason is None:
+            reason = validate_chunk_wav(output_path, text)
+
+        if reason is None:
+            return attempt_number
+
+        reasons.append(f"시도 {attempt_number}: {reason}")
+        print(f"  TTS 실패 ({os.path.basename(output_path)}) 시도 {attempt_number}/{retries + 1}: {reason}")
+        if attempt_number <= retries:
+            time.sleep(backoff_sec * (2 ** (attempt_number - 1)))
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    raise ChunkSynthesisError(output_path, reasons)
+
+
+def run_tts_command(command: List[str], output_path: str, text: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC,
+                    retries: int = DEFAULT_RETRIES, backoff_sec: float = DEFAULT_BACKOFF_SEC) -> int:
+    """
+    TTS 명령을 시간 제한과 함께 실행하고 출력 WAV를 검증합니다. 재시도 규칙은 run_with_retries와 같습니다.
+    """
+    def attempt(timeout: float) -> Optional[str]:
+        result = subprocess.run(command, timeout=timeout, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            stderr_tail = result.stderr.decode('utf-8', errors='replace').strip().splitlines()[-3:]
+            return f"종료 코드 {result.returncode}: {' / '.join(stderr_tail)}"
+        return None
+
+    return run_with_retries(attempt, output_path, text, timeout_sec, retries, backoff_sec)
@@ -0,0 +1,120 @@
+import json
+import wave
+from typing import NamedTuple
+
+import numpy as np
+
+from common.silence_trim import frame_energy_dbfs
+from common.wav_io import memmap_wav
+
+# 에너지를 계산하는 프레임 길이
+FRAME_MS = 30
+# 잡음 바닥(하위 10% 프레임 에너지)보다 이만큼 커야 말소리 후보로 봅니다.
+NOISE_FLOOR_MARGIN_DB = 12.0
+# 잡음 바닥이 아무리 낮아도 이보다 조용한 프레임은 말소리로 보지 않습니다.
+MIN_THRESHOLD_DBFS = -50.0
+# 이보다 짧은 쉼은 같은 구간으로 잇고, 이보다 짧은 구간은 버립니다.
+MAX_GAP_MS = 500
+MIN_SPEECH_MS = 250
+# 말소리 앞뒤로 남겨 두는 여유
+PAD_MS = 200
+# 구간들을 이어 붙일 때 사이에 넣는 묵음. Whisper가 앞뒤 구간의 단어를 붙이지 않게 합니다.
+JOIN_SILENCE_MS = 300
+
+# 에너지를 계산할 때 한 번에 읽는 길이
+_BLOCK_SEC = 60
+
+
+class OffsetMap(NamedTuple):
+    """이어 붙인 음성 오디오의 시간(초)을 원본 시간으로 되돌리는 구간표입니다."""
+    joined_starts: np.ndarray
+    original_starts: np.ndarray
+    lengths: np.ndarray
+
+
+def detect_speech_regions(audio_path: str, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """
+    16kHz PCM WAV에서 에너지 기반으로 말소리 구간을 찾습니다.
+    오디오는 memmap으로 블록씩 읽으므로 긴 파일도 메모리에 올리지 않습니다.
+    Returns:
+        np.ndarray: (구간 수, 2) 형태의 [시작, 끝) 샘플 위치.
+    """
+    samples, info = memmap_wav(audio_path)
+    frame_len = info.sample_rate * frame_ms // 1000
+    block = (_BLOCK_SEC * info.sample_rate // frame_len) * frame_len
+    energy = np.concatenate([frame_energy_dbfs(samples[start:start + block], info.sample_rate, frame_ms)
+                             for start in range(0, info.nframes, block)] or [np.zeros(0, dtype=np.float32)])
+    if energy.size == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    threshold = max(float(np.percentile(energy, 10)) + NOISE_FLOOR_MARGIN_DB, MIN_THRESHOLD_DBFS)
+    voiced = np.concatenate(([False], energy > threshold, [False]))
+    edges = np.flatnonzero(np.diff(voiced.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    if starts.size == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # 짧은 쉼으로 나뉜 구간을 잇습니다.
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] > MAX_GAP_MS // frame_ms))
+    ends = np.maximum.reduceat(ends, np.flatnonzero(keep))
+    starts = starts[keep]
+    long_enough = ends - starts >= MIN_SPEECH_MS // frame_ms
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    pad = PAD_MS // frame_ms
+    regions = np.stack([np.maximum(starts - pad, 0), np.minimum(ends + pad, energy.size)], axis=1).astype(np.int64) * frame_len
+    regions[:, 1] = np.minimum(regions[:, 1], info.nframes)
+    # 여유를 붙이면서 겹친 구간을 합칩니다.
+    if len(regions) > 1:
+        new_region = np.concatenate(([True], regions[1:, 0] > regions[:-1, 1]))
+        regions = np.stack([regions[new_region, 0], np.maximum.reduceat(regions[:, 1], np.flatnonzero(new_region))], axis=1)
+    return regions
+
+
+def write_speech_audio(audio_path: str, output_path: str, regions: np.ndarray, join_silence_ms: int = JOIN_SILENCE_MS) -> OffsetMap:
+    """
+    말소리 구간만 이어 붙인 WAV를 만들고, 이어 붙인 시간을 원본 시간으로 되돌리는 구간표를 반환합니다.
+    """
+    samples, info = memmap_wav(audio_path)
+    silence = np.zeros((info.sample_rate * join_silence_ms // 1000, info.channels), dtype=samples.dtype)
+    joined_starts = []
+    position = 0
+    with wave.open(output_path, 'wb') as f:
+        f.setnchannels(info.channels)
+        f.setsampwidth(info.sampwidth)
+        f.setframerate(info.sample_rate)
+        for i, (start, end) in enumerate(regions):
+            if i:
+                f.writeframes(silence.tobytes())
+                position += len(silence)
+            joined_starts.append(position)
+            f.writeframes(np.ascontiguousarray(samples[start:end]).tobytes())
+            position += end - start
+
+    rate = float(info.sample_rate)
+    return OffsetMap(np.asarray(joined_starts, dtype=np.float64) / rate,
+                     regions[:, 0].astype(np.float64) / rate,
+                     (regions[:, 1] - regions[:, 0]).astype(np.float64) / rate)
+
+
+def restore_times(offset_map: OffsetMap, times) -> np.ndarray:
+    """
+    이어 붙인 오디오 기준 시간(초)들을 원본 기준 시간으로 되돌립니다.
+    구간 사이 묵음에 떨어진 시간은 앞 구간의 끝으로 붙입니다.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if offset_map.joined_starts.size == 0:
+        return times
+    i = np.clip(np.searchsorted(offset_map.joined_starts, times, side='right') - 1, 0, None)
+    local = np.clip(times - offset_map.joined_starts[i], 0.0, offset_map.lengths[i])
+    return offset_map.original_starts[i] + local
+
+
+def save_speech_index(index_path: str, regions: np.ndarray, sample_rate: int, total_frames: int):
+    """찾은 말소리 구간을 초 단위 JSON으로 저장합니다."""
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "duration_sec": round(total_frames / sample_rate, 3),
+            "speech_sec": round(float((regions[:, 1] - regions[:, 0]).sum()) / sample_rate, 3),
+            "regions": [[round(start / sample_rate, 3), round(end / sample_rate, 3)] for start, end in regions.tolist()],
+        }, f, indent=1)
@@ -0,0 +1,101 @@
+import os
+import subprocess
+from typing import List, Optional, Tuple
+
+# 컨테이너별 자막 스트림 코덱
+_SUBTITLE_CODECS = {
+    ".mp4": "mov_text",
+    ".m4v": "mov_text",
+    ".mov": "mov_text",
+    ".mkv": "srt",
+    ".webm": "webvtt",
+}
+
+# 재인코딩 없이 그대로 담을 수 있는 더빙 오디오 확장자
+_COPYABLE_AUDIO = {".m4a", ".aac"}
+
+
+def _escape_filter_path(path: str) -> str:
+    """ffmpeg subtitles 필터 인자에 들어갈 경로를 이스케이프합니다."""
+    return path.replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
+
+
+def mux_dubbed_video(video_path: str, audio_tracks: List[Tuple[str, str]], output_path: str,
+                     keep_original_audio: bool = True, subtitle_path: Optional[str] = None,
+                     burn_subtitles: bool = False) -> str:
+    """
+    원본 비디오 스트림을 재인코딩 없이 복사하고, 더빙 오디오 트랙들을 한 번에 추가합니다.
+    Args:
+        video_path (str): 원본 비디오 파일 경로.
+        audio_tracks (List[Tuple[str, str]]): (오디오 파일 경로, 트랙 제목) 목록. 첫 번째 트랙이 기본 트랙이 됩니다.
+        output_path (str): 출력 파일 경로. 확장자로 컨테이너가 결정됩니다.
+        keep_original_audio (bool): 원본 오디오를 마지막 트랙으로 유지할지 여부.
+        subtitle_path (Optional[str]): 함께 넣을 SRT 파일 경로.
+        burn_subtitles (bool): True면 자막을 화면에 입힙니다. 이 경우 비디오는 재인코딩됩니다.
+    Returns:
+        str: 생성된 파일 경로.
+    Raises:
+        FileNotFoundError: 입력 파일이 존재하지 않을 경우.
+        subprocess.CalledProcessError: ffmpeg 실행에 실패할 경우.
+    """
+    for path in [video_path, *[track for track, _ in audio_tracks], *([subtitle_path] if subtitle_path else [])]:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"입력 파일을 찾을 수 없습니다: {path}")
+    if not audio_tracks:
+        raise ValueError("추가할 더빙 오디오 트랙이 없습니다.")
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    container = os.path.splitext(output_path)[1].lower()
+
+    command = ["ffmpeg", "-y", "-loglevel", "error", "-i", video_path]
+    for track_path, _ in audio_tracks:
+        command += ["-i", track_path]
+
+    attach_subtitles = subtitle_path is not None and not burn_subtitles
+    if attach_subtitles:
+        if container not in _SUBTITLE_CODECS:
+            raise ValueError(f"{container} 컨테이너에는 자막 스트림을 넣을 수 없습니다.")
+        command += ["-i", subtitle_path]
+
+    command += ["-map", "0:v:0"]
+    for i in range(len(audio_tracks)):
+        command += ["-map", f"{i + 1}:a:0"]
+    if keep_original_audio:
+        # 원본에 오디오가 없어도 실패하지 않도록 선택적 매핑을 사용합니다.
+        command += ["-map", "0:a:0?"]
+    if attach_subtitles:
+        command += ["-map", f"{len(audio_tracks) + 1}:s:0"]
+
+    if burn_subtitles and subtitle_path:
+        command += ["-vf", f"subtitles='{_escape_filter_path(subtitle_path)}'", "-c:v", "libx264", "-crf", "18", "-preset", "medium"]
+    else:
+        command += ["-c:v", "copy"]
+
+    for i, (track_path, title) in enumerate(audio_tracks):
+        if os.path.splitext(track_path)[1].lower() in _COPYABLE_AUDIO:
+            command += [f"-c:a:{i}", "copy"]
+        else:
+            command += [f"-c:a:{i}", "aac", f"-b:a:{i}", "192k"]
+        command += [f"-metadata:s:a:{i}", f"title={title}", f"-disposition:a:{i}", "default" if i == 0 else "0"]
+    if keep_original_audio:
+        original_index = len(audio_tracks)
+        command += [f"-c:a:{original_index}", "copy",
+                    f"-metadata:s:a:{original_index}", "title=original",
+                    f"-disposition:a:{original_index}", "0"]
+
+    if attach_subtitles:
+        command += ["-c:s", _SUBTITLE_CODECS[container]]
+
+    command.append(output_path)
+
+    print(f"--- 비디오 먹싱 시작: 더빙 트랙 {len(audio_tracks)}개 ---")
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        print("ffmpeg 먹싱 중 오류 발생:")
+        print(e.stderr.decode('utf-8', errors='replace'))
+        raise
+    print(f"먹싱 완료: {output_path}")
+    return output_path
@@ -0,0 +1,136 @@
+import struct
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo(NamedTuple):
+    """WAV 헤더 정보. data_offset은 파일 안에서 PCM 데이터가 시작하는 바이트 위치입니다."""
+    sample_rate: int
+    channels: int
+    sampwidth: int
+    is_float: bool
+    data_offset: int
+    nframes: int
+
+    @property
+    def duration_sec(self) -> float:
+        return self.nframes / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def dtype(self) -> np.dtype:
+        if self.is_float:
+            return np.dtype('<f4') if self.sampwidth == 4 else np.dtype('<f8')
+        if self.sampwidth == 1:
+            return np.dtype('u1')
+        if self.sampwidth in (2, 4):
+            return np.dtype(f'<i{self.sampwidth}')
+        raise ValueError(f"메모리 매핑을 지원하지 않는 샘플 폭입니다: {self.sampwidth * 8}bit")
+
+
+def read_wav_info(wav_path: str) -> WavInfo:
+    """
+    WAV 파일의 헤더만 읽어 포맷과 데이터 위치를 반환합니다. 오디오 데이터는 읽지 않습니다.
+    Raises:
+        ValueError: RIFF/WAVE 파일이 아니거나 fmt/data 청크가 없을 경우.
+    """
+    with open(wav_path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[0:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError(f"WAV 파일이 아닙니다: {wav_path}")
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            if chunk_id == b'fmt ':
+                data = f.read(chunk_size)
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', data[:16])
+                if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(data) >= 26:
+                    format_tag = struct.unpack('<H', data[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, bits // 8)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    break
+                format_tag, channels, sample_rate, sampwidth = fmt
+                data_offset = f.tell()
+                # 스트리밍으로 기록된 파일은 data 크기가 비어 있을 수 있으므로 실제 파일 크기로 보정합니다.
+                f.seek(0, 2)
+                available = f.tell() - data_offset
+                if chunk_size == 0 or chunk_size > available:
+                    chunk_size = available
+                nframes = chunk_size // (channels * sampwidth)
+                return WavInfo(sample_rate, channels, sampwidth, format_tag == _WAVE_FORMAT_IEEE_FLOAT, data_offset, nframes)
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+            if chunk_id == b'fmt ' and chunk_size & 1:
+                f.seek(1, 1)
+
+    raise ValueError(f"fmt/data 청크를 찾을 수 없습니다: {wav_path}")
+
+
+def memmap_wav(wav_path: str, mode: str = 'r') -> Tuple[np.ndarray, WavInfo]:
+    """
+    WAV 데이터를 (frames, channels) 형태의 NumPy memmap으로 엽니다.
+    파일 내용은 접근하는 부분만 페이지 단위로 읽히므로 긴 파일도 메모리에 올리지 않습니다.
+    """
+    info = read_wav_info(wav_path)
+    if info.nframes == 0:
+        return np.zeros((0, info.channels), dtype=info.dtype), info
+    samples = np.memmap(wav_path, dtype=info.dtype, mode=mode, offset=info.data_offset,
+                        shape=(info.nframes, info.channels))
+    return samples, info
+
+
+def to_float(samples: np.ndarray) -> np.ndarray:
+    """정수 PCM을 -1.0 ~ 1.0 범위의 float32로 변환합니다."""
+    if samples.dtype.kind == 'f':
+        return samples.astype(np.float32, copy=False)
+    if samples.dtype == np.uint8:
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    return samples.astype(np.float32) / float(np.iinfo(samples.dtype).max + 1)
+
+
+def from_float(samples: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """-1.0 ~ 1.0 범위의 float 샘플을 원래 PCM 타입으로 되돌립니다."""
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'f':
+        return samples.astype(dtype, copy=False)
+    if dtype == np.uint8:
+        return np.clip(samples * 128.0 + 128.0, 0, 255).astype(np.uint8)
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(samples * (info.max + 1)), info.min, info.max).astype(dtype)
+
+
+def copy_wav_frames(src_path: str, dst_path: str, start_frame: int, end_frame: int, block_frames: int = 65536):
+    """
+    src_path의 [start_frame, end_frame) 구간만 담은 WAV를 dst_path에 씁니다.
+    원본 헤더를 그대로 쓰고 크기 필드만 고치므로 샘플 포맷과 관계없이 동작합니다.
+    """
+    info = read_wav_info(src_path)
+    frame_bytes = info.channels * info.sampwidth
+    start_frame = max(0, min(start_frame, info.nframes))
+    end_frame = max(start_frame, min(end_frame, info.nframes))
+    data_size = (end_frame - start_frame) * frame_bytes
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        header = bytearray(src.read(info.data_offset))
+        header[4:8] = struct.pack('<I', info.data_offset - 8 + data_size + (data_size & 1))
+        header[info.data_offset - 4:info.data_offset] = struct.pack('<I', data_size)
+        dst.write(header)
+        src.seek(info.data_offset + start_frame * frame_bytes)
+        remaining = data_size
+        while remaining > 0:
+            block = src.read(min(remaining, block_frames * frame_bytes))
+            if not block:
+                break
+            dst.write(block)
+            remaining -= len(block)
+        if data_size & 1:
+            dst.write(b'\0')
@@ -0,0 +1,164 @@
+import os
+import subprocess
+import tkinter as tk
+from tkinter import ttk, filedialog
+
+from common.peaks import load_peaks
+
+# 마우스 휠 한 칸에 확대/축소하는 배율
+ZOOM_STEP = 1.25
+# 가장 크게 확대했을 때 화면에 보이는 길이
+MIN_VIEW_SEC = 0.05
+
+
+def format_time(seconds: float) -> str:
+    minutes, seconds = divmod(max(0.0, seconds), 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:06.3f}"
+
+
+class WaveformView(ttk.Frame):
+    """
+    peak 파일로 오디오 파형을 그리는 보기입니다. 화면 너비만큼의 peak만 읽으므로 긴 병합 파일도 바로 열립니다.
+    휠로 커서 위치를 중심으로 확대/축소하고, 가로 스크롤바로 이동하며, 클릭한 위치부터 ffplay로 재생합니다.
+    """
+
+    def __init__(self, master, initialdir: str = None):
+        super().__init__(master)
+        self.initialdir = initialdir
+        self.audio_path = None
+        self.peaks = None
+        self.view_start = 0.0
+        self.view_end = 0.0
+        self.cursor_sec = None
+        self._player = None
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill="x", padx=5, pady=5)
+        ttk.Button(toolbar, text="Open Audio", command=self.browse_audio).pack(side="left", padx=2)
+        ttk.Button(toolbar, text="Zoom Out All", command=self.zoom_all).pack(side="left", padx=2)
+        ttk.Button(toolbar, text="Stop", command=self.stop_playback).pack(side="left", padx=2)
+        self.status = tk.StringVar(value="No audio loaded.")
+        ttk.Label(toolbar, textvariable=self.status).pack(side="left", padx=10)
+
+        self.canvas = tk.Canvas(self, background="#1e1e1e", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True, padx=5)
+        self.scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.scroll)
+        self.scrollbar.pack(fill="x", padx=5, pady=(0, 5))
+
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom(event.x, event.delta > 0))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(event.x, True))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(event.x, False))
+
+    def browse_audio(self):
+        filename = filedialog.askopenfilename(
+            title="Select an Audio File",
+            initialdir=self.initialdir,
+            filetypes=(("WAV files", "*.wav"), ("All files", "*.*"))
+        )
+        if filename:
+            self.load(filename)
+
+    def load(self, audio_path: str):
+        """오디오 파일의 peak 파일을 열어 전체 길이를 보여 줍니다. WAV는 peak 파일이 없으면 만듭니다."""
+        try:
+            self.peaks = load_peaks(audio_path)
+        except (OSError, ValueError) as e:
+            self.status.set(f"파형을 열 수 없습니다: {e}")
+            return
+        self.audio_path = audio_path
+        self.cursor_sec = None
+        self.zoom_all()
+
+    def zoom_all(self):
+        if self.peaks is None:
+            return
+        self.view_start, self.view_end = 0.0, self.peaks.duration_sec
+        self.redraw()
+
+    def zoom(self, x: int, zoom_in: bool):
+        if self.peaks is None:
+            return
+        duration = self.peaks.duration_sec
+        span = self.view_end - self.view_start
+        anchor = self.x_to_sec(x)
+        new_span = min(duration, max(MIN_VIEW_SEC, span / ZOOM_STEP if zoom_in else span * ZOOM_STEP))
+        ratio = (anchor - self.view_start) / span if span > 0 else 0.0
+        self.set_view(anchor - new_span * ratio, new_span)
+
+    def scroll(self, action, value, units=None):
+        if self.peaks is None:
+            return
+        span = self.view_end - self.view_start
+        if action == "moveto":
+            start = float(value) * self.peaks.duration_sec
+        else:
+            step = span * (0.9 if units == "pages" else 0.1)
+            start = self.view_start + int(value) * step
+        self.set_view(start, span)
+
+    def set_view(self, start: float, span: float):
+        duration = self.peaks.duration_sec
+        start = min(max(0.0, start), max(0.0, duration - span))
+        self.view_start, self.view_end = start, min(duration, start + span)
+        self.redraw()
+
+    def x_to_sec(self, x: int) -> float:
+        width = max(1, self.canvas.winfo_width())
+        return self.view_start + (self.view_end - self.view_start) * x / width
+
+    def redraw(self):
+        self.canvas.delete("all")
+        if self.peaks is None:
+            return
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width < 2 or height < 2:
+            return
+
+        mins, maxs = self.peaks.select(self.view_start, self.view_end, width)
+        middle = height / 2
+        scale = middle - 2
+        self.canvas.create_line(0, middle, width, middle, fill="#404040")
+        for x, (low, high) in enumerate(zip(mins.tolist(), maxs.tolist())):
+            self.canvas.create_line(x, middle - high * scale, x, middle - low * scale + 1, fill="#4fc3f7")
+
+        if self.cursor_sec is not None and self.view_start <= self.cursor_sec <= self.view_end:
+            span = self.view_end - self.view_start
+            x = (self.cursor_sec - self.view_start) / span * width if span > 0 else 0
+            self.canvas.create_line(x, 0, x, height, fill="#ffb74d")
+
+        duration = self.peaks.duration_sec
+        if duration > 0:
+            self.scrollbar.set(self.view_start / duration, self.view_end / duration)
+        self.status.set(f"{os.path.basename(self.audio_path)}  |  {format_time(self.view_start)} - "
+                        f"{format_time(self.view_end)} / {format_time(duration)}")
+
+    def on_click(self, event):
+        if self.peaks is None:
+            return
+        self.cursor_sec = self.x_to_sec(event.x)
+        self.redraw()
+        self.play_from(self.cursor_sec)
+
+    def play_from(self, start_sec: float):
+        """이전 재생을 멈추고 start_sec부터 재생합니다."""
+        self.stop_playback()
+        try:
+            self._player = subprocess.Popen(
+                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", "-ss", f"{start_sec:.3f}", self.audio_path],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            self.status.set("ffplay가 설치되어 있지 않아 재생할 수 없습니다.")
+
+    def stop_playback(self):
+        if self._player is not None and self._player.poll() is None:
+            self._player.terminate()
+        self._player = None
+
+    def destroy(self):
+        self.stop_playback()
+        super().destroy()
@@ -1,8 +1,10 @@
 import os
 import sys
 import argparse
+import json
 import whisper
 import torch
+import numpy as np
 from typing import Optional
 
 # --- 경로 설정 ---
@@ -11,77 +13,404 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
 
 from common.audio_extractor import extract_audio
 from common.gpu_utils import check_gpu_availability, get_device  # 새 모듈 임포트
+from common.srt_cues import Cue, format_srt_time, read_cues, save_cues
+from common.transcript_store import TRANSCRIPT_FILE, load_transcript, save_transcript, splice_segments
+from common.time_range import OPEN_END_MS, cues_overlapping, parse_timecode, splice_cues, to_ms_range
+from common.asr_cache import ASR_BACKEND, asr_cache_key, load_cached_segments, save_cached_segments, video_fingerprint
+from common.wav_io import memmap_wav, read_wav_info, to_float
+from common.vad import detect_speech_regions, restore_times, save_speech_index, write_speech_audio
+from common.shared_model import run_forked_pool
 
-def transcribe_video(video_path: str, output_dir: str, language: str = "ja", model_size: str = "turbo"):
+# 변환 결과 캐시 위치
+ASR_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", ".cache", "asr")
+
+# Whisper가 한 번에 디코딩하는 구간 길이
+WINDOW_SEC = 30
+# 다음 구간의 initial_prompt로 넘길 이전 텍스트 길이 (글자 수)
+PROMPT_TAIL_CHARS = 200
+
+def transcribe_video(video_path: str, output_dir: str, language: str = "ja", model_size: str = "turbo",
+                     word_timestamps: bool = False, use_cache: bool = True, resumable: bool = False, checkpoint_every: int = 10, model=None,
+                     vad: bool = False, start_sec: Optional[float] = None, end_sec: Optional[float] = None):
     """
     OpenAI Whisper 라이브러리를 사용하여 비디오 파일의 음성을 텍스트로 변환합니다.
     AMD GPU (ROCm) 지원으로 GPU 가속 가능.
+    같은 내용의 비디오를 같은 설정으로 다시 변환하면 캐시된 세그먼트로 바로 created.srt를 만듭니다.
+    resumable이 True면 30초 단위 구간으로 나누어 변환하고 checkpoint_every 구간마다 체크포인트를 남겨,
+    중단된 경우 마지막 체크포인트부터 이어서 변환합니다.
+    model을 주면 새로 로드하지 않고 그 모델을 사용합니다.
+    vad가 True면 에너지 기반으로 말소리 구간만 골라 이어 붙여 변환하고, 구간표로 원래 시간을 되돌립니다.
+    음악이나 긴 묵음에서 연산을 아끼고 헛자막이 생기지 않게 합니다.
+    start_sec/end_sec를 주면 그 구간의 오디오만 추출하여 변환하고, 기존 created.srt에서 구간과 겹치는 자막만 바꿉니다.
+    구간 경계에 걸친 기존 세그먼트는 통째로 바뀌므로, 그 세그먼트의 끝까지 구간을 넓혀 변환합니다.
     """
     print(f"--- OpenAI Whisper를 통한 음성 변환 시작 ---")
     print(f"비디오: {video_path}, 모델: {model_size}, 언어: {language}")
-    
-    # GPU 가속 확인 (모듈화된 로직 사용)
-    gpu_info = check_gpu_availability()
-    device = get_device()
-    print(f"GPU 상태: {gpu_info['details']}")
-    
+
     # 출력 디렉터리 생성
     os.makedirs(output_dir, exist_ok=True)
 
+    time_range = None
+    if start_sec is not None or end_sec is not None:
+        time_range = widen_to_existing_segments(output_dir, to_ms_range(start_sec, end_sec))
+        start_sec = time_range[0] / 1000
+        end_sec = time_range[1] / 1000 if end_sec is not None else None
+        print(f"구간 변환: {format_srt_time(time_range[0])} ~ {format_srt_time(time_range[1]) if end_sec is not None else '끝'} (캐시를 사용하지 않습니다)")
+        use_cache = False
+
+    cache_key = None
+    fingerprint = video_fingerprint(video_path) if os.path.exists(video_path) else None
+    if use_cache and fingerprint:
+        cache_key = asr_cache_key(fingerprint, model_size, language, word_timestamps, backend=asr_backend(vad))
+        cached_segments = load_cached_segments(ASR_CACHE_DIR, cache_key)
+        if cached_segments is not None:
+            print(f"캐시된 변환 결과를 사용합니다 (세그먼트 {len(cached_segments)}개)")
+            return write_created_srt(cached_segments, video_path, output_dir)
+    
     audio_path: Optional[str] = None
+    speech_audio_path: Optional[str] = None
     try:
-        audio_path = extract_audio(video_path, output_dir)
+        duration_sec = end_sec - (start_sec or 0.0) if end_sec is not None else None
+        audio_path = extract_audio(video_path, output_dir, start_sec=start_sec, duration_sec=duration_sec)
         print(f"임시 오디오 파일이 생성되었습니다: {audio_path}")
 
-        print("Whisper 모델을 로드하고 변환을 시작합니다...")
-        model = whisper.load_model(model_size, device=device)
-        result = model.transcribe(audio_path, language=language, verbose=True)
+        offset_map = None
+        transcribe_path = audio_path
+        if vad:
+            speech_audio_path = os.path.splitext(audio_path)[0] + ".speech.wav"
+            offset_map = extract_speech_audio(audio_path, speech_audio_path, video_path, output_dir, save_index=time_range is None)
+            transcribe_path = speech_audio_path
 
-        output_filename_no_ext = os.path.splitext(os.path.basename(video_path))[0]
-        srt_path = os.path.join(output_dir, f"{output_filename_no_ext}.srt")
-        
-        with open(srt_path, 'w', encoding='utf-8') as f:
-            for segment in result['segments']:
-                start_time = format_timestamp(segment['start'])
-                end_time = format_timestamp(segment['end'])
-                text = segment['text'].strip()
-                f.write(f"{segment['id'] + 1}\n{start_time} --> {end_time}\n{text}\n\n")
-        
-        print(f"음성 변환 완료. SRT 파일이 저장되었습니다: {srt_path}")
-
-        target_srt_path = os.path.join(output_dir, "created.srt")
-        if os.path.exists(target_srt_path):
-            os.remove(target_srt_path)
-        os.rename(srt_path, target_srt_path)
-        print(f"파일명을 'created.srt'로 변경했습니다: {target_srt_path}")
-        
-        return target_srt_path
+        if model is None:
+            # GPU 가속 확인 (모듈화된 로직 사용)
+            gpu_info = check_gpu_availability()
+            device = get_device()
+            print(f"GPU 상태: {gpu_info['details']}")
+            print("Whisper 모델을 로드하고 변환을 시작합니다...")
+            model = whisper.load_model(model_size, device=device)
+        if offset_map is not None and offset_map.lengths.size == 0:
+            print("말소리 구간이 없어 변환을 건너뜁니다.")
+            segments = []
+        elif resumable:
+            output_filename_no_ext = os.path.splitext(os.path.basename(video_path))[0]
+            checkpoint_path = os.path.join(output_dir, f"{output_filename_no_ext}.transcribe.ckpt.json")
+            checkpoint_meta = {"fingerprint": fingerprint, "model_size": model_size, "language": language, "word_timestamps": word_timestamps, "vad": vad,
+                               "start_sec": start_sec, "end_sec": end_sec}
+            segments = transcribe_in_windows(model, transcribe_path, checkpoint_path, checkpoint_meta, language, word_timestamps, checkpoint_every)
+        else:
+            result = model.transcribe(transcribe_path, language=language, verbose=True, word_timestamps=word_timestamps)
+            segments = [clean_segment(segment) for segment in result['segments']]
+
+        if offset_map is not None:
+            restore_segment_times(segments, offset_map)
+        if start_sec:
+            shift_segment_times(segments, start_sec)
+
+        if cache_key:
+            save_cached_segments(ASR_CACHE_DIR, cache_key, segments, {
+                "video_path": os.path.abspath(video_path),
+                "model_size": model_size,
+                "language": language,
+                "word_timestamps": word_timestamps,
+                "vad": vad,
+            })
+
+        return write_created_srt(segments, video_path, output_dir, time_range=time_range)
 
     except Exception as e:
         print(f"Whisper 변환 중 오류가 발생했습니다: {e}")
         raise
     finally:
         # 임시 오디오 파일 정리
-        if audio_path and os.path.exists(audio_path):
-            print(f"임시 파일을 정리합니다: {audio_path}")
-            os.remove(audio_path)
+        for temp_path in (audio_path, speech_audio_path):
+            if temp_path and os.path.exists(temp_path):
+                print(f"임시 파일을 정리합니다: {temp_path}")
+                os.remove(temp_path)
+
+def widen_to_existing_segments(output_dir: str, time_range: tuple) -> tuple:
+    """
+    ms 구간을 기존 변환 결과(created.npz, 없으면 created.srt)에서 구간과 겹치는 세그먼트의 시작/끝까지 넓힙니다.
+    경계에 걸친 말이 잘리지 않고 다시 변환되게 합니다. 기존 결과가 없으면 그대로 반환합니다.
+    """
+    start_ms, end_ms = time_range
+    transcript_path = os.path.join(output_dir, TRANSCRIPT_FILE)
+    srt_path = os.path.join(output_dir, "created.srt")
+    if os.path.exists(transcript_path):
+        with load_transcript(transcript_path) as transcript:
+            starts, ends = transcript.start * 1000, transcript.end * 1000
+        overlapping = (ends > start_ms) & (starts < end_ms)
+        if not overlapping.any():
+            return time_range
+        first_ms, last_ms = int(np.floor(starts[overlapping].min())), int(np.ceil(ends[overlapping].max()))
+    elif os.path.exists(srt_path):
+        cues = read_cues(srt_path)
+        first, last = cues_overlapping(cues, start_ms, end_ms)
+        if first == last:
+            return time_range
+        first_ms, last_ms = min(cues.starts[first:last]), max(cues.ends[first:last])
+    else:
+        return time_range
+    widened = (min(start_ms, first_ms), max(end_ms, last_ms))
+    if widened != time_range:
+        print(f"구간 경계에 걸친 기존 자막까지 변환 구간을 넓힙니다: {format_srt_time(widened[0])} ~ "
+              f"{format_srt_time(widened[1]) if widened[1] != OPEN_END_MS else '끝'}")
+    return widened
+
+def asr_backend(vad: bool) -> str:
+    """캐시 키에 쓰는 변환 방식 이름. VAD 사용 여부에 따라 결과가 달라지므로 구분합니다."""
+    return f"{ASR_BACKEND}+vad" if vad else ASR_BACKEND
+
+def extract_speech_audio(audio_path: str, speech_audio_path: str, video_path: str, output_dir: str, save_index: bool = True):
+    """
+    추출한 오디오에서 말소리 구간을 찾아 <비디오 이름>.speech.json에 기록하고,
+    말소리 구간만 이어 붙인 WAV를 만든 뒤 시간 구간표를 반환합니다.
+    구간 변환처럼 비디오 전체가 아닌 오디오라면 save_index를 False로 주어 기존 기록을 덮어쓰지 않습니다.
+    """
+    regions = detect_speech_regions(audio_path)
+    info = read_wav_info(audio_path)
+    if save_index:
+        output_filename_no_ext = os.path.splitext(os.path.basename(video_path))[0]
+        save_speech_index(os.path.join(output_dir, f"{output_filename_no_ext}.speech.json"), regions, info.sample_rate, info.nframes)
+    speech_sec = float((regions[:, 1] - regions[:, 0]).sum()) / info.sample_rate
+    print(f"말소리 구간 {len(regions)}개: 전체 {info.duration_sec:.0f}초 중 {speech_sec:.0f}초만 변환합니다.")
+    return write_speech_audio(audio_path, speech_audio_path, regions)
+
+def restore_segment_times(segments: list, offset_map):
+    """
+    말소리만 이어 붙인 오디오 기준의 세그먼트/단어 시간을 원본 비디오 시간으로 되돌립니다.
+    """
+    if not segments:
+        return
+    starts = restore_times(offset_map, [segment["start"] for segment in segments])
+    ends = restore_times(offset_map, [segment["end"] for segment in segments])
+    for segment, start, end in zip(segments, starts, ends):
+        segment["start"] = float(start)
+        segment["end"] = float(max(end, start))
+        words = segment.get("words")
+        if words:
+            word_starts = restore_times(offset_map, [word["start"] for word in words])
+            word_ends = restore_times(offset_map, [word["end"] for word in words])
+            for word, word_start, word_end in zip(words, word_starts, word_ends):
+                word["start"] = float(word_start)
+                word["end"] = float(max(word_end, word_start))
+
+def shift_segment_times(segments: list, offset_sec: float):
+    """세그먼트/단어 시간을 offset_sec만큼 뒤로 옮깁니다."""
+    for segment in segments:
+        segment["start"] += offset_sec
+        segment["end"] += offset_sec
+        for word in segment.get("words", []):
+            word["start"] += offset_sec
+            word["end"] += offset_sec
+
+def is_transcription_cached(video_path: str, language: str, model_size: str, word_timestamps: bool = False, vad: bool = False) -> bool:
+    """
+    같은 내용의 비디오를 같은 설정으로 변환한 캐시가 있는지 확인합니다.
+    """
+    if not os.path.exists(video_path):
+        return False
+    cache_key = asr_cache_key(video_fingerprint(video_path), model_size, language, word_timestamps, backend=asr_backend(vad))
+    return os.path.exists(os.path.join(ASR_CACHE_DIR, f"{cache_key}.json.gz"))
+
+def _transcribe_with_model(model, video_path: str, output_dir: str, options: dict) -> str:
+    return transcribe_video(video_path, output_dir, model=model, **options)
+
+def transcribe_videos(video_paths: list, output_dir: str, language: str = "ja", model_size: str = "turbo", workers: int = 1, **options) -> list:
+    """
+    여러 비디오를 변환하여 output_dir/<비디오 이름>/created.srt에 저장하고, SRT 경로를 입력 순서대로 반환합니다.
+    workers가 2 이상이면 CPU에 모델을 한 번만 로드해 공유 메모리에 올리고,
+    fork된 작업 프로세스들이 같은 가중치로 동시에 변환합니다. 프로세스 수만큼 모델 메모리가 늘지 않습니다.
+    캐시된 비디오는 모델 없이 바로 처리합니다.
+    """
+    srt_paths = {}
+    pending = []
+    for video_path in video_paths:
+        video_output_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(video_path))[0])
+        if options.get("use_cache", True) and is_transcription_cached(video_path, language, model_size, options.get("word_timestamps", False), options.get("vad", False)):
+            srt_paths[video_path] = transcribe_video(video_path, video_output_dir, language, model_size, **options)
+        else:
+            pending.append((video_path, video_output_dir))
+
+    options = dict(options, language=language, model_size=model_size)
+    if pending and (workers <= 1 or len(pending) == 1):
+        model = whisper.load_model(model_size, device=get_device())
+        for video_path, video_output_dir in pending:
+            srt_paths[video_path] = _transcribe_with_model(model, video_path, video_output_dir, options)
+    elif pending:
+        workers = min(workers, len(pending))
+        print(f"Whisper 모델을 CPU 공유 메모리에 한 번 로드하고 작업 프로세스 {workers}개로 변환합니다...")
+        model = whisper.load_model(model_size, device="cpu")
+        jobs = [(video_path, video_output_dir, options) for video_path, video_output_dir in pending]
+        for (video_path, _), srt_path in zip(pending, run_forked_pool(model, _transcribe_with_model, jobs, workers)):
+            srt_paths[video_path] = srt_path
+
+    return [srt_paths[video_path] for video_path in video_paths]
+
+def load_checkpoint(checkpoint_path: str, checkpoint_meta: dict) -> Optional[dict]:
+    """
+    같은 입력과 설정으로 만든 체크포인트가 있으면 읽어 옵니다.
+    """
+    if not os.path.exists(checkpoint_path):
+        return None
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"체크포인트를 읽을 수 없어 처음부터 변환합니다 ({checkpoint_path}): {e}")
+        return None
+    if checkpoint.get("meta") != checkpoint_meta:
+        print("입력 또는 설정이 달라 기존 체크포인트를 무시합니다.")
+        return None
+    return checkpoint
+
+def save_checkpoint(checkpoint_path: str, checkpoint: dict):
+    """
+    체크포인트를 임시 파일에 쓴 뒤 교체하여, 저장 중에 중단되어도 이전 체크포인트가 남도록 합니다.
+    """
+    temp_path = checkpoint_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(temp_path, checkpoint_path)
+
+def transcribe_in_windows(model, audio_path: str, checkpoint_path: str, checkpoint_meta: dict, language: str,
+                          word_timestamps: bool = False, checkpoint_every: int = 10) -> list:
+    """
+    16kHz 오디오를 30초 경계에 맞춘 구간(checkpoint_every개의 30초 창)씩 변환합니다.
+    오디오는 memmap으로 필요한 구간만 읽고, 구간마다 디코딩된 세그먼트와 다음 구간의 프롬프트를
+    체크포인트에 기록합니다. 체크포인트가 있으면 그 다음 구간부터 이어서 변환합니다.
+    """
+    samples, info = memmap_wav(audio_path)
+    window_frames = WINDOW_SEC * info.sample_rate
+    total_windows = (info.nframes + window_frames - 1) // window_frames
+    span = max(1, checkpoint_every)
+
+    checkpoint = load_checkpoint(checkpoint_path, checkpoint_meta) or {"meta": checkpoint_meta, "next_window": 0, "prompt": None, "segments": []}
+    if checkpoint["next_window"] > 0:
+        print(f"체크포인트에서 재개합니다: {checkpoint['next_window']}/{total_windows} 구간 완료, 세그먼트 {len(checkpoint['segments'])}개")
+
+    while checkpoint["next_window"] < total_windows:
+        first_window = checkpoint["next_window"]
+        last_window = min(first_window + span, total_windows)
+        offset_sec = first_window * WINDOW_SEC
+        audio = to_float(samples[first_window * window_frames:last_window * window_frames]).mean(axis=1)
+
+        print(f"구간 변환 중: {first_window + 1}-{last_window}/{total_windows} ({offset_sec}s~)")
+        result = model.transcribe(audio, language=language, verbose=False, word_timestamps=word_timestamps,
+                                  initial_prompt=checkpoint["prompt"])
+
+        window_segments = [clean_segment(segment) for segment in result['segments']]
+        shift_segment_times(window_segments, offset_sec)
+        for cleaned in window_segments:
+            cleaned["id"] = len(checkpoint["segments"])
+            checkpoint["segments"].append(cleaned)
+
+        # 이전 구간의 마지막 텍스트를 다음 구간의 디코더 프롬프트로 이어 줍니다.
+        recent_text = "".join(segment["text"] for segment in checkpoint["segments"][-8:]).strip()
+        checkpoint["prompt"] = recent_text[-PROMPT_TAIL_CHARS:] or checkpoint["prompt"]
+        checkpoint["next_window"] = last_window
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    segments = checkpoint["segments"]
+    # 변환할 구간이 없으면 체크포인트를 한 번도 쓰지 않았을 수 있습니다.
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return segments
+
+def clean_segment(segment: dict) -> dict:
+    """
+    Whisper 세그먼트를 JSON으로 저장할 수 있는 형태로 정리합니다. 단어 타이밍이 있으면 함께 보존합니다.
+    """
+    cleaned = {
+        "id": int(segment['id']),
+        "start": float(segment['start']),
+        "end": float(segment['end']),
+        "text": segment['text'],
+        "avg_logprob": float(segment.get('avg_logprob', 0.0)),
+        "no_speech_prob": float(segment.get('no_speech_prob', 0.0)),
+        "compression_ratio": float(segment.get('compression_ratio', 0.0)),
+    }
+    if segment.get('words'):
+        cleaned["words"] = [
+            {"word": w['word'], "start": float(w['start']), "end": float(w['end']), "probability": float(w.get('probability', 0.0))}
+            for w in segment['words']
+        ]
+    return cleaned
+
+def write_created_srt(segments: list, video_path: str, output_dir: str, time_range: Optional[tuple] = None) -> str:
+    """
+    세그먼트 목록으로 만든 SRT를 created.srt로 저장하고, 세그먼트는 열 저장 파일(created.npz)로 남깁니다.
+    time_range(ms 구간)를 주면 기존 결과에서 그 구간과 겹치는 세그먼트만 새 세그먼트로 바꿉니다.
+    """
+    output_filename_no_ext = os.path.splitext(os.path.basename(video_path))[0]
+    srt_path = os.path.join(output_dir, f"{output_filename_no_ext}.srt")
+    target_srt_path = os.path.join(output_dir, "created.srt")
+
+    transcript_path = os.path.join(output_dir, TRANSCRIPT_FILE)
+    if time_range is not None:
+        start_sec, end_sec = time_range[0] / 1000, time_range[1] / 1000
+        segments = [dict(segment, start=max(segment["start"], start_sec), end=min(segment["end"], end_sec)) for segment in segments]
+        if os.path.exists(transcript_path):
+            with load_transcript(transcript_path) as transcript:
+                segments, first, last = splice_segments(transcript.to_segments(), segments, start_sec, end_sec)
+            print(f"기존 변환 결과의 구간을 교체했습니다: 세그먼트 {first + 1}-{last} ({last - first}개)")
+        elif os.path.exists(target_srt_path):
+            # 열 저장 파일이 없는 이전 결과는 SRT에서 자막만 교체합니다.
+            new_cues = list(segments_to_cues(segments))
+            cues, first, last = splice_cues(read_cues(target_srt_path), new_cues, *time_range)
+            print(f"기존 자막의 구간을 교체했습니다: 자막 {first + 1}-{last} ({len(new_cues)}개)")
+            segments = None
+    if segments is not None:
+        cues = segments_to_cues(segments)
+    save_cues(srt_path, cues)
+    
+    print(f"음성 변환 완료. SRT 파일이 저장되었습니다: {srt_path}")
+
+    if os.path.exists(target_srt_path):
+        os.remove(target_srt_path)
+    os.rename(srt_path, target_srt_path)
+    print(f"파일명을 'created.srt'로 변경했습니다: {target_srt_path}")
+
+    if segments is not None:
+        # 세그먼트/단어 타이밍과 신뢰도 값은 열 저장 파일에 남깁니다. SRT보다 나중에 저장하므로,
+        # 다음 단계는 SRT가 그 뒤로 편집되지 않았으면 이 파일에서 자막을 읽습니다 (read_transcript_cues).
+        save_transcript(transcript_path, segments)
+        print(f"변환 결과(세그먼트 {len(segments)}개)가 저장되었습니다: {transcript_path}")
+    
+    return target_srt_path
+
+def segments_to_cues(segments):
+    """Whisper 세그먼트를 밀리초 단위 Cue로 순서대로 변환합니다."""
+    for i, segment in enumerate(segments):
+        yield Cue(i + 1, int(round(segment['start'] * 1000)), int(round(segment['end'] * 1000)), segment['text'].strip())
 
 def format_timestamp(seconds: float) -> str:
     """SRT 형식의 타임스탬프 생성 (HH:MM:SS,mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+    return format_srt_time(int(round(seconds * 1000)))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="OpenAI Whisper를 사용하여 비디오 파일의 음성을 텍스트로 변환합니다.")
-    parser.add_argument("--video_path", type=str, help="처리할 비디오 파일의 경로입니다.")
+    parser.add_argument("--video_path", type=str, nargs="+", help="처리할 비디오 파일의 경로입니다. 여러 개를 주면 비디오별 하위 디렉터리에 저장합니다.")
     parser.add_argument("--output_dir", type=str, required=True, help="출력 SRT 파일을 저장할 디렉터리입니다.")
     parser.add_argument("--language", type=str, default="ja", help="음성 인식에 사용할 언어입니다. (기본값: ja)")
     parser.add_argument("--model_size", type=str, default="turbo", choices=["tiny", "base", "small", "medium", "turbo", "large"], 
                         help="Whisper 모델 크기입니다. (기본값: turbo)")
+    parser.add_argument("--word_timestamps", action="store_true", help="단어 단위 타이밍도 함께 계산하여 캐시에 보존합니다.")
+    parser.add_argument("--no_cache", action="store_true", help="캐시된 변환 결과를 사용하지 않고 다시 변환합니다.")
+    parser.add_argument("--resumable", action="store_true", help="30초 구간 단위로 변환하며 체크포인트를 남기고, 중단 시 이어서 변환합니다.")
+    parser.add_argument("--checkpoint_every", type=int, default=10, help="체크포인트를 남길 30초 구간 수입니다. (기본값: 10)")
+    parser.add_argument("--vad", action="store_true", help="음악/묵음 구간을 건너뛰고 말소리 구간만 변환합니다.")
+    parser.add_argument("--start", type=parse_timecode, default=None, help="이 시간부터만 변환하여 기존 created.srt의 해당 구간을 바꿉니다. (예: 00:42:00)")
+    parser.add_argument("--end", type=parse_timecode, default=None, help="이 시간까지만 변환합니다. (예: 00:45:00)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="여러 비디오를 변환할 때 모델 가중치를 공유하는 CPU 작업 프로세스 수입니다. (기본값: 1)")
     
     args = parser.parse_args()
     
-    transcribe_video(args.video_path, args.output_dir, args.language, args.model_size)
\ No newline at end of file
+    options = dict(word_timestamps=args.word_timestamps, use_cache=not args.no_cache,
+                   resumable=args.resumable, checkpoint_every=args.checkpoint_every, vad=args.vad)
+    if len(args.video_path) == 1:
+        transcribe_video(args.video_path[0], args.output_dir, args.language, args.model_size, start_sec=args.start, end_sec=args.end, **options)
+    elif args.start is not None or args.end is not None:
+        parser.error("--start/--end는 비디오 하나를 변환할 때만 사용할 수 있습니다.")
+    else:
+        transcribe_videos(args.video_path, args.output_dir, args.language, args.model_size, workers=args.workers, **options)
\ No newline at end of file
@@ -1,14 +1,19 @@
 import os
 import sys
 import argparse
-import srt
 import re
+from typing import Optional
 import google.generativeai as genai
 from dotenv import load_dotenv
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
 
+from common.srt_cues import Cue, CueList, read_cues, save_cues
+from common.time_range import cues_overlapping, parse_timecode, splice_cues, to_ms_range
+from common.cue_prefilter import estimate_tokens, prefilter_cues
+from common.transcript_store import read_transcript_cues
+
 load_dotenv()
 CORRECTION_PROMPT = '''You are an expert subtitle translator and editor. Your task is to correct the following list of Japanese subtitles.
 
@@ -44,125 +49,242 @@ if not GEMINI_API_KEY:
 genai.configure(api_key=GEMINI_API_KEY)
 model = genai.GenerativeModel('models/gemini-pro-latest')
 
-def correct_srt_with_gemini(source_srt_path: str, output_srt_path: str):
+# 응답에서 빠진 자막을 다시 요청하는 최대 횟수
+MAX_RETRY_ROUNDS = 2
+
+_CORRECTED_LINE_RE = re.compile(r"^\s*(\d+)\s*:\s*(.*)$", re.MULTILINE)
+
+def flatten_text(text: str) -> str:
     """
-    Gemini API를 사용하여 SRT 파일의 내용을 한 번의 요청으로 교정합니다.
+    여러 줄 자막을 한 줄로 합칩니다. 프롬프트의 "N: text" 형식이 깨지지 않게 합니다.
     """
-    print(f"--- Gemini API를 사용한 SRT 교정 시작 ---")
-    print(f"입력 SRT 파일: {source_srt_path}")
+    return " ".join(text.split("\n")).strip()
 
-    try:
-        with open(source_srt_path, 'r', encoding='utf-8') as f:
-            srt_content = f.read()
-    except FileNotFoundError:
-        print(f"오류: 입력 파일 {source_srt_path}를 찾을 수 없습니다.")
-        return
-
-    subtitles = list(srt.parse(srt_content))
-    
-    # 모든 자막 내용을 하나의 문자열로 합칩니다。
-    original_texts = "\n".join([f"{i+1}: {sub.content}" for i, sub in enumerate(subtitles)])
+def parse_corrected_lines(response_text: str, valid_ids) -> dict:
+    """
+    응답에서 "N: text" 줄을 한 번에 훑어 번호별 교정 결과를 만듭니다.
+    요청하지 않은 번호와 중복된 번호(처음 것만 사용)는 무시합니다.
+    """
+    valid_ids = set(valid_ids)
+    corrected_by_id = {}
+    for match in _CORRECTED_LINE_RE.finditer(response_text):
+        line_id = int(match.group(1))
+        if line_id in valid_ids and line_id not in corrected_by_id:
+            corrected_by_id[line_id] = match.group(2).strip()
+    return corrected_by_id
 
+def request_corrections(subtitles: list, line_ids) -> dict:
+    """
+    지정한 번호(1부터)의 자막만 원래 번호를 유지한 채 Gemini에 교정을 요청합니다.
+    """
+    line_ids = list(line_ids)
+    original_texts = "\n".join([f"{i}: {flatten_text(subtitles[i - 1].text)}" for i in line_ids])
     prompt = CORRECTION_PROMPT.format(original_texts=original_texts)
+    response = model.generate_content(prompt)
+    return parse_corrected_lines(response.text.strip(), line_ids)
 
-    try:
-        response = model.generate_content(prompt)
-        corrected_text_block = response.text.strip()
-        
-        # 응답에서 교정된 문장들을 추출합니다.
-        corrected_lines = re.findall(r"^\d+:\s*(.*)", corrected_text_block, re.MULTILINE)
-
-        if not corrected_lines or len(corrected_lines) != len(subtitles):
-            raise ValueError(f"오류: 원본 자막({len(subtitles)}개)과 교정된 자막({len(corrected_lines)}개)의 수가 일치하지 않거나, 응답 형식이 잘못되었습니다.")
-
-        new_subtitles = []
-        i = 0
-        while i < len(subtitles):
-            original_line_content = subtitles[i].content.strip()
-            corrected_line = corrected_lines[i].strip()
-            
-            # If the corrected line is identical to the original, it might be a merged line.
-            # We only consider it merged if the *previous* line was actually corrected/merged.
-            # This logic needs to be careful to not merge lines that were simply not changed by the LLM.
-            
-            # This is a new subtitle. Find out if it merges subsequent lines.
-            start_sub = subtitles[i]
-            end_sub = subtitles[i]
-            
-            merge_count = 0
-            # Check if the current line was actually corrected (not just identical to original)
-            is_current_line_corrected = (corrected_line != original_line_content)
-
-            if is_current_line_corrected: # Only look for merges if the current line was actually changed
-                for j in range(i + 1, len(subtitles)):
-                    next_original_line_content = subtitles[j].content.strip()
-                    next_corrected_line = corrected_lines[j].strip()
-                    
-                    # If the next corrected line is identical to its original, it's part of the merge
-                    if next_corrected_line == next_original_line_content:
-                        merge_count += 1
-                        end_sub = subtitles[j]
-                    else:
-                        break
-            
-            if merge_count > 0:
-                original_merged_text = " ".join([s.content for s in subtitles[i:i+merge_count+1]])
-                print(f'  병합 및 교정: "{original_merged_text}" -> "{corrected_line}"')
-            else:
-                print(f'  교정: "{start_sub.content}" -> "{corrected_line}"')
-            
-            # Now handle splitting (||) for the potentially merged line
-            if "||" in corrected_line:
-                parts = corrected_line.split("||")
-                num_parts = len(parts)
-                duration_per_part = (end_sub.end - start_sub.start) / num_parts
-                current_start = start_sub.start
-                for part_text in parts:
-                    new_end = current_start + duration_per_part
-                    new_sub = srt.Subtitle(
-                        index=len(new_subtitles) + 1,
-                        start=current_start,
-                        end=new_end,
-                        content=part_text.strip()
-                    )
-                    new_subtitles.append(new_sub)
-                    current_start = new_end
-                    print(f'    분할된 자막: "{part_text.strip()}"')
-            else:
-                new_sub = srt.Subtitle(
+def align_corrections(subtitles: list, corrected_by_id: dict) -> list:
+    """
+    번호로 정렬된 교정 결과를 원본 자막에 한 번의 선형 순회로 맞춥니다.
+    교정된 줄 뒤에 모델이 원문 그대로 돌려준 줄이 이어지면 병합된 것으로 보고 구간을 합치며,
+    '||' 표시는 구간을 나누어 여러 자막으로 만듭니다. 응답이 없는 줄은 원본을 그대로 쓰고 병합하지 않습니다.
+    """
+    n = len(subtitles)
+    originals = [flatten_text(sub.text) for sub in subtitles]
+    corrected = [corrected_by_id.get(i + 1, originals[i]).strip() for i in range(n)]
+
+    # unchanged_run[j]: j번째부터 연속으로 "원문 그대로 돌려받은" 줄의 수. 뒤에서부터 한 번에 계산합니다.
+    unchanged_run = [0] * (n + 1)
+    for j in range(n - 1, -1, -1):
+        if (j + 1) in corrected_by_id and corrected[j] == originals[j]:
+            unchanged_run[j] = unchanged_run[j + 1] + 1
+
+    new_subtitles = []
+    i = 0
+    while i < n:
+        corrected_line = corrected[i]
+        start_sub = subtitles[i]
+
+        # Only look for merges if the current line was actually changed
+        merge_count = unchanged_run[i + 1] if corrected_line != originals[i] else 0
+        end_sub = subtitles[i + merge_count]
+
+        if merge_count > 0:
+            original_merged_text = " ".join(originals[i:i+merge_count+1])
+            print(f'  병합 및 교정: "{original_merged_text}" -> "{corrected_line}"')
+        else:
+            print(f'  교정: "{start_sub.text}" -> "{corrected_line}"')
+
+        # Now handle splitting (||) for the potentially merged line
+        if "||" in corrected_line:
+            parts = corrected_line.split("||")
+            num_parts = len(parts)
+            duration_per_part = (end_sub.end - start_sub.start) // num_parts
+            current_start = start_sub.start
+            for part_index, part_text in enumerate(parts):
+                # 마지막 조각은 나눗셈 오차 없이 원래 종료 시간에 맞춥니다.
+                new_end = end_sub.end if part_index == num_parts - 1 else current_start + duration_per_part
+                new_sub = Cue(
                     index=len(new_subtitles) + 1,
-                    start=start_sub.start,
-                    end=end_sub.end,
-                    content=corrected_line
+                    start=current_start,
+                    end=new_end,
+                    text=part_text.strip()
                 )
                 new_subtitles.append(new_sub)
+                current_start = new_end
+                print(f'    분할된 자막: "{part_text.strip()}"')
+        else:
+            new_sub = Cue(
+                index=len(new_subtitles) + 1,
+                start=start_sub.start,
+                end=end_sub.end,
+                text=corrected_line
+            )
+            new_subtitles.append(new_sub)
+
+        # Move index past all merged subtitles
+        i += 1 + merge_count
 
-            # Move index past all merged subtitles
-            i += 1 + merge_count
+    return new_subtitles
 
-        corrected_subtitles = new_subtitles
+def request_all_corrections(subtitles: list, line_ids: list) -> dict:
+    """
+    지정한 번호의 자막을 한 번의 요청으로 교정하고, 응답에서 빠진 번호만 다시 요청합니다.
+    Raises:
+        Exception: 첫 요청이 실패한 경우 (Gemini API 오류).
+    """
+    corrected_by_id = request_corrections(subtitles, line_ids)
+
+    # 응답에서 빠진 번호만 다시 요청합니다.
+    for retry in range(MAX_RETRY_ROUNDS):
+        missing_ids = [i for i in line_ids if i not in corrected_by_id]
+        if not missing_ids:
+            break
+        print(f"  응답에서 빠진 자막 {len(missing_ids)}개를 다시 요청합니다 ({retry + 1}/{MAX_RETRY_ROUNDS})")
+        try:
+            corrected_by_id.update(request_corrections(subtitles, missing_ids))
+        except Exception as e:
+            # 재요청이 실패해도 이미 받은 교정 결과는 유지합니다.
+            print(f"  재요청 중 오류 발생: {e}")
+            break
+
+    missing_count = len(line_ids) - len(corrected_by_id)
+    if missing_count:
+        print(f"  경고: 자막 {missing_count}개는 교정 결과를 받지 못해 원본을 사용합니다.")
+    return corrected_by_id
+
+def correct_cues(subtitles: list, prefilter: bool = True) -> list:
+    """
+    자막 목록을 한 번의 요청으로 교정하고, 빠진 번호만 다시 요청한 뒤 병합/분할을 반영한 자막 목록을 반환합니다.
+    prefilter가 True면 먼저 로컬 규칙으로 정리하고(prefilter_cues), 문맥이 필요한 자막만 모델에 보냅니다.
+    모델에 보내지 않은 자막을 사이에 둔 자막끼리는 병합하지 않습니다.
+    API 오류가 나면 (사전 정리만 한) 원본 자막을 그대로 반환합니다.
+    """
+    if not subtitles:
+        return []
+    if prefilter:
+        cues, needs_model = prefilter_cues(subtitles)
+        line_ids = [i + 1 for i, need in enumerate(needs_model) if need]
+        all_tokens = sum(estimate_tokens(f"{i}: {flatten_text(sub.text)}\n") for i, sub in enumerate(subtitles, 1))
+        sent_tokens = sum(estimate_tokens(f"{i}: {cues[i - 1].text}\n") for i in line_ids)
+        print(f"  사전 정리: 자막 {len(subtitles)}개 -> {len(cues)}개 (같은 자막 병합 {len(subtitles) - len(cues)}개), "
+              f"모델에 보낼 자막 {len(line_ids)}개, 로컬 처리 {len(cues) - len(line_ids)}개")
+        # 응답도 보낸 줄 수만큼 돌아오므로 입력과 출력 모두에서 줄어듭니다.
+        print(f"  절약한 토큰: 약 {2 * (all_tokens - sent_tokens)}개 (입력+출력, 글자 수 기준 추정)")
+    else:
+        cues = list(subtitles)
+        line_ids = list(range(1, len(cues) + 1))
+    if not line_ids:
+        return [Cue(i + 1, cue.start, cue.end, cue.text) for i, cue in enumerate(cues)]
+
+    try:
+        corrected_by_id = request_all_corrections(cues, line_ids)
+
+        # 모델에 보낸 자막이 이어지는 구간마다 병합/분할을 맞추고, 로컬 처리한 자막은 그대로 둡니다.
+        corrected_subtitles = []
+        sent = set(line_ids)
+        i = 1
+        while i <= len(cues):
+            if i not in sent:
+                corrected_subtitles.append(cues[i - 1])
+                i += 1
+                continue
+            block_end = i
+            while block_end + 1 in sent:
+                block_end += 1
+            block = cues[i - 1:block_end]
+            corrected_subtitles.extend(align_corrections(block, {k - i + 1: corrected_by_id[k] for k in range(i, block_end + 1) if k in corrected_by_id}))
+            i = block_end + 1
+        corrected_subtitles = [Cue(k + 1, sub.start, sub.end, sub.text) for k, sub in enumerate(corrected_subtitles)]
 
     except Exception as e:
         print(f"  Gemini API 처리 중 오류 발생: {e}")
         # 오류 발생 시 원본 자막을 그대로 사용
         print("  오류로 인해 원본 자막을 사용합니다.")
-        corrected_subtitles = subtitles
+        corrected_subtitles = cues
+    return corrected_subtitles
+
+def correct_srt_with_gemini(source_srt_path: str, output_srt_path: str, start_sec: Optional[float] = None, end_sec: Optional[float] = None,
+                            prefilter: bool = True):
+    """
+    Gemini API를 사용하여 SRT 파일의 내용을 한 번의 요청으로 교정합니다.
+    start_sec/end_sec를 주면 그 구간과 겹치는 자막만 교정하여, 기존 교정 파일의 같은 구간만 바꿉니다.
+    prefilter가 True면 감탄사/반복 자막은 로컬 규칙으로 처리하고 나머지만 모델에 보냅니다.
+    """
+    print(f"--- Gemini API를 사용한 SRT 교정 시작 ---")
+    print(f"입력 SRT 파일: {source_srt_path}")
+
+    try:
+        # 변환 결과의 열 저장 파일이 최신이면 SRT를 파싱하지 않고 그것에서 읽습니다.
+        subtitles = list(read_transcript_cues(source_srt_path))
+    except FileNotFoundError:
+        print(f"오류: 입력 파일 {source_srt_path}를 찾을 수 없습니다.")
+        return
+
+    if start_sec is None and end_sec is None:
+        corrected_subtitles = correct_cues(subtitles, prefilter=prefilter)
+    else:
+        corrected_subtitles = correct_cue_range(subtitles, output_srt_path, *to_ms_range(start_sec, end_sec), prefilter=prefilter)
 
     # 교정된 자막을 새로운 SRT 파일로 저장
-    final_srt_content = srt.compose(corrected_subtitles)
     try:
-        with open(output_srt_path, 'w', encoding='utf-8') as f:
-            f.write(final_srt_content)
+        save_cues(output_srt_path, corrected_subtitles)
         print(f"교정 완료. 새로운 SRT 파일이 저장되었습니다: {output_srt_path}")
     except IOError as e:
         print(f"오류: 출력 파일 {output_srt_path}를 쓰는 중 오류가 발생했습니다: {e}")
 
+def correct_cue_range(subtitles: list, output_srt_path: str, start_ms: int, end_ms: int, prefilter: bool = True) -> CueList:
+    """
+    구간과 겹치는 자막만 교정하여 기존 교정 파일(output_srt_path)의 해당 구간에 끼워 넣은 전체 목록을 반환합니다.
+    교정 파일이 아직 없으면 구간 밖은 원본 자막을 씁니다.
+    """
+    source = CueList(subtitles)
+    first, last = cues_overlapping(source, start_ms, end_ms)
+    selected = [Cue(i + 1, cue.start, cue.end, cue.text) for i, cue in enumerate(subtitles[first:last])]
+    print(f"구간 교정: 자막 {first + 1}-{last} ({len(selected)}개 / 전체 {len(subtitles)}개)만 요청합니다.")
+    corrected = correct_cues(selected, prefilter=prefilter)
+
+    # 병합/분할로 구간 끝의 자막이 조금 넘칠 수 있으므로, 바꾼 원본 자막이 차지하던 시간까지 교체합니다.
+    if selected:
+        start_ms = min(start_ms, selected[0].start)
+        end_ms = max(end_ms, max(cue.end for cue in selected))
+    if os.path.exists(output_srt_path):
+        base = read_cues(output_srt_path)
+    else:
+        print(f"  경고: 기존 교정 파일이 없어 구간 밖은 원본 자막을 사용합니다: {output_srt_path}")
+        base = source
+    spliced, _, _ = splice_cues(base, corrected, start_ms, end_ms)
+    return spliced
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Gemini API를 사용하여 SRT 파일의 내용을 교정합니다.")
     parser.add_argument("source_srt_path", type=str, help="교정할 원본 SRT 파일의 경로입니다.")
     parser.add_argument("output_srt_path", type=str, help="교정된 내용을 저장할 SRT 파일의 경로입니다.")
+    parser.add_argument("--start", type=parse_timecode, default=None, help="이 시간부터의 자막만 교정하여 기존 교정 파일의 해당 구간을 바꿉니다. (예: 00:42:00)")
+    parser.add_argument("--end", type=parse_timecode, default=None, help="이 시간까지의 자막만 교정합니다. (예: 00:45:00)")
+    parser.add_argument("--no_prefilter", action="store_true", help="감탄사/반복 자막의 로컬 사전 정리를 끄고 모든 자막을 모델에 보냅니다.")
     
     args = parser.parse_args()
     
-    correct_srt_with_gemini(args.source_srt_path, args.output_srt_path)
+    correct_srt_with_gemini(args.source_srt_path, args.output_srt_path, start_sec=args.start, end_sec=args.end, prefilter=not args.no_prefilter)
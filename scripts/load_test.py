@@ -0,0 +1,280 @@
+import os
+import sys
+import argparse
+import json
+import random
+import re
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import numpy as np
+
+# --- 경로 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
+
+from common.chunk_planner import estimate_speech_ms
+from common.wav_io import read_wav_info
+
+DEFAULT_LEVELS = "1,4,16"
+DEFAULT_VIDEO_SEC = 120
+# 가짜 엔진들의 처리 속도
+DEFAULT_TTS_SEC_PER_CHAR = 0.02
+DEFAULT_ASR_REALTIME_FACTOR = 0.05
+DEFAULT_GEMINI_LATENCY_SEC = 1.0
+DEFAULT_GEMINI_ERROR_RATE = 0.1
+
+REPORT_DIR = os.path.join(PROJECT_ROOT, "data", ".cache", "load_test")
+PERCENTILES = (50, 90, 99)
+
+_FAKE_LINES = ["今日はいい天気ですね。", "ちょっと待ってください。", "本当にありがとうございます！", "それは知りませんでした。", "また明日会いましょう。"]
+
+
+def write_tone_wav(path: str, duration_sec: float, sample_rate: int = 16000, seed: int = 0):
+    """말소리 대신 쓰는 짧은 톤 구간들로 이루어진 테스트 오디오를 씁니다."""
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(duration_sec * sample_rate), dtype=np.float32)
+    position = 0
+    while position < len(samples):
+        burst = int(rng.uniform(1.0, 3.0) * sample_rate)
+        t = np.arange(min(burst, len(samples) - position)) / sample_rate
+        samples[position:position + len(t)] = 0.3 * np.sin(2 * np.pi * rng.uniform(150, 300) * t)
+        position += burst + int(rng.uniform(0.3, 1.0) * sample_rate)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((samples * 32767).astype('<i2').tobytes())
+
+
+class FakeTTSServer:
+    """
+    Chatterbox-TTS-Server의 /tts를 흉내 내는 로컬 서버입니다.
+    글자 수에 비례해 기다린 뒤 예상 발화 길이만큼의 WAV를 돌려주고, 요청별 지연 시간을 기록합니다.
+    """
+
+    def __init__(self, sec_per_char: float, sample_rate: int = 24000):
+        self.sec_per_char = sec_per_char
+        self.sample_rate = sample_rate
+        self.latencies = []
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                started = time.monotonic()
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                text = payload.get("text", "")
+                time.sleep(len(text) * fake.sec_per_char)
+                body = fake.wav_bytes(estimate_speech_ms(text) / 1000.0)
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/wav")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with fake._lock:
+                    fake.latencies.append(time.monotonic() - started)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def wav_bytes(self, duration_sec: float) -> bytes:
+        t = np.arange(int(duration_sec * self.sample_rate)) / self.sample_rate
+        pcm = (0.2 * np.sin(2 * np.pi * 220 * t) * 32767).astype('<i2').tobytes()
+        with tempfile.SpooledTemporaryFile() as buffer:
+            with wave.open(buffer, 'wb') as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(self.sample_rate)
+                f.writeframes(pcm)
+            buffer.seek(0)
+            return buffer.read()
+
+    def shutdown(self):
+        self._server.shutdown()
+
+
+class FakeGeminiModel:
+    """
+    genai.GenerativeModel 대신 쓰는 가짜 모델입니다. 지정한 지연 후 프롬프트의 자막을 그대로 돌려주고,
+    error_rate 확률로 예외를 발생시킵니다.
+    """
+
+    def __init__(self, latency_sec: float, error_rate: float):
+        self.latency_sec = latency_sec
+        self.error_rate = error_rate
+
+    def generate_content(self, prompt: str):
+        time.sleep(self.latency_sec * random.uniform(0.5, 1.5))
+        if random.random() < self.error_rate:
+            raise RuntimeError("가짜 Gemini 오류 (503)")
+        original = prompt.split("**Original Subtitles:**", 1)[-1].split("**Corrected Subtitles:**", 1)[0]
+        lines = re.findall(r"^\s*\d+\s*:.*$", original, re.MULTILINE)
+        return SimpleNamespace(text="\n".join(line.strip() for line in lines))
+
+
+class FakeWhisperModel:
+    """
+    Whisper 모델 대신 쓰는 가짜 모델입니다. 오디오 길이 × realtime_factor만큼 기다린 뒤 2~4초 간격의 세그먼트를 만듭니다.
+    """
+
+    def __init__(self, realtime_factor: float):
+        self.realtime_factor = realtime_factor
+
+    def transcribe(self, audio, language=None, verbose=None, word_timestamps=False, initial_prompt=None, **kwargs):
+        duration = read_wav_info(audio).duration_sec if isinstance(audio, str) else len(audio) / 16000
+        time.sleep(duration * self.realtime_factor)
+        rng = random.Random(int(duration * 1000))
+        segments = []
+        position = 0.0
+        while position < duration - 1.0:
+            end = min(duration, position + rng.uniform(2.0, 4.0))
+            segments.append({"id": len(segments), "start": position, "end": end, "text": rng.choice(_FAKE_LINES)})
+            position = end + rng.uniform(0.2, 0.8)
+        return {"segments": segments}
+
+
+def install_fakes(args):
+    """파이프라인 모듈의 Whisper/Gemini를 가짜로 바꿔 넣습니다. TTS는 가짜 서버 주소로 연결합니다."""
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+    import create_subtitles
+    import llm_correction
+    create_subtitles.whisper = SimpleNamespace(load_model=lambda *a, **k: FakeWhisperModel(args.asr_realtime_factor))
+    llm_correction.model = FakeGeminiModel(args.gemini_latency, args.gemini_error_rate)
+
+
+def run_job(job_index: int, video_path: str, work_dir: str, tts_url: str, duration_sec: float) -> dict:
+    """비디오 하나에 main의 전체 흐름(자막 생성 → 교정 → TTS 합성/병합)을 실행하고 단계별 소요 시간을 잽니다."""
+    from create_subtitles import transcribe_video
+    from main import correct_subtitles, synthesize_tts_from_srt
+
+    timings = {}
+    job_dir = os.path.join(work_dir, f"job_{job_index:03d}")
+    started = time.monotonic()
+    created_srt_path = transcribe_video(video_path, os.path.join(job_dir, "subtitles"), use_cache=False)
+    timings["asr"] = time.monotonic() - started
+
+    started = time.monotonic()
+    corrected_srt_path = os.path.join(job_dir, "corrected.srt")
+    correct_subtitles(created_srt_path, corrected_srt_path)
+    timings["correction"] = time.monotonic() - started
+
+    started = time.monotonic()
+    synthesize_tts_from_srt(corrected_srt_path, video_path, os.path.join(job_dir, "tts"), "ja", 0.8, 1.0, 0.6, 40, 0,
+                            reference_audio=None, tts_server_url=tts_url)
+    timings["tts"] = time.monotonic() - started
+    timings["total"] = sum(timings.values())
+    return {"timings": timings, "audio_sec": duration_sec}
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {}
+    return {f"p{p}": round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+
+
+def run_level(concurrency: int, args) -> dict:
+    """동시 비디오 concurrency개로 한 번 측정합니다. 최대 RSS를 따로 재기 위해 별도 프로세스에서 호출됩니다."""
+    install_fakes(args)
+    work_dir = tempfile.mkdtemp(prefix=f"load_{concurrency}_")
+    server = FakeTTSServer(args.tts_sec_per_char)
+    try:
+        videos = []
+        for i in range(concurrency):
+            path = os.path.join(work_dir, f"video_{i:03d}.wav")
+            write_tone_wav(path, args.video_sec, seed=int(time.time()) + i)
+            videos.append(path)
+
+        started = time.monotonic()
+        results, errors = [], []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(run_job, i, path, work_dir, server.url, args.video_sec) for i, path in enumerate(videos)]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+        wall_sec = time.monotonic() - started
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    audio_min = sum(result["audio_sec"] for result in results) / 60.0
+    # Linux에서 ru_maxrss는 KB 단위입니다. ffmpeg 등 자식 프로세스의 최대값도 함께 봅니다.
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    peak_child_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024.0
+    return {
+        "concurrency": concurrency,
+        "videos_ok": len(results),
+        "errors": errors,
+        "wall_sec": round(wall_sec, 2),
+        "throughput_audio_min_per_wall_min": round(audio_min / (wall_sec / 60.0), 3) if wall_sec else 0.0,
+        "stage_latency_sec": {stage: percentiles([result["timings"][stage] for result in results])
+                              for stage in ("asr", "correction", "tts", "total")},
+        "tts_request_latency_sec": percentiles(server.latencies),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "peak_child_rss_mb": round(peak_child_rss_mb, 1),
+    }
+
+
+def print_report(reports: list):
+    print(f"{'동시':>4} | {'처리량(오디오분/분)':>18} | {'벽시계(s)':>9} | {'ASR p50/p90':>13} | {'교정 p50/p90':>13} | {'TTS p50/p90':>13} | {'RSS(MB)':>8} | 오류")
+    for report in reports:
+        stages = report["stage_latency_sec"]
+        cells = [f"{stages[s].get('p50', 0):.1f}/{stages[s].get('p90', 0):.1f}" for s in ("asr", "correction", "tts")]
+        print(f"{report['concurrency']:>4} | {report['throughput_audio_min_per_wall_min']:>18.2f} | {report['wall_sec']:>9.1f} | "
+              f"{cells[0]:>13} | {cells[1]:>13} | {cells[2]:>13} | {report['peak_rss_mb']:>8.0f} | {len(report['errors'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 TTS 서버/Gemini/ASR로 전체 파이프라인의 동시 처리 성능을 측정합니다.")
+    parser.add_argument("--levels", type=str, default=DEFAULT_LEVELS, help=f"측정할 동시 비디오 수 목록입니다. (기본값: {DEFAULT_LEVELS})")
+    parser.add_argument("--video_sec", type=float, default=DEFAULT_VIDEO_SEC, help=f"테스트 비디오 하나의 길이(초)입니다. (기본값: {DEFAULT_VIDEO_SEC})")
+    parser.add_argument("--tts_sec_per_char", type=float, default=DEFAULT_TTS_SEC_PER_CHAR, help="가짜 TTS 서버가 글자당 기다리는 시간(초)입니다.")
+    parser.add_argument("--asr_realtime_factor", type=float, default=DEFAULT_ASR_REALTIME_FACTOR, help="가짜 ASR의 처리 시간 / 오디오 길이 비율입니다.")
+    parser.add_argument("--gemini_latency", type=float, default=DEFAULT_GEMINI_LATENCY_SEC, help="가짜 Gemini 응답 지연(초)입니다.")
+    parser.add_argument("--gemini_error_rate", type=float, default=DEFAULT_GEMINI_ERROR_RATE, help="가짜 Gemini 요청이 실패할 확률입니다. (0 ~ 1)")
+    parser.add_argument("--report_path", type=str, default=None, help="결과 JSON을 저장할 경로입니다.")
+    parser.add_argument("--run_level", type=int, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_level is not None:
+        # 자식 프로세스: 한 단계만 측정하고 결과를 report_path에 씁니다. 파이프라인 로그는 버립니다.
+        report = run_level(args.run_level, args)
+        with open(args.report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False)
+        sys.exit(0)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    report_path = args.report_path or os.path.join(REPORT_DIR, f"load_test_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    reports = []
+    for level in [int(value) for value in args.levels.split(",") if value.strip()]:
+        print(f"--- 동시 비디오 {level}개 측정 중 ---")
+        level_path = f"{report_path}.{level}.json"
+        command = [sys.executable, os.path.abspath(__file__), "--run_level", str(level), "--report_path", level_path,
+                   "--video_sec", str(args.video_sec), "--tts_sec_per_char", str(args.tts_sec_per_char),
+                   "--asr_realtime_factor", str(args.asr_realtime_factor), "--gemini_latency", str(args.gemini_latency),
+                   "--gemini_error_rate", str(args.gemini_error_rate)]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(level_path, 'r', encoding='utf-8') as f:
+            reports.append(json.load(f))
+        os.remove(level_path)
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(reports, f, ensure_ascii=False, indent=2)
+    print_report(reports)
+    print(f"결과가 저장되었습니다: {report_path}")
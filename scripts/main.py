@@ -1,23 +1,46 @@
 import os
 import sys
 import argparse
-import subprocess
+import glob
 from datetime import datetime
-from pydub import AudioSegment
 
 # --- 경로 설정 ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
 
-from create_subtitles import transcribe_video
+from create_subtitles import transcribe_video, widen_to_existing_segments
 from llm_correction import correct_srt_with_gemini
+from common.srt_cues import CueList, read_cues, save_cues
+from common.time_range import parse_timecode, to_ms_range
+from common.chunk_planner import CHUNK_SEPARATOR, Chunk, flatten_cue_text, plan_chunks, chunk_cue_texts, chunk_entry, cue_snapshot_path, save_chunk_plan, load_chunk_plan, update_chunk_plan, write_chunk_plan, dubbed_cue_timings, parse_cue_selection, chunks_for_cues
+from common.priority_scheduler import PriorityScheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from common.preview_player import PreviewPlayer
+from common.peaks import peaks_path_for, update_peaks_range
+from common.audio_sink import AudioSink, OUTPUT_EXTENSIONS, concat_wavs
+from common.video_muxer import mux_dubbed_video
+from common.loudness import measure_loudness, compute_gains
+from common.time_fit import STRETCH_TOLERANCE, fit_chunks_to_slots, stretch_files
+from common.silence_trim import trim_silence_files, pause_gaps_ms
+from common.wav_io import memmap_wav, read_wav_info
+from common.reference_audio import prepare_reference_audio
+from common.tts_runner import ChunkSynthesisError, DEFAULT_TIMEOUT_SEC, DEFAULT_RETRIES
+from common.tts_engine import TTSEngine, publish_reference_audio
 
-def create_subtitles(video_path: str, output_dir: str):
+# 전처리된 참조 오디오 캐시 위치
+REFERENCE_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", ".cache", "reference_audio")
+# TTS 서버가 참조 오디오를 찾는 디렉터리 (config.yaml의 tts_engine.reference_audio_path)
+SERVER_REFERENCE_DIR = os.path.join(PROJECT_ROOT, "reference_audio")
+
+def create_subtitles(video_path: str, output_dir: str, vad: bool = False, start_sec: float = None, end_sec: float = None,
+                     model_size: str = "turbo", model=None):
     """
     create_subtitles.py를 사용하여 SRT 자막 파일을 생성합니다.
+    vad가 True면 말소리 구간만 변환합니다.
+    start_sec/end_sec를 주면 그 구간만 변환하여 기존 자막의 해당 구간을 바꿉니다.
+    model을 주면(UI에서 미리 올려 둔 model_size 모델) 새로 로드하지 않습니다.
     """
     print("--- SRT 자막 파일 생성 ---")
-    transcribe_video(video_path, output_dir)
+    transcribe_video(video_path, output_dir, model_size=model_size, model=model, vad=vad, start_sec=start_sec, end_sec=end_sec)
 
     # 파일명을 created.srt로 변경
     source_srt_path = os.path.join(output_dir, "source.srt")
@@ -27,131 +50,567 @@ def create_subtitles(video_path: str, output_dir: str):
         print(f"파일명을 'created.srt'로 변경했습니다: {created_srt_path}")
     return created_srt_path
 
-def correct_subtitles(input_srt_path: str, output_srt_path: str):
+def correct_subtitles(input_srt_path: str, output_srt_path: str, start_sec: float = None, end_sec: float = None):
     """
     llm_correction.py를 사용하여 SRT 파일을 Gemini API로 교정합니다.
+    start_sec/end_sec를 주면 그 구간의 자막만 교정합니다.
     """
     print("--- SRT 파일 Gemini API 교정 ---")
-    correct_srt_with_gemini(input_srt_path, output_srt_path)
+    correct_srt_with_gemini(input_srt_path, output_srt_path, start_sec=start_sec, end_sec=end_sec)
     return output_srt_path
 
-def synthesize_tts_from_srt(corrected_srt_path: str, video_path: str, tts_output_dir: str, language: str, temperature: float, exaggeration: float, cfg_weight: float, seed: int, sentence_group_size: int, reference_audio: str):
+def batch_cues_supported(engine: TTSEngine, batch_cues: bool) -> bool:
     """
-    교정된 SRT 파일을 읽어 30줄씩 묶어 TTS 합성을 수행하고, 생성된 오디오 파일들을 병합합니다.
+    자막별 배치 합성은 모델이 올라와 있는 TTS 서버에서만 씁니다. command.py는 실행마다 모델을 다시 로드하므로
+    자막마다 실행하면 chunk 하나에 모델 로드가 자막 수만큼 생깁니다. 이때는 경고를 남기고 chunk 단위로 합성합니다.
     """
-    print("--- SRT 파일 기반 TTS 합성 시작 ---")
-    os.makedirs(tts_output_dir, exist_ok=True)
+    if batch_cues and not engine.server_url:
+        print("--- 경고: 자막별 배치 합성은 TTS 서버(--tts_server_url)가 필요합니다. chunk 단위로 합성합니다 ---")
+        return False
+    return batch_cues
 
+def get_reference_name(reference_audio: str) -> str:
+    """
+    참조 오디오 경로에서 출력 파일명에 쓸 목소리 이름을 만듭니다.
+    """
     # Get a unique name from the reference audio path
     if reference_audio and os.path.exists(reference_audio):
-        reference_name = os.path.splitext(os.path.basename(reference_audio))[0]
-    else:
-        reference_name = "default_voice"
+        return os.path.splitext(os.path.basename(reference_audio))[0]
+    return "default_voice"
+
+def synthesize_tts_from_srt(corrected_srt_path: str, video_path: str, tts_output_dir: str, language: str, temperature: float, exaggeration: float, cfg_weight: float, seed: int, sentence_group_size: int, reference_audio: str,
+                            max_chunk_chars: int = 120, max_chunk_seconds: float = 20.0, output_format: str = "wav",
+                            normalize_loudness: bool = False, fit_to_slots: bool = False, max_stretch_ratio: float = 1.5,
+                            preview_cues: str = None, chunk_timeout_sec: float = DEFAULT_TIMEOUT_SEC, chunk_retries: int = DEFAULT_RETRIES,
+                            tts_server_url: str = None, batch_cues: bool = False, trim_silence: bool = False,
+                            start_sec: float = None, end_sec: float = None):
+    """
+    교정된 SRT 파일을 읽어 글자 수/발화 길이 예산에 맞춰 자막을 묶어 TTS 합성을 수행하고, 생성된 오디오 파일들을 병합합니다.
+    sentence_group_size가 0보다 크면 한 번에 묶는 자막 수의 상한으로 사용합니다.
+    병합은 합성과 동시에 진행되며, output_format이 wav가 아니면 ffmpeg으로 바로 인코딩합니다.
+    normalize_loudness가 True면 chunk마다 음량을 맞추고 피크를 제한하면서 병합합니다.
+    fit_to_slots가 True면 자막 구간보다 긴 chunk를 max_stretch_ratio 이내에서 빠르게 만든 뒤 병합합니다.
+    preview_cues("1-10,15" 형식)를 주면 해당 자막의 chunk를 먼저 합성하여 나오는 즉시 재생하고,
+    나머지 chunk는 뒤이어 합성합니다.
+    각 chunk 호출은 chunk_timeout_sec로 제한되고, 출력 WAV 검증에 실패하면 chunk_retries번까지 다시 시도합니다.
+    그래도 실패한 chunk가 있으면 구멍 난 병합 파일 대신 실패 보고서를 남기고 ChunkSynthesisError를 발생시킵니다.
+    tts_server_url을 주면 chunk마다 모델을 다시 로드하지 않고 실행 중인 TTS 서버를 사용합니다.
+    batch_cues가 True면 chunk 안의 자막을 한 문자열로 잇지 않고 자막별 배치로 합성하여 자막마다 WAV를 남긴 뒤,
+    그것을 이어 chunk 파일을 만듭니다. TTS 서버가 없으면 무시합니다 (batch_cues_supported 참고).
+    trim_silence가 True면 병합 전에 모든 chunk의 앞뒤 묵음을 병렬로 잘라 내고,
+    chunk 사이 간격을 고정 200ms 대신 원본 자막 사이의 쉼으로 맞춥니다.
+    start_sec/end_sec를 주면 그 구간과 겹치는 chunk만 다시 합성하여 기존 병합 결과에 끼워 넣습니다 (synthesize_range 참고).
+    """
+    print("--- SRT 파일 기반 TTS 합성 시작 ---")
+    os.makedirs(tts_output_dir, exist_ok=True)
+
+    reference_name = get_reference_name(reference_audio)
     print(f"--- Reference Audio Voice: {reference_name} ---")
+    # 참조 오디오는 한 번만 전처리하여 모든 chunk 합성에 재사용합니다.
+    prepared_reference_audio = prepare_reference_audio(reference_audio, REFERENCE_CACHE_DIR)
+    if tts_server_url:
+        prepared_reference_audio = publish_reference_audio(prepared_reference_audio, SERVER_REFERENCE_DIR)
+    engine = TTSEngine(server_url=tts_server_url, timeout_sec=chunk_timeout_sec, retries=chunk_retries)
+    batch_cues = batch_cues_supported(engine, batch_cues)
 
-    with open(corrected_srt_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    subtitle_blocks = []
-    current_block = []
-    for line in lines:
-        if line.strip() == '':
-            if current_block:
-                subtitle_blocks.append(current_block)
-                current_block = []
-        else:
-            current_block.append(line)
-    if current_block:
-        subtitle_blocks.append(current_block)
-
-    processed_subtitle_texts = []
-    for block in subtitle_blocks:
-        text_lines = [line.strip() for line in block if not line.strip().isdigit() and '-->' not in line]
-        processed_subtitle_texts.append(" ".join(text_lines).strip())
+    # 타이밍 정보를 유지한 채로 자막을 읽습니다.
+    cues = read_cues(corrected_srt_path)
+    if start_sec is not None or end_sec is not None:
+        return synthesize_range(cues, corrected_srt_path, video_path, tts_output_dir, reference_name, to_ms_range(start_sec, end_sec),
+                                engine, prepared_reference_audio, language, temperature, exaggeration, cfg_weight, seed,
+                                max_chunk_chars=max_chunk_chars, max_chunk_seconds=max_chunk_seconds, sentence_group_size=sentence_group_size,
+                                output_format=output_format, normalize_loudness=normalize_loudness, fit_to_slots=fit_to_slots,
+                                max_stretch_ratio=max_stretch_ratio, batch_cues=batch_cues, trim_silence=trim_silence)
+
+    chunks, cue_to_chunk = plan_chunks(cues, max_chars=max_chunk_chars, max_duration_sec=max_chunk_seconds, max_cues=sentence_group_size)
+    print(f"--- 자막 {len(cues)}개를 TTS 호출 {len(chunks)}회로 묶었습니다 ---")
 
     video_file_name = os.path.splitext(os.path.basename(video_path))[0]
     today_str = datetime.now().strftime('%Y_%m_%d')
-    classify_size = sentence_group_size
-    for i in range(0, len(processed_subtitle_texts), classify_size):
-        chunk_texts = processed_subtitle_texts[i:i+classify_size]
-        loop_index = (i // classify_size) + 1
-        
-        text_to_speak = "\nー".join(chunk_texts)
 
-        if not text_to_speak.strip():
-            continue
+    # Add reference_name to the output filename to make it unique
+    output_files = [f"{video_file_name}_{reference_name}_{today_str}_{chunk.index}.wav" for chunk in chunks]
+    plan_path = os.path.join(tts_output_dir, f"{video_file_name}_{reference_name}_{today_str}_chunks.json")
+    merged_output_path = os.path.join(tts_output_dir, f"merged_{video_file_name}_{reference_name}{OUTPUT_EXTENSIONS[output_format]}")
+    save_chunk_plan(plan_path, corrected_srt_path, chunks, cue_to_chunk, output_files, cues,
+                    merged_file=os.path.basename(merged_output_path), reference_name=reference_name)
 
-        # Add reference_name to the output filename to make it unique
-        output_filename = f"{video_file_name}_{reference_name}_{today_str}_{loop_index}.wav"
+    # 합성과 동시에 병합 결과를 순서대로 기록합니다.
+    sink = AudioSink(merged_output_path, output_format, build_peaks=True)
+    silence_duration_ms = 200
+
+    # 미리 듣기 자막이 속한 chunk를 먼저 합성하고, 나머지는 일반 우선순위로 이어서 합성합니다.
+    preview_chunk_ids = set()
+    if preview_cues:
+        preview_chunk_ids = set(chunks_for_cues(parse_cue_selection(preview_cues, len(cues)), cue_to_chunk))
+        print(f"--- 미리 듣기: chunk {len(preview_chunk_ids)}개를 먼저 합성합니다 ---")
+    player = PreviewPlayer() if preview_chunk_ids else None
+
+    scheduler = PriorityScheduler(workers=1)
+    output_paths = {}
+    cue_batches = {}
+    for chunk, output_filename in zip(chunks, output_files):
         output_path = os.path.join(tts_output_dir, output_filename)
-        
-        tts_command = [
-            "/home/jay-gim/dev/Chatterbox-TTS-Server/venv/bin/python",
-            "/home/jay-gim/dev/Chatterbox-TTS-Server/command.py", text_to_speak.strip(),
-            "--voice-mode", "clone",
-            "--reference-audio", reference_audio,
-            "--output", output_path,
-            "--language", language,
-            "--speed-factor", "1.0",
-            "--temperature", str(temperature),
-            "--exaggeration", str(exaggeration),
-            "--cfg_weight", str(cfg_weight),
-            "--seed", str(seed)
-        ]
-        
-        print(f"--- TTS 명령어 실행 ({loop_index}/{len(processed_subtitle_texts)//classify_size + 1}) ---")
-        subprocess.run(tts_command)
+        output_paths[chunk.index] = output_path
+        priority = PRIORITY_HIGH if chunk.index in preview_chunk_ids else PRIORITY_NORMAL
+        if batch_cues:
+            cue_batches[chunk.index] = chunk_cue_texts(chunk, cues)
+        scheduler.submit(priority, chunk.index, synthesize_chunk, chunk, output_path, len(chunks), engine, prepared_reference_audio, language, temperature, exaggeration, cfg_weight, seed,
+                         cue_batch=cue_batches.get(chunk.index), silence_duration_ms=silence_duration_ms)
+
+    # 병합은 chunk 순서대로 해야 하므로, 완료된 chunk를 모아 두었다가 앞에서부터 이어지는 만큼 병합합니다.
+    # 묵음 제거와 템포 조정은 모든 chunk가 준비된 뒤 한 번에 처리하므로, 그 경우에는 합성이 끝난 뒤 병합합니다.
+    # 실패한 chunk가 나오면 그 뒤로는 병합하지 않고 합성만 계속하여, 한 번의 실행으로 모든 실패를 모읍니다.
+    # 병합 위치(오프셋, 샘플 수)는 모아 두었다가 끝난 뒤 manifest에 한 번에 기록합니다.
+    completed = set()
+    failures = {}
+    manifest_fields = {}
+    next_merge_position = 0
+    pending_chunks = []
+    try:
+        for chunk_index, attempts, error in scheduler.as_completed():
+            if error is not None:
+                print(f"--- chunk {chunk_index} 합성 실패: {error} ---")
+                failures[chunk_index] = error
+            else:
+                manifest_fields[chunk_index] = synthesis_manifest_fields(attempts, output_paths[chunk_index], cue_batches.get(chunk_index))
+            completed.add(chunk_index)
+            output_path = output_paths[chunk_index]
+            if player and chunk_index in preview_chunk_ids and error is None:
+                player.play(output_path)
+
+            while not failures and next_merge_position < len(chunks) and chunks[next_merge_position].index in completed:
+                chunk = chunks[next_merge_position]
+                next_merge_position += 1
+                output_path = output_paths[chunk.index]
+                if fit_to_slots or trim_silence:
+                    pending_chunks.append((chunk, output_path))
+                else:
+                    manifest_fields[chunk.index].update(append_chunk_to_sink(sink, output_path, silence_duration_ms, normalize_loudness))
+
+        if failures:
+            raise_failure_report(plan_path, chunks, failures)
+
+        if pending_chunks:
+            gaps_ms = [silence_duration_ms] * len(pending_chunks)
+            if trim_silence:
+                gaps_ms = trim_chunks(cues, pending_chunks, plan_path)
+            if fit_to_slots:
+                fit_chunks(cues, pending_chunks, plan_path, max_stretch_ratio)
+            for (chunk, output_path), gap_ms in zip(pending_chunks, gaps_ms):
+                manifest_fields[chunk.index].update(append_chunk_to_sink(sink, output_path, gap_ms, normalize_loudness))
+    finally:
+        scheduler.cancel()
+        merged_output_path = sink.close()
+        if player:
+            player.finish()
+        # 일부만 병합된 파일은 정상 결과로 오해되지 않도록 지웁니다.
+        if failures and merged_output_path and os.path.exists(merged_output_path):
+            os.remove(merged_output_path)
+            if os.path.exists(peaks_path_for(merged_output_path)):
+                os.remove(peaks_path_for(merged_output_path))
 
     print(f"--- 모든 TTS 파일 생성 완료 ({reference_name}) ---")
-    merged_output_path = merge_audio_files(tts_output_dir, reference_name, video_file_name, silence_duration_ms=200)
-    
     print(f"--- 모든 오디오 파일 병합 완료 ({reference_name}) ---")
     print(f"병합된 파일이 다음 경로에 저장되었습니다: {merged_output_path}")
+    if merged_output_path:
+        finalize_manifest(plan_path, cues, manifest_fields, merged_output_path, output_format, sink.sample_rate, sink.channels, sink.frames_written)
+    return merged_output_path
 
-def merge_audio_files(tts_output_dir: str, reference_name: str, video_file_name: str, silence_duration_ms: int = 200):
+def find_chunk_plan(tts_output_dir: str, video_file_name: str, reference_name: str):
     """
-    특정 reference_name을 포함하는 오디오 파일들을 병합하고, 파일들 사이에 묵음을 추가합니다.
+    같은 비디오/목소리로 병합까지 끝난 가장 최근 manifest를 찾습니다. 없으면 None.
     """
-    print(f"--- 생성된 오디오 파일 병합 시작 ({reference_name}) ---")
-    
-    # Find .wav files for the specific reference_name
-    generated_files = [
-        os.path.join(tts_output_dir, f) 
-        for f in os.listdir(tts_output_dir) 
-        if f.endswith('.wav') and reference_name in f and f.startswith(video_file_name)
-    ]
-
-    if not generated_files:
-        print(f"--- 병합할 오디오 파일을 찾을 수 없습니다 ({reference_name}) ---")
-        return None
+    pattern = os.path.join(glob.escape(tts_output_dir), f"{glob.escape(video_file_name)}_{glob.escape(reference_name)}_*_chunks.json")
+    merged_stem = f"merged_{video_file_name}_{reference_name}"
+    for plan_path in sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True):
+        plan = load_chunk_plan(plan_path)
+        if plan.get("total_frames") is not None and os.path.splitext(plan.get("merged_file", ""))[0] == merged_stem:
+            return plan_path
+    return None
 
-    silence = AudioSegment.silent(duration=silence_duration_ms)
-    combined = AudioSegment.empty()
-    
-    def get_filenumber(path):
+def chunk_text_matches(entry: dict, cues, first_cue: int) -> bool:
+    """manifest의 chunk 텍스트가 first_cue부터의 자막들로 만든 텍스트와 같은지 확인합니다."""
+    last_cue = first_cue + entry["last_cue"] - entry["first_cue"]
+    if last_cue >= len(cues):
+        return False
+    texts = [flatten_cue_text(cues.texts[c]) for c in range(first_cue, last_cue + 1)]
+    return CHUNK_SEPARATOR.join(text for text in texts if text) == entry["text"]
+
+def synthesize_range(cues, corrected_srt_path: str, video_path: str, tts_output_dir: str, reference_name: str, time_range: tuple,
+                     engine: TTSEngine, reference_audio: str, language: str, temperature: float, exaggeration: float, cfg_weight: float, seed: int,
+                     max_chunk_chars: int = 120, max_chunk_seconds: float = 20.0, sentence_group_size: int = 0, output_format: str = "wav",
+                     normalize_loudness: bool = False, fit_to_slots: bool = False, max_stretch_ratio: float = 1.5,
+                     batch_cues: bool = False, trim_silence: bool = False, silence_duration_ms: int = 200, patch_in_place: bool = False) -> str:
+    """
+    time_range(ms)와 겹치는 chunk만 다시 합성하여 기존 병합 결과에 끼워 넣습니다.
+    가장 최근 manifest에서 구간과 겹치는 chunk들을 찾고, 그 사이의 자막(구간 교정으로 수가 바뀌었을 수 있음)만
+    새로 묶어 합성합니다. 구간 밖 chunk는 파일과 병합 위치를 그대로 쓰고 번호와 오프셋만 옮깁니다.
+    병합 파일이 WAV면 앞부분 + 새 chunk + 뒷부분을 블록 단위로 복사하여 새 파일을 만들고,
+    압축 포맷이면 합성 없이 manifest대로 다시 병합합니다.
+    patch_in_place면 병합 WAV를 새로 쓰지 않고 바뀐 chunk 자리만 덮어씁니다(watch_srt.py에서 사용).
+    Raises:
+        FileNotFoundError: 끼워 넣을 기존 병합 결과가 없을 경우.
+        ValueError: manifest가 구간 재합성을 지원하지 않거나, 구간 밖 자막이 manifest와 다를 경우.
+        ChunkSynthesisError: 새 chunk 합성에 실패한 경우. 이때 manifest와 병합 파일은 바뀌지 않습니다.
+    """
+    batch_cues = batch_cues_supported(engine, batch_cues)
+    video_file_name = os.path.splitext(os.path.basename(video_path))[0]
+    plan_path = find_chunk_plan(tts_output_dir, video_file_name, reference_name)
+    if plan_path is None:
+        raise FileNotFoundError(f"구간을 끼워 넣을 기존 병합 결과가 없습니다. 먼저 전체 합성을 실행하세요: {video_file_name} ({reference_name})")
+    plan = load_chunk_plan(plan_path)
+    entries = plan["chunks"]
+    if any("start_ms" not in entry or "offset_frames" not in entry for entry in entries):
+        raise ValueError(f"manifest에 자막 구간이나 병합 위치가 없어 구간만 다시 합성할 수 없습니다. 전체 합성을 다시 실행하세요: {plan_path}")
+
+    # 구간과 겹치는 chunk [a, b]를 찾습니다. 겹치는 chunk가 없으면 새 자막이 들어갈 자리(b = a - 1)를 찾습니다.
+    start_ms, end_ms = time_range
+    affected = [k for k, entry in enumerate(entries) if entry["end_ms"] > start_ms and entry["start_ms"] < end_ms]
+    if affected:
+        a, b = affected[0], affected[-1]
+    else:
+        a = next((k for k, entry in enumerate(entries) if entry["start_ms"] >= end_ms), len(entries))
+        b = a - 1
+
+    # 앞뒤 chunk에 속한 자막은 그대로이므로, 그 사이의 자막만 새로 묶습니다.
+    old_cue_count = len(plan["cue_to_chunk"])
+    first_cue = entries[a - 1]["last_cue"] + 1 if a > 0 else 0
+    old_next_first = entries[b + 1]["first_cue"] if b + 1 < len(entries) else old_cue_count
+    cue_shift = len(cues) - old_cue_count
+    last_cue = old_next_first + cue_shift
+    if last_cue < first_cue or (a > 0 and not chunk_text_matches(entries[a - 1], cues, entries[a - 1]["first_cue"])) \
+            or (b + 1 < len(entries) and not chunk_text_matches(entries[b + 1], cues, old_next_first + cue_shift)):
+        raise ValueError("구간 밖의 자막이 manifest와 다릅니다. 자막이 구간 밖에서도 바뀌었다면 전체 합성을 다시 실행하세요.")
+
+    sub_chunks, sub_to_chunk = plan_chunks(CueList(cues[c] for c in range(first_cue, last_cue)), max_chars=max_chunk_chars,
+                                           max_duration_sec=max_chunk_seconds, max_cues=sentence_group_size)
+    new_chunks = [Chunk(a + chunk.index, first_cue + chunk.first_cue, first_cue + chunk.last_cue, chunk.text) for chunk in sub_chunks]
+    chunk_shift = len(new_chunks) - (b - a + 1)
+    print(f"--- 구간 재합성: 기존 chunk {b - a + 1}개 (자막 {first_cue + 1}-{last_cue})를 새 chunk {len(new_chunks)}개로 바꿉니다. "
+          f"나머지 chunk {len(entries) - (b - a + 1)}개는 다시 합성하지 않습니다 ---")
+
+    # 이전 실행의 파일과 겹치지 않도록 실행 시각을 파일 이름에 넣습니다.
+    run_tag = datetime.now().strftime('%Y_%m_%d_%H%M%S')
+    new_paths = [os.path.join(tts_output_dir, f"{video_file_name}_{reference_name}_{run_tag}_{k + 1}.wav") for k in range(len(new_chunks))]
+    total_chunks = len(entries) + chunk_shift
+    manifest_fields = {}
+    failures = {}
+    for chunk, output_path in zip(new_chunks, new_paths):
+        cue_batch = chunk_cue_texts(chunk, cues) if batch_cues else None
         try:
-            # 파일 이름에서 숫자 부분을 추출하여 정렬
-            return int(os.path.splitext(os.path.basename(path))[0].split('_')[-1])
-        except:
-            return -1
-
-    generated_files.sort(key=get_filenumber)
-
-    for i, file_path in enumerate(generated_files):
-        if os.path.exists(file_path):
-            audio = AudioSegment.from_wav(file_path)
-            combined += audio
-            if i < len(generated_files) - 1:
-                combined += silence
-            print(f"병합 완료: {os.path.basename(file_path)}")
-
-    # Create a unique merged filename
-    merged_output_filename = f"merged_{video_file_name}_{reference_name}.wav"
-    merged_output_path = os.path.join(tts_output_dir, merged_output_filename)
-    combined.export(merged_output_path, format="wav")
-    
+            attempts = synthesize_chunk(chunk, output_path, total_chunks, engine, reference_audio, language, temperature, exaggeration, cfg_weight, seed,
+                                        cue_batch=cue_batch, silence_duration_ms=silence_duration_ms)
+        except ChunkSynthesisError as e:
+            print(f"--- chunk {chunk.index} 합성 실패: {e} ---")
+            failures[chunk.index] = e
+            continue
+        manifest_fields[chunk.index] = synthesis_manifest_fields(attempts, output_path, cue_batch)
+    if failures:
+        raise ChunkSynthesisError(plan_path, [f"chunk {index}: {error.reasons[-1]}" for index, error in sorted(failures.items())])
+
+    # 새 chunk를 넣고, 뒤쪽 chunk의 번호와 자막 위치를 옮긴 manifest를 저장합니다. 병합 위치는 병합 후에 옮깁니다.
+    head_end = entries[a - 1]["offset_frames"] + entries[a - 1]["frames"] if a > 0 else 0
+    tail_start = entries[b]["offset_frames"] + entries[b]["frames"] if b >= 0 else 0
+    tail_entries = entries[b + 1:]
+    for entry in tail_entries:
+        entry["index"] += chunk_shift
+        entry["first_cue"] += cue_shift
+        entry["last_cue"] += cue_shift
+    old_cue_to_chunk = plan["cue_to_chunk"]
+    plan["chunks"] = entries[:a] + [chunk_entry(chunk, os.path.basename(path), cues) for chunk, path in zip(new_chunks, new_paths)] + tail_entries
+    plan["cue_to_chunk"] = (old_cue_to_chunk[:first_cue]
+                            + [a + index if index > 0 else -1 for index in sub_to_chunk]
+                            + [index + chunk_shift if index > 0 else -1 for index in old_cue_to_chunk[old_next_first:]])
+    plan["srt_path"] = corrected_srt_path
+    write_chunk_plan(plan_path, plan)
+
+    pending_chunks = list(zip(new_chunks, new_paths))
+    gaps_ms = [silence_duration_ms] * len(pending_chunks)
+    if trim_silence and pending_chunks:
+        gaps_ms = trim_chunks(cues, pending_chunks, plan_path)
+        if a > 0:
+            gaps_ms[0] = int(pause_gaps_ms(cues.starts, cues.ends, [first_cue - 1, new_chunks[0].first_cue], [first_cue - 1, new_chunks[0].last_cue])[1])
+    if fit_to_slots and pending_chunks:
+        fit_chunks(cues, pending_chunks, plan_path, max_stretch_ratio)
+
+    merged_output_path = os.path.join(tts_output_dir, plan["merged_file"])
+    if plan.get("output_format") != "wav" or not os.path.exists(merged_output_path):
+        print("--- 병합 파일이 WAV가 아니어서 잘라 붙일 수 없으므로, 합성 없이 manifest대로 다시 병합합니다 ---")
+        update_chunk_plan(plan_path, {chunk.index: {"gap_ms": gap_ms, **manifest_fields[chunk.index]} for chunk, gap_ms in zip(new_chunks, gaps_ms)})
+        return merge_audio_files(plan_path, plan.get("output_format", output_format), normalize_loudness, silence_duration_ms)
+
+    if patch_in_place and affected:
+        # 바뀐 chunk들이 차지하던 자리(첫 chunk 앞 간격은 유지)에 새 chunk를 직접 덮어씁니다. 뒤쪽 위치는 그대로입니다.
+        span_start = entries[a]["offset_frames"]
+        patched = patch_merged_wav(merged_output_path, span_start, tail_start, pending_chunks, gaps_ms, normalize_loudness, max_stretch_ratio)
+        if patched is not None:
+            for chunk_index, fields in patched.items():
+                manifest_fields[chunk_index].update(fields)
+            manifest_fields[new_chunks[0].index]["gap_ms"] = entries[a].get("gap_ms", 0)
+            info = read_wav_info(merged_output_path)
+            finalize_manifest(plan_path, cues, manifest_fields, merged_output_path, "wav", info.sample_rate, info.channels, info.nframes)
+            print(f"--- 제자리 교체 완료: {span_start / info.sample_rate:.1f}초부터 {(tail_start - span_start) / info.sample_rate:.1f}초 구간만 다시 썼습니다 ---")
+            return merged_output_path
+        print("--- 새 chunk가 기존 자리에 들어가지 않아 병합 파일을 다시 씁니다 ---")
+
+    # 기존 병합 파일의 앞부분, 새 chunk, 뒷부분(다음 chunk 앞 간격 포함)을 임시 파일에 이어 쓴 뒤 교체합니다.
+    temp_path = merged_output_path + ".splice.wav"
+    sink = AudioSink(temp_path, "wav", build_peaks=True)
+    with sink:
+        sink.write_wav(merged_output_path, end_frame=head_end)
+        for (chunk, output_path), gap_ms in zip(pending_chunks, gaps_ms):
+            manifest_fields[chunk.index].update(append_chunk_to_sink(sink, output_path, gap_ms, normalize_loudness))
+        if tail_entries and tail_start == tail_entries[0]["offset_frames"] and sink.frames_written:
+            # 맨 앞 chunk 앞에 새 chunk가 들어가면 원래 없던 간격을 넣습니다.
+            sink.write_silence(silence_duration_ms)
+            manifest_fields[tail_entries[0]["index"]] = {"gap_ms": silence_duration_ms}
+        frame_shift = sink.frames_written - tail_start
+        sink.write_wav(merged_output_path, start_frame=tail_start)
+    for entry in tail_entries:
+        manifest_fields.setdefault(entry["index"], {})["offset_frames"] = entry["offset_frames"] + frame_shift
+    os.replace(temp_path, merged_output_path)
+    os.replace(peaks_path_for(temp_path), peaks_path_for(merged_output_path))
+
+    finalize_manifest(plan_path, cues, manifest_fields, merged_output_path, "wav", sink.sample_rate, sink.channels, sink.frames_written)
+    print(f"--- 구간 교체 완료: 병합 파일 {sink.frames_written / sink.sample_rate:.1f}초 중 새 chunk {len(new_chunks)}개를 끼워 넣었습니다 ---")
+    print(f"병합된 파일이 다음 경로에 저장되었습니다: {merged_output_path}")
     return merged_output_path
 
+def patch_merged_wav(merged_output_path: str, span_start: int, span_end: int, pending_chunks: list, gaps_ms: list,
+                     normalize_loudness: bool, max_stretch_ratio: float):
+    """
+    새 chunk들을 병합 WAV의 [span_start, span_end) 자리에 직접 덮어쓰고, 남는 자리는 묵음으로 채웁니다.
+    자리보다 길면 max_stretch_ratio 안에서 템포를 올려 맞춥니다. 그 밖의 샘플과 뒤쪽 chunk 위치는 바뀌지 않으며,
+    peak 파일도 바뀐 구간만 다시 계산합니다.
+    Returns:
+        dict: chunk index별 manifest 병합 위치. 자리에 맞출 수 없거나 포맷이 다르면 None (파일은 그대로).
+    """
+    info = read_wav_info(merged_output_path)
+    span_frames = span_end - span_start
+    chunk_frames = sum(read_wav_info(path).nframes for _, path in pending_chunks)
+    gap_frames = sum(int(info.sample_rate * gap_ms / 1000) for gap_ms in gaps_ms[1:])
+    if chunk_frames + gap_frames > span_frames:
+        room = span_frames - gap_frames
+        ratio = chunk_frames / room if room > 0 else float("inf")
+        if ratio > max_stretch_ratio:
+            return None
+        print(f"--- 새 chunk가 기존 자리보다 길어 템포를 {ratio:.2f}배로 맞춥니다 ---")
+        stretch_files([(path, ratio) for _, path in pending_chunks])
+
+    patch_path = merged_output_path + ".patch.wav"
+    fields = {}
+    try:
+        with AudioSink(patch_path, "wav") as sink:
+            for (chunk, output_path), gap_ms in zip(pending_chunks, gaps_ms):
+                fields[chunk.index] = append_chunk_to_sink(sink, output_path, gap_ms, normalize_loudness)
+        patch = None
+        if os.path.exists(patch_path):
+            patch, patch_info = memmap_wav(patch_path)
+            if (patch_info.sample_rate, patch_info.channels, patch_info.dtype) != (info.sample_rate, info.channels, info.dtype):
+                return None
+        merged, _ = memmap_wav(merged_output_path, mode='r+')
+        n = min(len(patch), span_frames) if patch is not None else 0
+        merged[span_start:span_start + n] = patch[:n] if n else 0
+        # u8 PCM은 128이 무음입니다.
+        merged[span_start + n:span_end] = 128 if info.sampwidth == 1 else 0
+        merged.flush()
+        del merged, patch
+    finally:
+        if os.path.exists(patch_path):
+            os.remove(patch_path)
+    update_peaks_range(merged_output_path, span_start, span_end)
+
+    for chunk_fields in fields.values():
+        chunk_fields["offset_frames"] += span_start
+        chunk_fields["frames"] = max(0, min(chunk_fields["frames"], span_end - chunk_fields["offset_frames"]))
+    return fields
+
+def chunk_cue_paths(output_path: str, cue_numbers: list) -> list:
+    """자막별 배치 합성에서 chunk 파일에 딸린 자막별 WAV 경로를 만듭니다."""
+    stem = os.path.splitext(output_path)[0]
+    return [f"{stem}_cue{number}.wav" for number in cue_numbers]
+
+def synthesis_manifest_fields(attempts: int, output_path: str, cue_batch: list = None) -> dict:
+    """
+    합성이 끝난 chunk의 manifest 정보입니다. 자막별 배치 합성이면 자막별 파일과,
+    헤더만 읽은 자막별 합성 길이(더빙 자막 타이밍의 비율로 씀)를 함께 기록합니다.
+    """
+    fields = {"attempts": attempts}
+    if cue_batch:
+        cue_paths = chunk_cue_paths(output_path, [number for number, _ in cue_batch])
+        fields["cue_files"] = [os.path.basename(path) for path in cue_paths]
+        fields["cue_weights"] = [read_wav_info(path).nframes for path in cue_paths]
+    return fields
+
+def finalize_manifest(plan_path: str, cues, manifest_fields: dict, output_path: str, output_format: str,
+                      sample_rate: int, channels: int, total_frames: int) -> str:
+    """
+    병합 결과의 chunk별 오프셋/샘플 수를 manifest에 기록하고, 오디오를 다시 읽지 않고
+    더빙 트랙 타이밍에 맞춘 SRT(병합 파일과 같은 이름의 .srt)를 저장합니다.
+    병합에 쓴 자막은 사본으로 남겨, 자막이 편집되었을 때 바뀐 자막만 찾을 수 있게 합니다.
+    Returns:
+        str: 더빙 타이밍 SRT 경로.
+    """
+    update_chunk_plan(plan_path, manifest_fields, {
+        "merged_file": os.path.basename(output_path),
+        "output_format": output_format,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "total_frames": total_frames,
+    })
+    save_cues(cue_snapshot_path(plan_path), cues)
+    dubbed_srt_path = os.path.splitext(output_path)[0] + ".srt"
+    save_cues(dubbed_srt_path, dubbed_cue_timings(load_chunk_plan(plan_path), cues))
+    print(f"더빙 타이밍 자막이 저장되었습니다: {dubbed_srt_path}")
+    return dubbed_srt_path
+
+def raise_failure_report(plan_path: str, chunks: list, failures: dict):
+    """
+    실패한 chunk를 계획 파일에 기록하고, 자막 번호와 실패 이유를 출력한 뒤 ChunkSynthesisError를 발생시킵니다.
+    """
+    chunk_by_index = {chunk.index: chunk for chunk in chunks}
+    fields = {}
+    print(f"--- TTS 실패 보고서: chunk {len(failures)}개 / 전체 {len(chunks)}개 ---")
+    for chunk_index in sorted(failures):
+        chunk = chunk_by_index[chunk_index]
+        error = failures[chunk_index]
+        reasons = error.reasons if isinstance(error, ChunkSynthesisError) else [str(error)]
+        fields[chunk_index] = {"failed": True, "errors": reasons}
+        print(f"  chunk {chunk_index} (자막 {chunk.first_cue + 1}-{chunk.last_cue + 1}): {reasons[-1]}")
+    update_chunk_plan(plan_path, fields)
+    print(f"실패 내역이 계획 파일에 기록되었습니다: {plan_path}")
+    raise ChunkSynthesisError(plan_path, [f"chunk {len(failures)}개 합성 실패로 병합을 중단했습니다."])
+
+def append_chunk_to_sink(sink: AudioSink, output_path: str, silence_duration_ms: int, normalize_loudness: bool, gain: float = None) -> dict:
+    """
+    합성된 chunk를 병합 출력에 이어 붙입니다. 첫 chunk가 아니면 앞에 묵음을 넣습니다.
+    Returns:
+        dict: manifest에 기록할 병합 위치 (offset_frames, frames, gap_ms).
+    """
+    if gain is None:
+        gain = 1.0
+        if normalize_loudness:
+            loudness_db, peaks = measure_loudness([output_path])
+            gain = float(compute_gains(loudness_db, peaks)[0])
+    gap_ms = silence_duration_ms if sink.frames_written else 0
+    sink.write_silence(gap_ms)
+    offset_frames = sink.frames_written
+    sink.write_wav(output_path, gain=gain)
+    print(f"병합 완료: {os.path.basename(output_path)}")
+    return {"offset_frames": offset_frames, "frames": sink.frames_written - offset_frames, "gap_ms": gap_ms}
+
+def trim_chunks(cues, pending_chunks: list, plan_path: str) -> list:
+    """
+    합성된 chunk들의 앞뒤 묵음을 작업 프로세스들에서 병렬로 잘라 내고,
+    chunk마다 앞에 넣을 간격(원본 자막 사이의 쉼)을 ms 단위로 반환합니다.
+    """
+    trimmed = trim_silence_files([path for _, path in pending_chunks])
+    gaps_ms = pause_gaps_ms(cues.starts, cues.ends, [chunk.first_cue for chunk, _ in pending_chunks], [chunk.last_cue for chunk, _ in pending_chunks])
+    update_chunk_plan(plan_path, {
+        chunk.index: {"trimmed_lead_ms": lead, "trimmed_trail_ms": trail, "gap_ms": int(gap)}
+        for (chunk, _), (lead, trail), gap in zip(pending_chunks, trimmed, gaps_ms)
+    })
+    removed_ms = sum(lead + trail for lead, trail in trimmed)
+    print(f"--- 묵음 제거: chunk {len(pending_chunks)}개에서 {removed_ms / 1000:.1f}초를 잘라 냈습니다 ---")
+    return [int(gap) for gap in gaps_ms]
+
+def fit_chunks(cues, pending_chunks: list, plan_path: str, max_stretch_ratio: float):
+    """
+    합성된 chunk들을 자막 구간 길이에 맞게 한 번의 배치로 템포 조정하고,
+    max_stretch_ratio로도 구간에 들어가지 않는 자막을 보고합니다.
+    manifest에는 구간에 맞추는 데 필요한 비율(required_stretch_ratio)을 모두 남기고,
+    실제로 템포를 조정한 chunk에만 적용한 비율(stretch_ratio, max_stretch_ratio 이하)을 남깁니다.
+    """
+    slots_ms = [cues.ends[chunk.last_cue] - cues.starts[chunk.first_cue] for chunk, _ in pending_chunks]
+    ratios, overflow = fit_chunks_to_slots([path for _, path in pending_chunks], slots_ms, max_ratio=max_stretch_ratio)
+    fields = {}
+    for (chunk, _), ratio in zip(pending_chunks, ratios):
+        fields[chunk.index] = {"required_stretch_ratio": round(float(ratio), 4)}
+        if ratio > STRETCH_TOLERANCE:
+            fields[chunk.index]["stretch_ratio"] = round(float(min(ratio, max_stretch_ratio)), 4)
+    update_chunk_plan(plan_path, fields)
+
+    if overflow:
+        print(f"--- 경고: 최대 비율 {max_stretch_ratio}로도 자막 구간을 넘는 chunk {len(overflow)}개 ---")
+        for i in overflow:
+            chunk = pending_chunks[i][0]
+            print(f"  자막 {chunk.first_cue + 1}-{chunk.last_cue + 1}: 필요 비율 {ratios[i]:.2f}")
+
+def synthesize_chunk(chunk, output_path: str, total_chunks: int, engine: TTSEngine, reference_audio: str, language: str, temperature: float, exaggeration: float, cfg_weight: float, seed: int,
+                     cue_batch: list = None, silence_duration_ms: int = 200) -> int:
+    """
+    chunk 하나를 TTS 엔진으로 합성하여 output_path에 저장하고, 성공까지 걸린 시도 횟수를 반환합니다.
+    참조 오디오가 없으면 엔진의 기본 목소리를 사용합니다.
+    cue_batch(chunk_cue_texts의 (자막 번호, 텍스트) 목록)를 주면 chunk의 자막들을 배치로 따로 합성하여 {chunk 파일}_cue{번호}.wav로 남기고,
+    silence_duration_ms 간격으로 이어 붙여 chunk 파일을 만듭니다.
+    """
+    print(f"--- TTS 합성 ({chunk.index}/{total_chunks}) ---")
+    if not cue_batch:
+        return engine.synthesize(chunk.text, output_path, reference_audio, language, temperature, exaggeration, cfg_weight, seed)
+
+    cue_paths = chunk_cue_paths(output_path, [number for number, _ in cue_batch])
+    cue_texts = [text for _, text in cue_batch]
+    attempts = engine.synthesize_batch(cue_texts, cue_paths, reference_audio, language, temperature, exaggeration, cfg_weight, seed)
+    concat_wavs(cue_paths, output_path, silence_duration_ms)
+    return max(attempts)
+
+def merge_audio_files(plan_path: str, output_format: str = "wav", normalize_loudness: bool = False, silence_duration_ms: int = 200):
+    """
+    실행 manifest(chunk 계획 파일)에 적힌 chunk 순서대로 오디오 파일을 다시 병합합니다.
+    디렉터리를 훑지 않으므로 다른 날짜나 다른 목소리의 파일이 섞이지 않습니다.
+    manifest에 기록된 간격(gap_ms)이 있으면 그대로 쓰고, 없으면 silence_duration_ms를 씁니다.
+    병합 후 chunk별 오프셋을 manifest에 갱신하고 더빙 타이밍 SRT를 함께 만듭니다.
+    chunk 파일은 마지막 합성 때의 자막으로 만든 것이므로, 자막 사본이 있으면 (편집되었을 수 있는) 원래 SRT 대신 사본을 씁니다.
+    Raises:
+        FileNotFoundError: manifest에 있는 chunk 파일이 없을 경우.
+    """
+    plan = load_chunk_plan(plan_path)
+    plan_dir = os.path.dirname(plan_path)
+    print(f"--- manifest 기반 오디오 병합 시작 ({os.path.basename(plan_path)}) ---")
+
+    entries = plan["chunks"]
+    file_paths = [os.path.join(plan_dir, entry["file"]) for entry in entries]
+    missing = [path for path in file_paths if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"manifest의 chunk 파일 {len(missing)}개가 없습니다: {', '.join(os.path.basename(p) for p in missing[:5])}")
+
+    gains = [1.0] * len(file_paths)
+    if normalize_loudness:
+        loudness_db, peaks = measure_loudness(file_paths)
+        gains = compute_gains(loudness_db, peaks).tolist()
+
+    merged_name = os.path.splitext(plan.get("merged_file") or f"merged_{os.path.splitext(os.path.basename(plan_path))[0]}")[0]
+    sink = AudioSink(os.path.join(plan_dir, merged_name + OUTPUT_EXTENSIONS[output_format]), output_format, build_peaks=True)
+    manifest_fields = {}
+    with sink:
+        for entry, file_path, gain in zip(entries, file_paths, gains):
+            manifest_fields[entry["index"]] = append_chunk_to_sink(sink, file_path, entry.get("gap_ms", silence_duration_ms), False, gain=gain)
+
+    snapshot_path = cue_snapshot_path(plan_path)
+    cues = read_cues(snapshot_path if os.path.exists(snapshot_path) else plan["srt_path"])
+    finalize_manifest(plan_path, cues, manifest_fields, sink.output_path, output_format, sink.sample_rate, sink.channels, sink.frames_written)
+    print(f"병합된 파일이 다음 경로에 저장되었습니다: {sink.output_path}")
+    return sink.output_path
+
+def mux_video(video_path: str, dubbed_tracks: list, final_output_dir: str, subtitle_path: str = None, keep_original_audio: bool = True, burn_subtitles: bool = False):
+    """
+    병합된 더빙 오디오들을 원본 비디오에 한 번에 먹싱합니다. 비디오 스트림은 복사합니다.
+    dubbed_tracks는 (오디오 경로, 목소리 이름) 목록입니다.
+    """
+    print("--- 더빙 트랙 비디오 먹싱 ---")
+    dubbed_tracks = [(path, name) for path, name in dubbed_tracks if path]
+    if not dubbed_tracks:
+        print("--- 먹싱할 더빙 오디오가 없습니다 ---")
+        return None
+
+    video_file_name, video_ext = os.path.splitext(os.path.basename(video_path))
+    output_path = os.path.join(final_output_dir, f"{video_file_name}_dubbed{video_ext or '.mp4'}")
+    return mux_dubbed_video(video_path, dubbed_tracks, output_path,
+                            keep_original_audio=keep_original_audio,
+                            subtitle_path=subtitle_path,
+                            burn_subtitles=burn_subtitles)
+
 def main():
     parser = argparse.ArgumentParser(description="비디오에서 자막 생성, 교정, TTS 합성 파이프라인을 실행합니다.")
     
@@ -166,46 +625,112 @@ def main():
                         help="교정된 자막 파일 출력 디렉터리입니다. (기본값: data/02_corrected_subtitles)")
     parser.add_argument("--tts_output_dir", type=str, default=os.path.join(PROJECT_ROOT, "data/03_tts_output"),
                         help="TTS 합성 오디오 파일 출력 디렉터리입니다. (기본값: data/03_tts_output)")
+    parser.add_argument("--final_output_dir", type=str, default=os.path.join(PROJECT_ROOT, "data/04_final"),
+                        help="더빙 트랙을 먹싱한 최종 비디오 출력 디렉터리입니다. (기본값: data/04_final)")
 
     # 옵션 관련
+    parser.add_argument("--vad", action="store_true", help="자막 생성 시 음악/묵음 구간을 건너뛰고 말소리 구간만 변환합니다.")
     parser.add_argument("--language", type=str, default="ja", help="TTS 언어입니다.")
     parser.add_argument("--temperature", type=float, default=0.8, help="TTS temperature입니다. (0 ~ 1.0)")
     parser.add_argument("--exaggeration", type=float, default=1.0, help="TTS exaggeration입니다. (0 ~ 2.0)")
     parser.add_argument("--cfg_weight", type=float, default=0.6, help="TTS cfg_weight입니다. (0 ~ 1.0)")
     parser.add_argument("--seed", type=int, default=40, help="TTS seed입니다. (0 ~ 65,536)")
-    parser.add_argument("--sentence_group_size", type=int, default=1, help="TTS 문장 그룹 크기입니다. (0 ~ 10)")
-    parser.add_argument("--reference_audio", type=str, default=None, help="TTS 클론을 위한 참조 오디오 파일 경로입니다.")
+    parser.add_argument("--sentence_group_size", type=int, default=0, help="TTS 한 번에 묶을 최대 문장 수입니다. 0이면 예산으로만 묶습니다. (0 ~ 10)")
+    parser.add_argument("--max_chunk_chars", type=int, default=120, help="TTS 한 번에 넘길 최대 글자 수입니다. (기본값: 120)")
+    parser.add_argument("--max_chunk_seconds", type=float, default=20.0, help="TTS 한 번에 넘길 최대 예상 발화 길이(초)입니다. (기본값: 20)")
+    parser.add_argument("--reference_audio", type=str, nargs="*", default=None,
+                        help="TTS 클론을 위한 참조 오디오 파일 경로입니다. 여러 개를 주면 목소리별로 합성합니다.")
+    parser.add_argument("--output_format", type=str, default="wav", choices=list(OUTPUT_EXTENSIONS),
+                        help="병합된 오디오의 출력 포맷입니다. wav 외에는 합성과 동시에 ffmpeg으로 인코딩합니다. (기본값: wav)")
+    parser.add_argument("--normalize_loudness", action="store_true", help="병합 시 chunk별 음량을 맞추고 피크를 제한합니다.")
+    parser.add_argument("--fit_to_slots", action="store_true", help="자막 구간보다 긴 합성 결과의 템포를 높여 구간에 맞춥니다.")
+    parser.add_argument("--max_stretch_ratio", type=float, default=1.5, help="템포 조정 최대 비율입니다. (기본값: 1.5)")
+    parser.add_argument("--preview_cues", type=str, default=None, help="먼저 합성하여 바로 들어 볼 자막 번호입니다. (예: 1-10,15)")
+    parser.add_argument("--chunk_timeout", type=float, default=DEFAULT_TIMEOUT_SEC, help=f"TTS chunk 한 번의 최대 실행 시간(초)입니다. (기본값: {DEFAULT_TIMEOUT_SEC})")
+    parser.add_argument("--chunk_retries", type=int, default=DEFAULT_RETRIES, help=f"실패한 chunk를 다시 시도할 횟수입니다. (기본값: {DEFAULT_RETRIES})")
+    parser.add_argument("--trim_silence", action="store_true", help="병합 전에 chunk 앞뒤 묵음을 잘라 내고, 간격을 원본 자막 사이의 쉼에 맞춥니다.")
+    parser.add_argument("--tts_server_url", type=str, default=None,
+                        help="모델이 올라와 있는 Chatterbox-TTS-Server 주소입니다. (예: http://127.0.0.1:8000) 없으면 chunk마다 command.py를 실행합니다.")
+    parser.add_argument("--batch_cues", action="store_true",
+                        help="chunk 안의 자막을 자막별 배치로 합성하여 자막마다 오디오를 남깁니다. --tts_server_url이 필요합니다 (command.py는 자막마다 모델을 다시 로드).")
+    parser.add_argument("--start", type=parse_timecode, default=None,
+                        help="이 시간부터의 구간만 다시 처리합니다. 자막 생성/교정/합성 모두 구간만 수행하고 기존 결과의 해당 부분을 바꿉니다. (예: 00:42:00)")
+    parser.add_argument("--end", type=parse_timecode, default=None, help="다시 처리할 구간의 끝 시간입니다. (예: 00:45:00)")
+    parser.add_argument("--merge_manifest", type=str, default=None,
+                        help="합성 없이 chunk 계획 파일(manifest)대로 오디오만 다시 병합하고 더빙 타이밍 SRT를 만듭니다.")
+    parser.add_argument("--mux", action="store_true", help="더빙 트랙을 원본 비디오에 먹싱합니다. (비디오 스트림 복사)")
+    parser.add_argument("--drop_original_audio", action="store_true", help="먹싱 시 원본 오디오 트랙을 제외합니다.")
+    parser.add_argument("--burn_subtitles", action="store_true", help="먹싱 시 교정된 자막을 화면에 입힙니다. (비디오 재인코딩)")
 
     args = parser.parse_args()
+    if args.batch_cues and not args.tts_server_url:
+        parser.error("--batch_cues는 --tts_server_url과 함께 써야 합니다. command.py는 자막마다 모델을 다시 로드합니다.")
 
     if args.ui:
         from ui import App
         app = App()
         app.mainloop()
+    elif args.merge_manifest:
+        merge_audio_files(args.merge_manifest, args.output_format, args.normalize_loudness)
     else:
         if not args.video_path:
             parser.error("--video_path is required when not running in UI mode.")
         
+        # 구간 경계에 걸친 기존 자막은 통째로 다시 변환되므로, 교정과 합성도 같은 넓힌 구간으로 처리합니다.
+        start_sec, end_sec = args.start, args.end
+        if start_sec is not None or end_sec is not None:
+            start_ms, end_ms = widen_to_existing_segments(args.subtitles_dir, to_ms_range(args.start, args.end))
+            start_sec = start_ms / 1000
+            end_sec = end_ms / 1000 if args.end is not None else None
+
         # 1. SRT 자막 생성
-        created_srt_path = create_subtitles(args.video_path, args.subtitles_dir)
+        created_srt_path = create_subtitles(args.video_path, args.subtitles_dir, vad=args.vad, start_sec=start_sec, end_sec=end_sec)
 
         # 2. SRT 교정
         corrected_srt_path = os.path.join(args.corrected_dir, "corrected.srt")
         os.makedirs(args.corrected_dir, exist_ok=True)
-        correct_subtitles(created_srt_path, corrected_srt_path)
+        correct_subtitles(created_srt_path, corrected_srt_path, start_sec=start_sec, end_sec=end_sec)
 
         # 3. TTS 합성
-        synthesize_tts_from_srt(
-            corrected_srt_path, 
-            args.video_path,
-            args.tts_output_dir,
-            args.language,
-            args.temperature,
-            args.exaggeration,
-            args.cfg_weight,
-            args.seed,
-            args.sentence_group_size,
-            reference_audio=args.reference_audio
-        )
+        dubbed_tracks = []
+        for reference_audio in (args.reference_audio or [None]):
+            merged_output_path = synthesize_tts_from_srt(
+                corrected_srt_path, 
+                args.video_path,
+                args.tts_output_dir,
+                args.language,
+                args.temperature,
+                args.exaggeration,
+                args.cfg_weight,
+                args.seed,
+                args.sentence_group_size,
+                reference_audio=reference_audio,
+                max_chunk_chars=args.max_chunk_chars,
+                max_chunk_seconds=args.max_chunk_seconds,
+                output_format=args.output_format,
+                normalize_loudness=args.normalize_loudness,
+                fit_to_slots=args.fit_to_slots,
+                max_stretch_ratio=args.max_stretch_ratio,
+                preview_cues=args.preview_cues,
+                chunk_timeout_sec=args.chunk_timeout,
+                chunk_retries=args.chunk_retries,
+                tts_server_url=args.tts_server_url,
+                batch_cues=args.batch_cues,
+                trim_silence=args.trim_silence,
+                start_sec=start_sec,
+                end_sec=end_sec
+            )
+            dubbed_tracks.append((merged_output_path, get_reference_name(reference_audio)))
+
+        # 4. 비디오 먹싱
+        if args.mux:
+            mux_video(
+                args.video_path,
+                dubbed_tracks,
+                args.final_output_dir,
+                subtitle_path=corrected_srt_path,
+                keep_original_audio=not args.drop_original_audio,
+                burn_subtitles=args.burn_subtitles
+            )
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+import sys
+import argparse
+import itertools
+import json
+import time
+from datetime import datetime
+
+# --- 경로 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
+
+from common.srt_cues import read_cues
+from common.chunk_planner import parse_cue_selection
+from common.priority_scheduler import PriorityScheduler, PRIORITY_NORMAL
+from common.audio_sink import AudioSink
+from common.reference_audio import prepare_reference_audio
+from common.tts_engine import TTSEngine, publish_reference_audio
+from common.tts_runner import ChunkSynthesisError, DEFAULT_TIMEOUT_SEC, DEFAULT_RETRIES
+
+REFERENCE_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", ".cache", "reference_audio")
+# 서버가 참조 오디오를 찾는 디렉터리 (config.yaml의 tts_engine.reference_audio_path)
+SERVER_REFERENCE_DIR = os.path.join(PROJECT_ROOT, "reference_audio")
+SWEEP_OUTPUT_DIR = os.path.join(PROJECT_ROOT, "data", "03_tts_output", "sweeps")
+
+# 설정별 비교용 병합 파일에서 자막 사이에 넣는 묵음 길이
+COMPARE_SILENCE_MS = 400
+
+def parse_values(spec: str, cast) -> list:
+    """'0.6,0.8' 형식의 값 목록을 파싱합니다."""
+    return [cast(value) for value in spec.split(",") if value.strip()]
+
+def build_sweep_configs(temperatures: list, exaggerations: list, cfg_weights: list, seeds: list) -> list:
+    """파라미터 격자의 모든 조합을 만듭니다."""
+    return [
+        {"temperature": t, "exaggeration": e, "cfg_weight": c, "seed": s}
+        for t, e, c, s in itertools.product(temperatures, exaggerations, cfg_weights, seeds)
+    ]
+
+def config_label(config: dict) -> str:
+    """출력 디렉터리 이름으로 쓸 설정 라벨을 만듭니다. (예: t0.8_e1_c0.6_s40)"""
+    return f"t{config['temperature']:g}_e{config['exaggeration']:g}_c{config['cfg_weight']:g}_s{config['seed']}"
+
+def _synthesize_job(engine: TTSEngine, text: str, output_path: str, reference: str, language: str, config: dict):
+    started = time.monotonic()
+    attempts = engine.synthesize(text, output_path, reference, language, config["temperature"], config["exaggeration"], config["cfg_weight"], config["seed"])
+    return attempts, time.monotonic() - started
+
+def run_sweep(srt_path: str, cue_spec: str, configs: list, reference_audio: str, language: str, output_root: str = SWEEP_OUTPUT_DIR,
+              server_url: str = None, workers: int = 1, timeout_sec: float = DEFAULT_TIMEOUT_SEC, retries: int = DEFAULT_RETRIES) -> str:
+    """
+    (설정 × 자막) 조합을 한 번에 스케줄링하여 합성하고, 설정별 라벨 디렉터리와 index.json을 만듭니다.
+    자막 파싱과 참조 오디오 전처리는 한 번만 하고 모든 작업이 공유합니다.
+    server_url을 주면 모델이 이미 올라와 있는 TTS 서버 하나로 모든 작업을 처리하므로, 모델 로드는 세션당 한 번입니다.
+    설정마다 선택한 자막을 이어 붙인 compare.wav를 만들어 귀로 비교하기 쉽게 합니다.
+    Returns:
+        str: index.json 경로.
+    """
+    cues = read_cues(srt_path)
+    cue_indices = parse_cue_selection(cue_spec, len(cues)) if cue_spec else list(range(len(cues)))
+    texts = {i: " ".join(cues.texts[i].split("\n")).strip() for i in cue_indices}
+    cue_indices = [i for i in cue_indices if texts[i]]
+    if not cue_indices or not configs:
+        raise ValueError("스윕할 자막 또는 설정이 없습니다.")
+
+    prepared_reference = prepare_reference_audio(reference_audio, REFERENCE_CACHE_DIR)
+    reference = publish_reference_audio(prepared_reference, SERVER_REFERENCE_DIR) if server_url else prepared_reference
+
+    sweep_name = f"{os.path.splitext(os.path.basename(srt_path))[0]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    sweep_dir = os.path.join(output_root, sweep_name)
+    print(f"--- 파라미터 스윕 시작: 설정 {len(configs)}개 × 자막 {len(cue_indices)}개 = {len(configs) * len(cue_indices)}회 ---")
+
+    engine = TTSEngine(server_url=server_url, timeout_sec=timeout_sec, retries=retries)
+    scheduler = PriorityScheduler(workers=workers)
+    entries = []
+    for config in configs:
+        label = config_label(config)
+        os.makedirs(os.path.join(sweep_dir, label), exist_ok=True)
+        entry = {"label": label, "params": config, "files": {}, "failures": {}, "seconds": {}}
+        entries.append(entry)
+        for i in cue_indices:
+            output_path = os.path.join(sweep_dir, label, f"cue_{i + 1:04d}.wav")
+            scheduler.submit(PRIORITY_NORMAL, (len(entries) - 1, i, output_path), _synthesize_job, engine, texts[i], output_path, reference, language, config)
+
+    done = 0
+    total = len(configs) * len(cue_indices)
+    for (entry_index, cue_index, output_path), result, error in scheduler.as_completed():
+        done += 1
+        entry = entries[entry_index]
+        if error is not None:
+            reasons = error.reasons if isinstance(error, ChunkSynthesisError) else [str(error)]
+            entry["failures"][str(cue_index + 1)] = reasons
+            print(f"[{done}/{total}] {entry['label']} 자막 {cue_index + 1} 실패: {reasons[-1]}")
+            continue
+        entry["files"][str(cue_index + 1)] = os.path.relpath(output_path, sweep_dir)
+        entry["seconds"][str(cue_index + 1)] = round(result[1], 2)
+        print(f"[{done}/{total}] {entry['label']} 자막 {cue_index + 1} 완료 ({result[1]:.1f}s)")
+
+    for entry in entries:
+        compare_path = os.path.join(sweep_dir, entry["label"], "compare.wav")
+        with AudioSink(compare_path, "wav") as sink:
+            for i in cue_indices:
+                if str(i + 1) not in entry["files"]:
+                    continue
+                if sink.frames_written:
+                    sink.write_silence(COMPARE_SILENCE_MS)
+                sink.write_wav(os.path.join(sweep_dir, entry["files"][str(i + 1)]))
+        if os.path.exists(compare_path):
+            entry["compare_file"] = os.path.relpath(compare_path, sweep_dir)
+
+    index_path = os.path.join(sweep_dir, "index.json")
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "srt_path": os.path.abspath(srt_path),
+            "reference_audio": reference_audio,
+            "language": language,
+            "server_url": server_url,
+            "cues": [{"cue": i + 1, "text": texts[i]} for i in cue_indices],
+            "configs": entries,
+        }, f, ensure_ascii=False, indent=2)
+
+    failed = sum(len(entry["failures"]) for entry in entries)
+    print(f"--- 파라미터 스윕 완료 (실패 {failed}건) ---")
+    print(f"결과 목록: {index_path}")
+    return index_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TTS 파라미터 격자를 선택한 자막에 대해 한 번에 합성하여 비교합니다.")
+    parser.add_argument("--srt_path", type=str, required=True, help="합성할 자막 SRT 파일 경로입니다.")
+    parser.add_argument("--cues", type=str, default="1-5", help="스윕에 사용할 자막 번호입니다. (예: 1-10,15, 기본값: 1-5)")
+    parser.add_argument("--reference_audio", type=str, default=None, help="TTS 클론을 위한 참조 오디오 파일 경로입니다.")
+    parser.add_argument("--language", type=str, default="ja", help="TTS 언어입니다.")
+    parser.add_argument("--temperature", type=str, default="0.8", help="temperature 값 목록입니다. (예: 0.6,0.8)")
+    parser.add_argument("--exaggeration", type=str, default="1.0", help="exaggeration 값 목록입니다. (예: 0.5,1.0)")
+    parser.add_argument("--cfg_weight", type=str, default="0.6", help="cfg_weight 값 목록입니다. (예: 0.4,0.6)")
+    parser.add_argument("--seed", type=str, default="40", help="seed 값 목록입니다. (예: 1,40)")
+    parser.add_argument("--server_url", type=str, default=None,
+                        help="모델이 올라와 있는 Chatterbox-TTS-Server 주소입니다. (예: http://127.0.0.1:8000) 없으면 호출마다 command.py를 실행합니다.")
+    parser.add_argument("--workers", type=int, default=1, help="동시에 보낼 합성 요청 수입니다. (기본값: 1)")
+    parser.add_argument("--output_dir", type=str, default=SWEEP_OUTPUT_DIR, help="스윕 결과를 저장할 디렉터리입니다.")
+    parser.add_argument("--chunk_timeout", type=float, default=DEFAULT_TIMEOUT_SEC, help="합성 한 번의 최대 실행 시간(초)입니다.")
+    parser.add_argument("--chunk_retries", type=int, default=DEFAULT_RETRIES, help="실패한 합성을 다시 시도할 횟수입니다.")
+
+    args = parser.parse_args()
+
+    configs = build_sweep_configs(parse_values(args.temperature, float), parse_values(args.exaggeration, float),
+                                  parse_values(args.cfg_weight, float), parse_values(args.seed, int))
+    run_sweep(args.srt_path, args.cues, configs, args.reference_audio, args.language, args.output_dir,
+              server_url=args.server_url, workers=args.workers, timeout_sec=args.chunk_timeout, retries=args.chunk_retries)
@@ -9,7 +9,13 @@ import queue
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
 
-from main import synthesize_tts_from_srt
+from common.waveform_view import WaveformView
+from common.model_warmup import ModelWarmup
+from main import synthesize_tts_from_srt, get_reference_name, REFERENCE_CACHE_DIR, SERVER_REFERENCE_DIR
+from watch_srt import watch_srt
+
+# 옵션을 바꾼 뒤 예열을 다시 시작하기까지 기다리는 시간
+WARMUP_DELAY_MS = 800
 
 class App(tk.Tk):
     def __init__(self):
@@ -26,11 +32,23 @@ class App(tk.Tk):
         self.log_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.log_frame, text='Logs')
 
+        self.waveform_view = WaveformView(self.notebook, initialdir=os.path.join(PROJECT_ROOT, "data/03_tts_output"))
+        self.notebook.add(self.waveform_view, text='Waveform')
+
         self.create_widgets()
         self.create_log_viewer()
 
+        # 첫 실행이 모델 로드를 기다리지 않도록 현재 옵션의 모델을 미리 올려 둡니다.
+        self.warmup = ModelWarmup(REFERENCE_CACHE_DIR, SERVER_REFERENCE_DIR)
+        self._warmup_job = None
+        for var in (self.language, self.reference_audio_path, self.tts_server_url):
+            var.trace_add('write', self.schedule_warmup)
+        self.start_warmup()
+        self.poll_warmup()
+
         self.thread = None
         self.stop_requested = False
+        self.active_preview_cues = None
 
     def browse_reference_audio(self):
         filenames = filedialog.askopenfilenames(
@@ -88,7 +106,16 @@ class App(tk.Tk):
         self.exaggeration = tk.DoubleVar(value=1.0)
         self.cfg_weight = tk.DoubleVar(value=0.6)
         self.seed = tk.IntVar(value=40)
-        self.sentence_group_size = tk.IntVar(value=2)
+        self.sentence_group_size = tk.IntVar(value=0)
+        self.max_chunk_chars = tk.IntVar(value=120)
+        self.output_format = tk.StringVar(value="wav")
+        self.normalize_loudness = tk.BooleanVar(value=False)
+        self.fit_to_slots = tk.BooleanVar(value=False)
+        self.max_stretch_ratio = tk.DoubleVar(value=1.5)
+        self.tts_server_url = tk.StringVar(value="")
+        self.batch_cues = tk.BooleanVar(value=False)
+        self.trim_silence = tk.BooleanVar(value=False)
+        self.preview_cues = tk.StringVar(value="1-5")
 
         self.temperature_str = tk.StringVar(value=f"{self.temperature.get():.2f}")
         self.exaggeration_str = tk.StringVar(value=f"{self.exaggeration.get():.2f}")
@@ -116,8 +143,28 @@ class App(tk.Tk):
         ttk.Label(options_frame, text="Seed (0-65536):").grid(row=4, column=0, sticky="w", padx=5, pady=2)
         ttk.Entry(options_frame, textvariable=self.seed).grid(row=4, column=1, sticky="w", padx=5, pady=2)
 
-        ttk.Label(options_frame, text="Sentence Group Size (0-10):").grid(row=5, column=0, sticky="w", padx=5, pady=2)
+        ttk.Label(options_frame, text="Max Sentences per Chunk (0=auto):").grid(row=5, column=0, sticky="w", padx=5, pady=2)
         ttk.Entry(options_frame, textvariable=self.sentence_group_size).grid(row=5, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="Max Chunk Characters:").grid(row=6, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.max_chunk_chars).grid(row=6, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="Output Format:").grid(row=7, column=0, sticky="w", padx=5, pady=2)
+        ttk.Combobox(options_frame, textvariable=self.output_format, values=["wav", "flac", "opus", "aac"], state="readonly").grid(row=7, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Checkbutton(options_frame, text="Normalize Loudness", variable=self.normalize_loudness).grid(row=8, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Checkbutton(options_frame, text="Fit to Subtitle Timing", variable=self.fit_to_slots).grid(row=9, column=1, sticky="w", padx=5, pady=2)
+        ttk.Label(options_frame, text="Max Stretch Ratio:").grid(row=10, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.max_stretch_ratio).grid(row=10, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="Preview Cues (e.g. 1-5,12):").grid(row=11, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.preview_cues).grid(row=11, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="TTS Server URL (optional):").grid(row=12, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.tts_server_url).grid(row=12, column=1, sticky="w", padx=5, pady=2)
+        ttk.Checkbutton(options_frame, text="Synthesize Cues Separately (Batch, needs TTS Server)", variable=self.batch_cues).grid(row=13, column=1, sticky="w", padx=5, pady=2)
+        ttk.Checkbutton(options_frame, text="Trim Silence & Use Subtitle Pauses", variable=self.trim_silence).grid(row=14, column=1, sticky="w", padx=5, pady=2)
         
         options_frame.columnconfigure(1, weight=1)
 
@@ -128,12 +175,38 @@ class App(tk.Tk):
         self.run_button = ttk.Button(execution_frame, text="Run Synthesis", command=self.run_pipeline)
         self.run_button.pack(side="left", padx=5)
 
+        self.preview_button = ttk.Button(execution_frame, text="Preview & Run", command=lambda: self.run_pipeline(preview=True))
+        self.preview_button.pack(side="left", padx=5)
+
+        self.watch_button = ttk.Button(execution_frame, text="Watch SRT", command=lambda: self.run_pipeline(watch=True))
+        self.watch_button.pack(side="left", padx=5)
+
         self.stop_button = ttk.Button(execution_frame, text="Force Stop", command=self.stop_pipeline, state="disabled")
         self.stop_button.pack(side="left", padx=5)
 
         self.progress = ttk.Progressbar(frame, orient="horizontal", length=400, mode="indeterminate")
         self.progress.pack(pady=5)
 
+        self.warmup_status = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.warmup_status).pack(pady=2)
+
+    def reference_audio_list(self) -> list:
+        return [path.strip() for path in self.reference_audio_path.get().split(';') if path.strip() and os.path.exists(path.strip())]
+
+    def schedule_warmup(self, *args):
+        # 입력 중에는 글자마다 다시 시작하지 않도록 잠시 기다렸다가 예열합니다.
+        if self._warmup_job is not None:
+            self.after_cancel(self._warmup_job)
+        self._warmup_job = self.after(WARMUP_DELAY_MS, self.start_warmup)
+
+    def start_warmup(self):
+        self._warmup_job = None
+        self.warmup.request(None, self.language.get(), self.reference_audio_list(), self.tts_server_url.get().strip() or None)
+
+    def poll_warmup(self):
+        self.warmup_status.set(("● " if self.warmup.ready else "○ ") + self.warmup.status)
+        self.after(300, self.poll_warmup)
+
     def update_temperature_label(self, *args):
         self.temperature_str.set(f"{self.temperature.get():.2f}")
 
@@ -156,25 +229,34 @@ class App(tk.Tk):
         if dirname:
             var.set(dirname)
 
-    def run_pipeline(self):
+    def run_pipeline(self, preview=False, watch=False):
         srt_path = self.srt_path.get()
         if not srt_path:
             messagebox.showerror("Error", "Subtitle file path is required.")
             return
+        if self.batch_cues.get() and not self.tts_server_url.get().strip():
+            messagebox.showerror("Error", "Synthesizing cues separately requires a TTS Server URL (command.py reloads the model for every cue).")
+            return
+
+        # Preview mode synthesizes the selected cues first and plays them as soon as they are ready
+        self.active_preview_cues = self.preview_cues.get().strip() if preview else None
 
         self.run_button.config(state="disabled")
+        self.preview_button.config(state="disabled")
+        self.watch_button.config(state="disabled")
         self.stop_button.config(state="normal")
         self.progress.start()
         self.notebook.select(self.log_frame)
 
         self.stop_requested = False
+        self.last_merged_output = None
 
         self.log_queue = queue.Queue()
         self.log_text.config(state="normal")
         self.log_text.delete(1.0, "end")
         self.log_text.config(state="disabled")
 
-        self.thread = threading.Thread(target=self.pipeline_worker, daemon=True)
+        self.thread = threading.Thread(target=self.watch_worker if watch else self.pipeline_worker, daemon=True)
         self.thread.start()
         self.after(100, self.process_log_queue)
 
@@ -206,7 +288,7 @@ class App(tk.Tk):
 
             if not reference_audio_paths:
                 self.log_queue.put("--- No reference audio provided. Running TTS with default voice. ---\n")
-                synthesize_tts_from_srt(
+                self.last_merged_output = synthesize_tts_from_srt(
                     srt_path,
                     srt_path, # Pass srt_path for video_path to handle output naming
                     tts_output_dir,
@@ -216,7 +298,16 @@ class App(tk.Tk):
                     self.cfg_weight.get(),
                     self.seed.get(),
                     self.sentence_group_size.get(),
-                    reference_audio=None
+                    reference_audio=None,
+                    max_chunk_chars=self.max_chunk_chars.get(),
+                    output_format=self.output_format.get(),
+                    normalize_loudness=self.normalize_loudness.get(),
+                    fit_to_slots=self.fit_to_slots.get(),
+                    max_stretch_ratio=self.max_stretch_ratio.get(),
+                    preview_cues=self.active_preview_cues,
+                    tts_server_url=self.tts_server_url.get().strip() or None,
+                    batch_cues=self.batch_cues.get(),
+                    trim_silence=self.trim_silence.get()
                 )
                 if self.stop_requested:
                     self.log_queue.put("--- Synthesis pipeline stopped by user. ---\n")
@@ -232,7 +323,7 @@ class App(tk.Tk):
                 
                 if not valid_reference_audios:
                     self.log_queue.put("--- No valid reference audio files found. Running TTS with default voice. ---\n")
-                    synthesize_tts_from_srt(
+                    self.last_merged_output = synthesize_tts_from_srt(
                         srt_path,
                         srt_path, # Pass srt_path for video_path to handle output naming
                         tts_output_dir,
@@ -242,12 +333,21 @@ class App(tk.Tk):
                         self.cfg_weight.get(),
                         self.seed.get(),
                         self.sentence_group_size.get(),
-                        reference_audio=None
+                        reference_audio=None,
+                        max_chunk_chars=self.max_chunk_chars.get(),
+                        output_format=self.output_format.get(),
+                        normalize_loudness=self.normalize_loudness.get(),
+                        fit_to_slots=self.fit_to_slots.get(),
+                        max_stretch_ratio=self.max_stretch_ratio.get(),
+                        preview_cues=self.active_preview_cues,
+                        tts_server_url=self.tts_server_url.get().strip() or None,
+                        batch_cues=self.batch_cues.get(),
+                        trim_silence=self.trim_silence.get()
                     )
                 else:
                     for i, ref_path in enumerate(valid_reference_audios):
                         self.log_queue.put(f"--- [{i+1}/{len(valid_reference_audios)}] Synthesizing with reference: {os.path.basename(ref_path)} ---\n")
-                        synthesize_tts_from_srt(
+                        self.last_merged_output = synthesize_tts_from_srt(
                             srt_path,
                             srt_path, # Pass srt_path for video_path to handle output naming
                             tts_output_dir,
@@ -257,7 +357,16 @@ class App(tk.Tk):
                             self.cfg_weight.get(),
                             self.seed.get(),
                             self.sentence_group_size.get(),
-                            reference_audio=ref_path
+                            reference_audio=ref_path,
+                            max_chunk_chars=self.max_chunk_chars.get(),
+                            output_format=self.output_format.get(),
+                            normalize_loudness=self.normalize_loudness.get(),
+                            fit_to_slots=self.fit_to_slots.get(),
+                            max_stretch_ratio=self.max_stretch_ratio.get(),
+                            preview_cues=self.active_preview_cues,
+                            tts_server_url=self.tts_server_url.get().strip() or None,
+                            batch_cues=self.batch_cues.get(),
+                            trim_silence=self.trim_silence.get()
                         )
                         if self.stop_requested:
                             self.log_queue.put("--- Synthesis pipeline stopped by user. ---\n")
@@ -271,15 +380,78 @@ class App(tk.Tk):
             sys.stderr = sys.__stderr__
             self.log_queue.put(None) # Signal that the process is done
 
+    def watch_worker(self):
+        """
+        Keeps watching the subtitle file and re-synthesizes only the edited cues into the merged WAV until Force Stop.
+        Watch mode follows a single voice, so only the first valid reference audio is used.
+        """
+        class StdoutRedirector:
+            def __init__(self, queue):
+                self.queue = queue
+            def write(self, text):
+                self.queue.put(text)
+            def flush(self):
+                pass
+
+        sys.stdout = StdoutRedirector(self.log_queue)
+        sys.stderr = StdoutRedirector(self.log_queue)
+
+        try:
+            srt_path = self.srt_path.get()
+            tts_output_dir = self.tts_output_dir.get()
+            reference_audio_paths = [path.strip() for path in self.reference_audio_path.get().split(';') if path.strip()]
+            valid_reference_audios = [path for path in reference_audio_paths if os.path.exists(path)]
+            reference_audio = valid_reference_audios[0] if valid_reference_audios else None
+            if len(valid_reference_audios) > 1:
+                self.log_queue.put(f"--- WARNING: Watch mode follows one voice. Using {os.path.basename(reference_audio)} only. ---\n")
+
+            if not os.path.exists(srt_path):
+                self.log_queue.put(f"--- ERROR: Subtitle file not found at {srt_path}. Please select a valid file. ---\n")
+                return
+
+            self.log_queue.put("--- Watching subtitle file. Save edits to re-synthesize changed cues; press Force Stop to finish. ---\n")
+            watch_srt(
+                srt_path,
+                srt_path, # Pass srt_path for video_path to handle output naming
+                tts_output_dir,
+                self.language.get(),
+                self.temperature.get(),
+                self.exaggeration.get(),
+                self.cfg_weight.get(),
+                self.seed.get(),
+                self.sentence_group_size.get(),
+                reference_audio,
+                max_chunk_chars=self.max_chunk_chars.get(),
+                normalize_loudness=self.normalize_loudness.get(),
+                fit_to_slots=self.fit_to_slots.get(),
+                max_stretch_ratio=self.max_stretch_ratio.get(),
+                tts_server_url=self.tts_server_url.get().strip() or None,
+                batch_cues=self.batch_cues.get(),
+                trim_silence=self.trim_silence.get(),
+                should_stop=lambda: self.stop_requested
+            )
+            video_file_name = os.path.splitext(os.path.basename(srt_path))[0]
+            self.last_merged_output = os.path.join(tts_output_dir, f"merged_{video_file_name}_{get_reference_name(reference_audio)}.wav")
+        except Exception as e:
+            self.log_queue.put(f"An error occurred: {e}\n")
+        finally:
+            sys.stdout = sys.__stdout__
+            sys.stderr = sys.__stderr__
+            self.log_queue.put(None) # Signal that the process is done
+
     def process_log_queue(self):
         try:
             while True:
                 line = self.log_queue.get_nowait()
                 if line is None:
                     self.run_button.config(state="normal")
+                    self.preview_button.config(state="normal")
+                    self.watch_button.config(state="normal")
                     self.stop_button.config(state="disabled")
                     self.progress.stop()
                     self.thread = None
+                    if self.last_merged_output and os.path.exists(self.last_merged_output):
+                        self.waveform_view.load(self.last_merged_output)
                     return
                 self.log_text.config(state="normal")
                 self.log_text.insert("end", line)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from common.srt_cues import CueList
+from common.chunk_planner import CHUNK_SEPARATOR, plan_chunks, chunk_cue_texts, dubbed_cue_timings
+
+
+def make_cues(texts):
+    cues = CueList()
+    for i, text in enumerate(texts):
+        cues.append(i * 1000, (i + 1) * 1000, text)
+    return cues
+
+
+def test_empty_cue_is_not_mapped_to_chunk():
+    cues = make_cues(["一つ目", "", "三つ目", "  \n ", "五つ目"])
+    chunks, cue_to_chunk = plan_chunks(cues, max_chars=120)
+    assert len(chunks) == 1
+    assert list(cue_to_chunk) == [1, -1, 1, -1, 1]
+
+
+def test_batch_numbers_and_texts_skip_empty_cue():
+    cues = make_cues(["一つ目", "", "三つ目\n続き", "四つ目"])
+    chunks, _ = plan_chunks(cues, max_chars=120)
+    batch = chunk_cue_texts(chunks[0], cues)
+    assert batch == [(1, "一つ目"), (3, "三つ目 続き"), (4, "四つ目")]
+    assert [text for _, text in batch] == chunks[0].text.split(CHUNK_SEPARATOR)
+
+
+def test_dubbed_timings_use_cue_weights_of_non_empty_cues():
+    cues = make_cues(["一つ目", "", "三つ目"])
+    chunks, cue_to_chunk = plan_chunks(cues, max_chars=120)
+    plan = {
+        "sample_rate": 1000,
+        "cue_to_chunk": list(cue_to_chunk),
+        "chunks": [{"index": 1, "first_cue": 0, "last_cue": 2, "offset_frames": 0, "frames": 3000, "cue_weights": [1000, 2000]}],
+    }
+    timings = dubbed_cue_timings(plan, cues)
+    assert [(cue.start, cue.end, cue.text) for cue in timings] == [(0, 1000, "一つ目"), (1000, 3000, "三つ目")]
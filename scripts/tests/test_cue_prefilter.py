@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from common.srt_cues import Cue
+from common.cue_prefilter import normalize_text, prefilter_cues
+
+
+def test_numbers_are_not_collapsed():
+    assert normalize_text("10000円です") == "10000円です"
+    assert normalize_text("1111番") == "1111番"
+    assert normalize_text("121212") == "121212"
+    assert normalize_text("電話は0120-333-3333です!") == "電話は0120-333-3333です！"
+
+
+def test_kana_runs_are_collapsed():
+    assert normalize_text("えええええ") == "えええ"
+    assert normalize_text("すごいすごいすごいすごい") == "すごいすごい"
+    assert normalize_text("ハハハハハ！！") == "ハハハ！"
+
+
+def test_repeated_number_cues_are_not_concatenated():
+    subtitles = [Cue(1, 0, 500, "10"), Cue(2, 600, 1100, "10")]
+    cues, _ = prefilter_cues(subtitles)
+    assert [(cue.start, cue.end, cue.text) for cue in cues] == [(0, 1100, "10")]
+
+
+def test_repeated_filler_cues_are_concatenated():
+    subtitles = [Cue(1, 0, 500, "え"), Cue(2, 600, 1100, "え。"), Cue(3, 1200, 3000, "1111番です。")]
+    cues, needs_model = prefilter_cues(subtitles)
+    assert [cue.text for cue in cues] == ["ええ。", "1111番です。"]
+    assert needs_model == [False, True]
+
+
+def test_single_kanji_and_number_cues_need_model():
+    subtitles = [Cue(1, 0, 500, "嘘"), Cue(2, 2000, 2500, "何？"), Cue(3, 4000, 4500, "11"), Cue(4, 6000, 6500, "1111"),
+                 Cue(5, 8000, 8500, "ああああ"), Cue(6, 10000, 10500, "…")]
+    cues, needs_model = prefilter_cues(subtitles)
+    assert [cue.text for cue in cues] == ["嘘", "何？", "11", "1111", "あああ", "…"]
+    assert needs_model == [True, True, True, True, False, False]
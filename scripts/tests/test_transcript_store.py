@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from common.srt_cues import Cue, save_cues
+from common.transcript_store import TRANSCRIPT_FILE, read_transcript_cues, save_transcript
+
+
+def write_result(tmp_path):
+    segments = [{"start": 0.0, "end": 1.5, "text": " 一つ目"}, {"start": 2.0, "end": 3.25, "text": " 二つ目"}]
+    srt_path = str(tmp_path / "created.srt")
+    save_cues(srt_path, [Cue(1, 0, 1500, "一つ目"), Cue(2, 2000, 3250, "二つ目")])
+    save_transcript(str(tmp_path / TRANSCRIPT_FILE), segments)
+    return srt_path
+
+
+def test_cues_come_from_transcript_when_srt_is_unchanged(tmp_path):
+    srt_path = write_result(tmp_path)
+    os.utime(srt_path, (0, 0))
+    cues = read_transcript_cues(srt_path)
+    assert [(cue.start, cue.end, cue.text) for cue in cues] == [(0, 1500, "一つ目"), (2000, 3250, "二つ目")]
+
+
+def test_edited_srt_wins_over_transcript(tmp_path):
+    srt_path = write_result(tmp_path)
+    save_cues(srt_path, [Cue(1, 0, 1500, "直した")])
+    transcript_mtime = os.path.getmtime(tmp_path / TRANSCRIPT_FILE)
+    os.utime(srt_path, (transcript_mtime + 10, transcript_mtime + 10))
+    assert [cue.text for cue in read_transcript_cues(srt_path)] == ["直した"]
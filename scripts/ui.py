@@ -9,7 +9,12 @@ import queue
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
 
-from main import create_subtitles, correct_subtitles, synthesize_tts_from_srt
+from common.waveform_view import WaveformView
+from common.model_warmup import ModelWarmup
+from main import create_subtitles, correct_subtitles, synthesize_tts_from_srt, get_reference_name, mux_video, REFERENCE_CACHE_DIR, SERVER_REFERENCE_DIR
+
+# 옵션을 바꾼 뒤 예열을 다시 시작하기까지 기다리는 시간
+WARMUP_DELAY_MS = 800
 
 class App(tk.Tk):
     def __init__(self):
@@ -26,9 +31,20 @@ class App(tk.Tk):
         self.log_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.log_frame, text='Logs')
 
+        self.waveform_view = WaveformView(self.notebook, initialdir=os.path.join(PROJECT_ROOT, "data/03_tts_output"))
+        self.notebook.add(self.waveform_view, text='Waveform')
+
         self.create_widgets()
         self.create_log_viewer()
 
+        # 첫 실행이 모델 로드를 기다리지 않도록 현재 옵션의 모델을 미리 올려 둡니다.
+        self.warmup = ModelWarmup(REFERENCE_CACHE_DIR, SERVER_REFERENCE_DIR)
+        self._warmup_job = None
+        for var in (self.whisper_model_size, self.language, self.reference_audio_path, self.tts_server_url):
+            var.trace_add('write', self.schedule_warmup)
+        self.start_warmup()
+        self.poll_warmup()
+
         self.thread = None
         self.stop_requested = False
 
@@ -58,6 +74,7 @@ class App(tk.Tk):
         self.subtitles_dir = tk.StringVar(value=os.path.join(PROJECT_ROOT, "data/01_subtitles"))
         self.corrected_dir = tk.StringVar(value=os.path.join(PROJECT_ROOT, "data/02_corrected_subtitles"))
         self.tts_output_dir = tk.StringVar(value=os.path.join(PROJECT_ROOT, "data/03_tts_output"))
+        self.final_output_dir = tk.StringVar(value=os.path.join(PROJECT_ROOT, "data/04_final"))
         self.reference_audio_path = tk.StringVar()
 
         ttk.Label(path_frame, text="Video Path:").grid(row=0, column=0, sticky="w", padx=5, pady=2)
@@ -80,6 +97,10 @@ class App(tk.Tk):
         ttk.Entry(path_frame, textvariable=self.tts_output_dir, width=60).grid(row=3, column=1, padx=5, pady=2)
         ttk.Button(path_frame, text="Browse", command=lambda: self.browse_directory(self.tts_output_dir)).grid(row=3, column=2, padx=5, pady=2)
 
+        ttk.Label(path_frame, text="Final Output Dir:").grid(row=5, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(path_frame, textvariable=self.final_output_dir, width=60).grid(row=5, column=1, padx=5, pady=2)
+        ttk.Button(path_frame, text="Browse", command=lambda: self.browse_directory(self.final_output_dir)).grid(row=5, column=2, padx=5, pady=2)
+
         # --- Options ---
         options_frame = ttk.LabelFrame(frame, text="Options")
         options_frame.pack(fill="x", padx=10, pady=5)
@@ -89,7 +110,16 @@ class App(tk.Tk):
         self.exaggeration = tk.DoubleVar(value=1.0)
         self.cfg_weight = tk.DoubleVar(value=0.6)
         self.seed = tk.IntVar(value=40)
-        self.sentence_group_size = tk.IntVar(value=2)
+        self.sentence_group_size = tk.IntVar(value=0)
+        self.max_chunk_chars = tk.IntVar(value=120)
+        self.output_format = tk.StringVar(value="wav")
+        self.normalize_loudness = tk.BooleanVar(value=False)
+        self.fit_to_slots = tk.BooleanVar(value=False)
+        self.max_stretch_ratio = tk.DoubleVar(value=1.5)
+        self.tts_server_url = tk.StringVar(value="")
+        self.batch_cues = tk.BooleanVar(value=False)
+        self.trim_silence = tk.BooleanVar(value=False)
+        self.whisper_model_size = tk.StringVar(value="turbo")
 
         self.temperature_str = tk.StringVar(value=f"{self.temperature.get():.2f}")
         self.exaggeration_str = tk.StringVar(value=f"{self.exaggeration.get():.2f}")
@@ -117,8 +147,28 @@ class App(tk.Tk):
         ttk.Label(options_frame, text="Seed (0-65536):").grid(row=4, column=0, sticky="w", padx=5, pady=2)
         ttk.Entry(options_frame, textvariable=self.seed).grid(row=4, column=1, sticky="w", padx=5, pady=2)
 
-        ttk.Label(options_frame, text="Sentence Group Size (0-10):").grid(row=5, column=0, sticky="w", padx=5, pady=2)
+        ttk.Label(options_frame, text="Max Sentences per Chunk (0=auto):").grid(row=5, column=0, sticky="w", padx=5, pady=2)
         ttk.Entry(options_frame, textvariable=self.sentence_group_size).grid(row=5, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="Max Chunk Characters:").grid(row=6, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.max_chunk_chars).grid(row=6, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="Output Format:").grid(row=7, column=0, sticky="w", padx=5, pady=2)
+        ttk.Combobox(options_frame, textvariable=self.output_format, values=["wav", "flac", "opus", "aac"], state="readonly").grid(row=7, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Checkbutton(options_frame, text="Normalize Loudness", variable=self.normalize_loudness).grid(row=8, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Checkbutton(options_frame, text="Fit to Subtitle Timing", variable=self.fit_to_slots).grid(row=9, column=1, sticky="w", padx=5, pady=2)
+        ttk.Label(options_frame, text="Max Stretch Ratio:").grid(row=10, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.max_stretch_ratio).grid(row=10, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="TTS Server URL (optional):").grid(row=11, column=0, sticky="w", padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=self.tts_server_url).grid(row=11, column=1, sticky="w", padx=5, pady=2)
+        ttk.Checkbutton(options_frame, text="Synthesize Cues Separately (Batch, needs TTS Server)", variable=self.batch_cues).grid(row=12, column=1, sticky="w", padx=5, pady=2)
+        ttk.Checkbutton(options_frame, text="Trim Silence & Use Subtitle Pauses", variable=self.trim_silence).grid(row=13, column=1, sticky="w", padx=5, pady=2)
+
+        ttk.Label(options_frame, text="Whisper Model:").grid(row=14, column=0, sticky="w", padx=5, pady=2)
+        ttk.Combobox(options_frame, textvariable=self.whisper_model_size, values=["tiny", "base", "small", "medium", "turbo", "large"], state="readonly").grid(row=14, column=1, sticky="w", padx=5, pady=2)
         
         options_frame.columnconfigure(1, weight=1)
 
@@ -129,10 +179,16 @@ class App(tk.Tk):
         self.run_create_subtitles = tk.BooleanVar(value=True)
         self.run_correct_subtitles = tk.BooleanVar(value=True)
         self.run_tts_synthesis = tk.BooleanVar(value=True)
+        self.run_mux_video = tk.BooleanVar(value=False)
+        self.keep_original_audio = tk.BooleanVar(value=True)
+        self.burn_subtitles = tk.BooleanVar(value=False)
 
         ttk.Checkbutton(steps_frame, text="Step 1: Create Subtitles from Video", variable=self.run_create_subtitles).pack(anchor="w", padx=5)
         ttk.Checkbutton(steps_frame, text="Step 2: Correct Subtitles with LLM", variable=self.run_correct_subtitles).pack(anchor="w", padx=5)
         ttk.Checkbutton(steps_frame, text="Step 3: Synthesize TTS from Subtitles", variable=self.run_tts_synthesis).pack(anchor="w", padx=5)
+        ttk.Checkbutton(steps_frame, text="Step 4: Mux Dubbed Tracks into Video", variable=self.run_mux_video).pack(anchor="w", padx=5)
+        ttk.Checkbutton(steps_frame, text="    Keep original audio track", variable=self.keep_original_audio).pack(anchor="w", padx=5)
+        ttk.Checkbutton(steps_frame, text="    Burn in subtitles (re-encodes video)", variable=self.burn_subtitles).pack(anchor="w", padx=5)
 
         # --- Execution ---
         execution_frame = ttk.Frame(frame)
@@ -147,6 +203,26 @@ class App(tk.Tk):
         self.progress = ttk.Progressbar(frame, orient="horizontal", length=400, mode="indeterminate")
         self.progress.pack(pady=5)
 
+        self.warmup_status = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.warmup_status).pack(pady=2)
+
+    def reference_audio_list(self) -> list:
+        return [path.strip() for path in self.reference_audio_path.get().split(';') if path.strip() and os.path.exists(path.strip())]
+
+    def schedule_warmup(self, *args):
+        # 입력 중에는 글자마다 다시 시작하지 않도록 잠시 기다렸다가 예열합니다.
+        if self._warmup_job is not None:
+            self.after_cancel(self._warmup_job)
+        self._warmup_job = self.after(WARMUP_DELAY_MS, self.start_warmup)
+
+    def start_warmup(self):
+        self._warmup_job = None
+        self.warmup.request(self.whisper_model_size.get(), self.language.get(), self.reference_audio_list(), self.tts_server_url.get().strip() or None)
+
+    def poll_warmup(self):
+        self.warmup_status.set(("● " if self.warmup.ready else "○ ") + self.warmup.status)
+        self.after(300, self.poll_warmup)
+
     def update_temperature_label(self, *args):
         self.temperature_str.set(f"{self.temperature.get():.2f}")
 
@@ -183,6 +259,9 @@ class App(tk.Tk):
         if not video_path:
             messagebox.showerror("Error", "Video path is required.")
             return
+        if self.batch_cues.get() and not self.tts_server_url.get().strip():
+            messagebox.showerror("Error", "Synthesizing cues separately requires a TTS Server URL (command.py reloads the model for every cue).")
+            return
 
         self.run_button.config(state="disabled")
         self.stop_button.config(state="normal")
@@ -190,6 +269,7 @@ class App(tk.Tk):
         self.notebook.select(self.log_frame)
 
         self.stop_requested = False
+        self.last_merged_output = None
 
         self.log_queue = queue.Queue()
         self.log_text.config(state="normal")
@@ -217,11 +297,15 @@ class App(tk.Tk):
 
             # This will hold the path to the SRT file to be used by the next step
             current_srt_path = None
+            # (merged audio path, voice name) for each synthesized reference
+            dubbed_tracks = []
 
             # --- Step 1: Create Subtitles ---
             if self.run_create_subtitles.get():
                 self.log_queue.put("--- Step 1: Creating subtitles... ---\n")
-                current_srt_path = create_subtitles(video_path, self.subtitles_dir.get())
+                model_size = self.whisper_model_size.get()
+                current_srt_path = create_subtitles(video_path, self.subtitles_dir.get(), model_size=model_size,
+                                                    model=self.warmup.whisper_model(model_size))
                 if self.stop_requested:
                     self.log_queue.put("--- Pipeline stopped by user. ---\n")
                     return
@@ -268,7 +352,7 @@ class App(tk.Tk):
 
                 if not reference_audio_paths:
                     self.log_queue.put("--- No reference audio provides. Running TTS with default voice... ---\n")
-                    synthesize_tts_from_srt(
+                    merged_output_path = synthesize_tts_from_srt(
                         current_srt_path,
                         video_path,
                         self.tts_output_dir.get(),
@@ -278,15 +362,25 @@ class App(tk.Tk):
                         self.cfg_weight.get(),
                         self.seed.get(),
                         self.sentence_group_size.get(),
-                        reference_audio=None
+                        reference_audio=None,
+                        max_chunk_chars=self.max_chunk_chars.get(),
+                        output_format=self.output_format.get(),
+                        normalize_loudness=self.normalize_loudness.get(),
+                        fit_to_slots=self.fit_to_slots.get(),
+                        max_stretch_ratio=self.max_stretch_ratio.get(),
+                        tts_server_url=self.tts_server_url.get().strip() or None,
+                        batch_cues=self.batch_cues.get(),
+                        trim_silence=self.trim_silence.get()
                     )
+                    dubbed_tracks.append((merged_output_path, get_reference_name(None)))
+                    self.last_merged_output = merged_output_path
                     if self.stop_requested:
                         self.log_queue.put("--- Pipeline stopped by user. ---\n")
                         return
                 else:
                     for i, ref_path in enumerate(reference_audio_paths):
                         self.log_queue.put(f"--- [{i+1}/{len(reference_audio_paths)}] Synthesizing with reference: {os.path.basename(ref_path)} ---\n")
-                        synthesize_tts_from_srt(
+                        merged_output_path = synthesize_tts_from_srt(
                             current_srt_path,
                             video_path,
                             self.tts_output_dir.get(),
@@ -296,14 +390,41 @@ class App(tk.Tk):
                             self.cfg_weight.get(),
                             self.seed.get(),
                             self.sentence_group_size.get(),
-                            reference_audio=ref_path
+                            reference_audio=ref_path,
+                            max_chunk_chars=self.max_chunk_chars.get(),
+                            output_format=self.output_format.get(),
+                            normalize_loudness=self.normalize_loudness.get(),
+                            fit_to_slots=self.fit_to_slots.get(),
+                            max_stretch_ratio=self.max_stretch_ratio.get(),
+                            tts_server_url=self.tts_server_url.get().strip() or None,
+                            batch_cues=self.batch_cues.get(),
+                            trim_silence=self.trim_silence.get()
                         )
+                        dubbed_tracks.append((merged_output_path, get_reference_name(ref_path)))
+                        self.last_merged_output = merged_output_path
                         if self.stop_requested:
                             self.log_queue.put("--- Pipeline stopped by user. ---\n")
                             return
             else:
                 self.log_queue.put("--- Step 3: Skipping TTS synthesis. ---\n")
 
+            # --- Step 4: Mux Video ---
+            if self.run_mux_video.get():
+                self.log_queue.put("--- Step 4: Muxing dubbed tracks into video... ---\n")
+                if not dubbed_tracks:
+                    self.log_queue.put("--- ERROR: No dubbed audio from Step 3 to mux. Please run Step 3. ---\n")
+                    return
+                mux_video(
+                    video_path,
+                    dubbed_tracks,
+                    self.final_output_dir.get(),
+                    subtitle_path=current_srt_path if current_srt_path and os.path.exists(current_srt_path) else None,
+                    keep_original_audio=self.keep_original_audio.get(),
+                    burn_subtitles=self.burn_subtitles.get()
+                )
+            else:
+                self.log_queue.put("--- Step 4: Skipping video muxing. ---\n")
+
             self.log_queue.put("--- Pipeline Finished ---\n")
         except Exception as e:
             self.log_queue.put(f"An error occurred: {e}\n")
@@ -321,6 +442,8 @@ class App(tk.Tk):
                     self.stop_button.config(state="disabled")
                     self.progress.stop()
                     self.thread = None
+                    if self.last_merged_output and os.path.exists(self.last_merged_output):
+                        self.waveform_view.load(self.last_merged_output)
                     return
                 self.log_text.config(state="normal")
                 self.log_text.insert("end", line)
@@ -0,0 +1,183 @@
+import os
+import sys
+import argparse
+import time
+
+# --- 경로 설정 ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'scripts'))
+
+from common.srt_cues import CueList, read_cues
+from common.time_range import cue_edits, edit_window
+from common.chunk_planner import cue_snapshot_path
+from common.reference_audio import prepare_reference_audio
+from common.tts_engine import TTSEngine, publish_reference_audio
+from common.tts_runner import ChunkSynthesisError, DEFAULT_TIMEOUT_SEC, DEFAULT_RETRIES
+from main import REFERENCE_CACHE_DIR, SERVER_REFERENCE_DIR, get_reference_name, find_chunk_plan, synthesize_range, synthesize_tts_from_srt
+
+# 파일이 바뀐 것을 보는 주기 (초)
+DEFAULT_POLL_INTERVAL_SEC = 1.0
+
+
+def file_mtime(path: str):
+    """파일 수정 시각(ns)입니다. 편집기가 저장하는 중이라 파일이 잠시 없으면 None."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def wait_for_change(srt_path: str, last_mtime, poll_interval_sec: float, should_stop):
+    """
+    파일이 바뀐 뒤 한 주기 동안 더 바뀌지 않을 때까지 기다립니다. 저장이 여러 번에 나뉘어도 한 번만 처리합니다.
+    Returns:
+        새 수정 시각. 멈추라는 요청이 오면 None.
+    """
+    while not should_stop():
+        time.sleep(poll_interval_sec)
+        mtime = file_mtime(srt_path)
+        if mtime is None or mtime == last_mtime:
+            continue
+        time.sleep(poll_interval_sec)
+        if file_mtime(srt_path) == mtime:
+            return mtime
+    return None
+
+
+def merge_overlapping_edits(old: CueList, new: CueList, edits: list) -> list:
+    """시간 구간이 겹치는 편집은 같은 chunk를 두 번 합성하지 않도록 하나로 합칩니다."""
+    merged = []
+    for edit in edits:
+        if merged and edit_window(old, new, edit)[0] < edit_window(old, new, merged[-1])[1]:
+            i1, _, j1, _ = merged[-1]
+            merged[-1] = (i1, edit[1], j1, edit[3])
+        else:
+            merged.append(edit)
+    return merged
+
+
+def apply_cue_edits(old: CueList, new: CueList, synthesize_window) -> int:
+    """
+    이전 자막과 새 자막의 차이를 앞에서부터 하나씩 반영합니다. 편집마다 그 편집까지 반영한 자막 목록과
+    편집이 차지하는 ms 구간으로 synthesize_window(cues, time_range)를 호출합니다.
+    Returns:
+        int: 반영한 편집 수.
+    """
+    edits = merge_overlapping_edits(old, new, cue_edits(old, new))
+    state = old
+    shift = 0
+    for i1, i2, j1, j2 in edits:
+        time_range = edit_window(old, new, (i1, i2, j1, j2))
+        state = CueList([state[k] for k in range(i1 + shift)]
+                        + [new[k] for k in range(j1, j2)]
+                        + [state[k] for k in range(i2 + shift, len(state))])
+        print(f"--- 편집 반영: 이전 자막 {i2 - i1}개 -> 새 자막 {j2 - j1}개 ({time_range[0] / 1000:.1f}초 ~ {time_range[1] / 1000:.1f}초) ---")
+        synthesize_window(state, time_range)
+        shift += (j2 - j1) - (i2 - i1)
+    return len(edits)
+
+
+def watch_srt(srt_path: str, video_path: str, tts_output_dir: str, language: str, temperature: float, exaggeration: float, cfg_weight: float, seed: int,
+              sentence_group_size: int, reference_audio: str, max_chunk_chars: int = 120, max_chunk_seconds: float = 20.0,
+              normalize_loudness: bool = False, fit_to_slots: bool = False, max_stretch_ratio: float = 1.5,
+              chunk_timeout_sec: float = DEFAULT_TIMEOUT_SEC, chunk_retries: int = DEFAULT_RETRIES, tts_server_url: str = None,
+              batch_cues: bool = False, trim_silence: bool = False, poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC, should_stop=None):
+    """
+    교정된 SRT를 지켜보다가 저장될 때마다 바뀐 자막만 다시 합성하여 병합 WAV의 해당 자리를 덮어씁니다.
+    마지막으로 병합에 쓴 자막 사본(manifest 옆 .srt)과 비교하므로, 감시를 시작하기 전에 한 편집도 처음에 반영합니다.
+    이전 병합 결과가 없거나 manifest와 맞지 않으면 전체 합성을 실행합니다.
+    참조 오디오 전처리와 TTS 엔진은 한 번만 준비하여 모든 편집에 재사용합니다. should_stop()이 True를 반환하면 멈춥니다.
+    """
+    should_stop = should_stop or (lambda: False)
+    os.makedirs(tts_output_dir, exist_ok=True)
+    video_file_name = os.path.splitext(os.path.basename(video_path))[0]
+    reference_name = get_reference_name(reference_audio)
+    prepared_reference_audio = prepare_reference_audio(reference_audio, REFERENCE_CACHE_DIR)
+    if tts_server_url:
+        prepared_reference_audio = publish_reference_audio(prepared_reference_audio, SERVER_REFERENCE_DIR)
+    engine = TTSEngine(server_url=tts_server_url, timeout_sec=chunk_timeout_sec, retries=chunk_retries)
+
+    def synthesize_all():
+        synthesize_tts_from_srt(srt_path, video_path, tts_output_dir, language, temperature, exaggeration, cfg_weight, seed, sentence_group_size,
+                                reference_audio, max_chunk_chars=max_chunk_chars, max_chunk_seconds=max_chunk_seconds,
+                                normalize_loudness=normalize_loudness, fit_to_slots=fit_to_slots, max_stretch_ratio=max_stretch_ratio,
+                                chunk_timeout_sec=chunk_timeout_sec, chunk_retries=chunk_retries, tts_server_url=tts_server_url,
+                                batch_cues=batch_cues, trim_silence=trim_silence)
+
+    def synthesize_window(cues, time_range):
+        synthesize_range(cues, srt_path, video_path, tts_output_dir, reference_name, time_range,
+                         engine, prepared_reference_audio, language, temperature, exaggeration, cfg_weight, seed,
+                         max_chunk_chars=max_chunk_chars, max_chunk_seconds=max_chunk_seconds, sentence_group_size=sentence_group_size,
+                         normalize_loudness=normalize_loudness, fit_to_slots=fit_to_slots, max_stretch_ratio=max_stretch_ratio,
+                         batch_cues=batch_cues, trim_silence=trim_silence, patch_in_place=True)
+
+    print(f"--- 자막 감시 시작: {srt_path} ({reference_name}) ---")
+    mtime = file_mtime(srt_path)
+    while mtime is not None:
+        plan_path = find_chunk_plan(tts_output_dir, video_file_name, reference_name)
+        try:
+            if plan_path is None or not os.path.exists(cue_snapshot_path(plan_path)):
+                print("--- 이어서 고칠 병합 결과가 없어 전체 합성을 실행합니다 ---")
+                synthesize_all()
+            else:
+                try:
+                    count = apply_cue_edits(read_cues(cue_snapshot_path(plan_path)), read_cues(srt_path), synthesize_window)
+                    print(f"--- 바뀐 부분 {count}곳을 반영했습니다. 저장을 기다립니다 ---" if count else "--- 바뀐 자막이 없습니다. 저장을 기다립니다 ---")
+                except ValueError as e:
+                    print(f"--- 편집을 구간으로 반영할 수 없어 전체 합성을 실행합니다: {e} ---")
+                    synthesize_all()
+        except ChunkSynthesisError as e:
+            # 실패한 편집은 자막 사본에 반영되지 않았으므로 다음 저장 때 다시 시도됩니다.
+            print(f"--- 합성 실패: {e}. 다음 저장 때 다시 시도합니다 ---")
+        mtime = wait_for_change(srt_path, mtime, poll_interval_sec, should_stop)
+    print("--- 자막 감시 종료 ---")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="교정된 SRT를 지켜보다가 바뀐 자막만 다시 합성하여 병합 오디오를 고칩니다.")
+    parser.add_argument("--srt_path", type=str, default=os.path.join(PROJECT_ROOT, "data/02_corrected_subtitles", "corrected.srt"),
+                        help="지켜볼 교정된 SRT 파일 경로입니다. (기본값: data/02_corrected_subtitles/corrected.srt)")
+    parser.add_argument("--video_path", type=str, required=True, help="더빙 중인 비디오 파일 경로입니다. (병합 결과를 찾는 데 씁니다)")
+    parser.add_argument("--tts_output_dir", type=str, default=os.path.join(PROJECT_ROOT, "data/03_tts_output"),
+                        help="TTS 합성 오디오 파일 출력 디렉터리입니다. (기본값: data/03_tts_output)")
+    parser.add_argument("--reference_audio", type=str, default=None, help="TTS 클론을 위한 참조 오디오 파일 경로입니다.")
+    parser.add_argument("--language", type=str, default="ja", help="TTS 언어입니다.")
+    parser.add_argument("--temperature", type=float, default=0.8, help="TTS temperature입니다. (0 ~ 1.0)")
+    parser.add_argument("--exaggeration", type=float, default=1.0, help="TTS exaggeration입니다. (0 ~ 2.0)")
+    parser.add_argument("--cfg_weight", type=float, default=0.6, help="TTS cfg_weight입니다. (0 ~ 1.0)")
+    parser.add_argument("--seed", type=int, default=40, help="TTS seed입니다. (0 ~ 65,536)")
+    parser.add_argument("--sentence_group_size", type=int, default=0, help="TTS 한 번에 묶을 최대 문장 수입니다. 0이면 예산으로만 묶습니다. (0 ~ 10)")
+    parser.add_argument("--max_chunk_chars", type=int, default=120, help="TTS 한 번에 넘길 최대 글자 수입니다. (기본값: 120)")
+    parser.add_argument("--max_chunk_seconds", type=float, default=20.0, help="TTS 한 번에 넘길 최대 예상 발화 길이(초)입니다. (기본값: 20)")
+    parser.add_argument("--normalize_loudness", action="store_true", help="병합 시 chunk별 음량을 맞추고 피크를 제한합니다.")
+    parser.add_argument("--fit_to_slots", action="store_true", help="자막 구간보다 긴 합성 결과의 템포를 높여 구간에 맞춥니다.")
+    parser.add_argument("--max_stretch_ratio", type=float, default=1.5,
+                        help="템포 조정 최대 비율입니다. 새 chunk가 기존 자리보다 길 때도 이 비율까지 빠르게 하여 제자리에 넣습니다. (기본값: 1.5)")
+    parser.add_argument("--chunk_timeout", type=float, default=DEFAULT_TIMEOUT_SEC, help=f"TTS chunk 한 번의 최대 실행 시간(초)입니다. (기본값: {DEFAULT_TIMEOUT_SEC})")
+    parser.add_argument("--chunk_retries", type=int, default=DEFAULT_RETRIES, help=f"실패한 chunk를 다시 시도할 횟수입니다. (기본값: {DEFAULT_RETRIES})")
+    parser.add_argument("--trim_silence", action="store_true", help="병합 전에 chunk 앞뒤 묵음을 잘라 내고, 간격을 원본 자막 사이의 쉼에 맞춥니다.")
+    parser.add_argument("--tts_server_url", type=str, default=None,
+                        help="모델이 올라와 있는 Chatterbox-TTS-Server 주소입니다. 감시 중 편집마다 모델을 다시 올리지 않으려면 사용하세요.")
+    parser.add_argument("--batch_cues", action="store_true",
+                        help="chunk 안의 자막을 자막별 배치로 합성하여 자막마다 오디오를 남깁니다. --tts_server_url이 필요합니다 (command.py는 자막마다 모델을 다시 로드).")
+    parser.add_argument("--poll_interval", type=float, default=DEFAULT_POLL_INTERVAL_SEC,
+                        help=f"SRT 파일이 바뀌었는지 확인하는 주기(초)입니다. (기본값: {DEFAULT_POLL_INTERVAL_SEC})")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.srt_path):
+        parser.error(f"SRT 파일이 없습니다: {args.srt_path}")
+    if args.batch_cues and not args.tts_server_url:
+        parser.error("--batch_cues는 --tts_server_url과 함께 써야 합니다. command.py는 자막마다 모델을 다시 로드합니다.")
+    try:
+        watch_srt(args.srt_path, args.video_path, args.tts_output_dir, args.language, args.temperature, args.exaggeration, args.cfg_weight,
+                  args.seed, args.sentence_group_size, args.reference_audio, max_chunk_chars=args.max_chunk_chars,
+                  max_chunk_seconds=args.max_chunk_seconds, normalize_loudness=args.normalize_loudness, fit_to_slots=args.fit_to_slots,
+                  max_stretch_ratio=args.max_stretch_ratio, chunk_timeout_sec=args.chunk_timeout, chunk_retries=args.chunk_retries,
+                  tts_server_url=args.tts_server_url, batch_cues=args.batch_cues, trim_silence=args.trim_silence,
+                  poll_interval_sec=args.poll_interval)
+    except KeyboardInterrupt:
+        print("--- 자막 감시 종료 ---")
+
+
+if __name__ == "__main__":
+    main()